@@ -315,6 +315,9 @@ def create_rollover(rail, shadow, use_rp, wheel, trans, stiffness,
                                                  wheel_stiffness, 
                                                  wp['folder'],
                                                  wp['translation'])
+    # Add rail constraint equations to input file
+    rail_include.add_constraints_to_inp(rollover_model)
+    
     # Add output to .fil file
     fil_output.add(rollover_model, num_cycles)
     
@@ -0,0 +1,199 @@
+"""This module pairs the constrained and retained nodes of the rail
+constraints, and writes the constraint equations described in
+:py:mod:`rollover.three_d.rail.constraints` as `*Equation` keywords
+for the input file. The nodes are referenced by their labels in the
+rail instance, such that no sets are required for the individual nodes.
+The coefficients are computed for all nodes at once, and all equations
+are written in one `*Equation` keyword.
+
+All nodes in a set are matched at once with
+:py:class:`rollover.three_d.utils.spatial_hash.SpatialHash`, instead of
+searching for the matching node of each constrained node separately.
+
+This module does not depend on Abaqus.
+
+.. codeauthor:: Knut Andreas Meyer
+"""
+
+from __future__ import print_function
+import numpy as np
+
+from rollover.utils import naming_mod as names
+from rollover.three_d.utils.spatial_hash import SpatialHash
+
+SEARCH_TOL = 1.e-3  # Tolerance for finding matching node
+
+
+def get_offset_vector(c_coords, r_coords):
+    """Get the vector from the constrained nodes to their matching
+    retained nodes, determined from the bounding boxes of the node sets.
+    The side (low or high) of the bounding boxes with the longest offset
+    is used, allowing the retained nodes to contain nodes without
+    corresponding constrained nodes (but not the other way around).
+
+    :param c_coords: Coordinates of the constrained nodes [nc, 3]
+    :type c_coords: np.array( float )
+
+    :param r_coords: Coordinates of the retained nodes [nr, 3]
+    :type r_coords: np.array( float )
+
+    :returns: The offset vector
+    :rtype: np.array( float ) (len=3)
+
+    """
+    offset_vecs = [np.min(r_coords, axis=0) - np.min(c_coords, axis=0),
+                   np.max(r_coords, axis=0) - np.max(c_coords, axis=0)]
+    offset_vec_norm = [np.linalg.norm(vec) for vec in offset_vecs]
+    return offset_vecs[0] if offset_vec_norm[0] > offset_vec_norm[1] else offset_vecs[1]
+
+
+def pair_nodes(c_coords, r_coords, tol=SEARCH_TOL):
+    """Find the retained node matching each constrained node, i.e. the
+    retained node closest to the constrained node's position moved by
+    the offset vector, see :py:func:`get_offset_vector`.
+
+    :param c_coords: Coordinates of the constrained nodes [nc, 3]
+    :type c_coords: np.array( float )
+
+    :param r_coords: Coordinates of the retained nodes [nr, 3]
+    :type r_coords: np.array( float )
+
+    :param tol: Tolerance for the distance to the matching node
+    :type tol: float
+
+    :returns: The index of the matching retained node for each
+              constrained node
+    :rtype: np.array( int ) (len=nc)
+
+    """
+    c_coords = np.asarray(c_coords, dtype=float)
+    r_coords = np.asarray(r_coords, dtype=float)
+    offset_vec = get_offset_vector(c_coords, r_coords)
+    r_inds, _ = SpatialHash(r_coords, tol).find_closest(c_coords + offset_vec)
+    if np.any(r_inds < 0):
+        raise ValueError('No matching node found for %u nodes, e.g. at %s. '
+                         % (np.count_nonzero(r_inds < 0), str(c_coords[r_inds < 0][0]))
+                         + 'Check that mesh is matching')
+    return r_inds
+
+
+def get_equation_terms(c_labels, c_coords, r_labels=None, r_coords=None, rail_length=None,
+                       rp_label=None, rp_coord=None):
+    """Get the terms of the equations constraining each node in
+    `c_labels` to the corresponding node in `r_labels` (and the rail
+    reference point if `rp_label` is given), see
+    :py:mod:`rollover.three_d.rail.constraints`. The coefficients are
+    computed for all nodes at once. Equations with only the constrained
+    term are not included.
+
+    :param c_labels: Labels of the constrained nodes
+    :type c_labels: np.array( int )
+
+    :param c_coords: Coordinates of the constrained nodes [nc, 3]
+    :type c_coords: np.array( float )
+
+    :param r_labels: Labels of the retained nodes (same length as
+                     `c_labels`). If None, the constrained nodes are
+                     only coupled to the reference point, with
+                     :math:`z^{(\\mathrm{r})} = 0`.
+    :type r_labels: np.array( int )
+
+    :param r_coords: Coordinates of the retained nodes [nc, 3]
+    :type r_coords: np.array( float )
+
+    :param rail_length: The length of the rail (z-dimension), required
+                        if `rp_label` is given
+    :type rail_length: float
+
+    :param rp_label: Label of the rail reference point node, None if
+                     not used
+    :type rp_label: int
+
+    :param rp_coord: Coordinates of the rail reference point
+    :type rp_coord: list[ float ] (len=3)
+
+    :returns: The equations (one per constrained degree of freedom)
+              given by the node labels [nc, num_terms], the degrees of
+              freedom [num_terms] and the coefficients
+              [nc, num_terms]. The first term is the constrained one.
+    :rtype: list[ tuple( np.array, list[ int ], np.array ) ]
+
+    """
+
+    c_labels = np.asarray(c_labels, dtype=int)
+    c_coords = np.asarray(c_coords, dtype=float).reshape((-1, 3))
+    num_nodes = len(c_labels)
+    equations = []
+    for dof in [1, 2, 3]:
+        # Constrained dof first, this is removed
+        labels = [c_labels]
+        dofs = [dof]
+        coeffs = [-np.ones(num_nodes)]
+        if r_labels is not None:
+            labels.append(np.asarray(r_labels, dtype=int))
+            dofs.append(dof)
+            coeffs.append(np.ones(num_nodes))
+        if dof == 3 and rp_label is not None:
+            if r_labels is not None:
+                dz = c_coords[:, 2] - np.asarray(r_coords, dtype=float).reshape((-1, 3))[:, 2]
+            else:
+                dz = c_coords[:, 2]
+            dy = c_coords[:, 1] - rp_coord[1]
+            # Extension and bending (4=ur1: Rotation around x-axis)
+            labels.extend([rp_label*np.ones(num_nodes, dtype=int)]*2)
+            dofs.extend([3, 4])
+            coeffs.extend([dz/rail_length, dy*dz/rail_length])
+        if len(dofs) > 1:
+            equations.append((np.column_stack(labels), dofs, np.column_stack(coeffs)))
+    return equations
+
+
+def get_data_str(c_labels, c_coords, r_labels=None, r_coords=None, rail_length=None,
+                 rp_label=None, rp_coord=None, inst_name=names.rail_inst):
+    """Get the data lines of the `*Equation` keyword for the equations
+    given by :py:func:`get_equation_terms` (see there for the input),
+    with the equations for each constrained node after each other. All
+    lines are formatted at once.
+
+    :param inst_name: Name of the instance containing the nodes
+    :type inst_name: str
+
+    :returns: The data lines, empty if no equations
+    :rtype: str
+
+    """
+
+    equations = get_equation_terms(c_labels, c_coords, r_labels, r_coords, rail_length,
+                                   rp_label, rp_coord)
+    if len(c_labels) == 0 or len(equations) == 0:
+        return ''
+
+    # Format string and values for all equations of one node
+    node_fmt = []
+    columns = []
+    for labels, dofs, coeffs in equations:
+        node_fmt.append(str(len(dofs)))
+        for k, dof in enumerate(dofs):
+            node_fmt.append(inst_name + '.%u, ' + str(dof) + ', %.15e')
+            columns.extend([labels[:, k], coeffs[:, k]])
+    values = np.column_stack(columns)
+    return '\n'.join(['\n'.join(node_fmt)]*len(values)) % tuple(values.reshape(-1).tolist())
+
+
+def get_inp_str(c_labels, c_coords, r_labels=None, r_coords=None, rail_length=None,
+                rp_label=None, rp_coord=None, inst_name=names.rail_inst):
+    """Get the `*Equation` keyword with the equations given by
+    :py:func:`get_equation_terms` (see there for the input)
+
+    :param inst_name: Name of the instance containing the nodes
+    :type inst_name: str
+
+    :returns: The string to add to the input file, empty if no
+              equations
+    :rtype: str
+
+    """
+
+    data_str = get_data_str(c_labels, c_coords, r_labels, r_coords, rail_length,
+                            rp_label, rp_coord, inst_name)
+    return '*Equation\n' + data_str if len(data_str) > 0 else ''
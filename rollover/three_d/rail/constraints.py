@@ -32,6 +32,11 @@ up to the user to set, and then the load can be set accordingly. E.g. putting it
 rail will give zero normal strains in the surface when prescribing the bending. Putting it in the 
 neutral line of the rail profile will give a more natural bending and normal prescribation. 
 
+The constraints can either be created in cae, with one set and one equation per node and direction,
+or be written directly to the input file as `*Equation` keywords referencing the node labels, see 
+:py:func:`add_to_inp` and :py:mod:`rollover.three_d.rail.constraint_equations`. The latter is 
+much faster for fine meshes. 
+
 
 .. codeauthor:: Knut Andreas Meyer
 """
@@ -44,8 +49,12 @@ from abaqusConstants import *
 import regionToolset, mesh
 
 from rollover.utils import naming_mod as names
+from rollover.utils import inp_file_edit as inp_edit
+from rollover.three_d.rail import constraint_equations
+
+RAIL_RP_Y_COORD = 0.0   # y-coordinate of the rail reference point
 
-def create(the_model, rail_length, use_rail_rp, has_substructure=False):
+def create(the_model, rail_length, use_rail_rp, has_substructure=False, cae_equations=True):
     """Add the rail constraint sets and equations. 
     
     .. note:: `the_model` must fulfill the following requirements
@@ -76,6 +85,14 @@ def create(the_model, rail_length, use_rail_rp, has_substructure=False):
     :param has_substructure: Does the model include a rail substructure?
     :type has_substructure: bool
     
+    :param cae_equations: Should the constraint sets and equations be 
+                          created in cae? If False, only the reference
+                          point is created (if `use_rail_rp`), and the 
+                          equations must be added to the input file by 
+                          :py:func:`add_to_inp` after all cae options 
+                          have been set. 
+    :type cae_equations: bool
+    
     :returns: None
     :rtype: None
 
@@ -83,6 +100,14 @@ def create(the_model, rail_length, use_rail_rp, has_substructure=False):
     
     rail_part = the_model.parts[names.rail_part]
     
+    if not cae_equations:
+        if use_rail_rp:
+            if has_substructure:
+                raise NotImplementedError('Combination of rail substructure and reference point '
+                                          + 'not supported yet')
+            add_ctrl_point(the_model, y_coord=RAIL_RP_Y_COORD)
+        return
+    
     sc_sets, sr_sets = create_sets(rail_part, names.rail_side_sets[0], names.rail_side_sets[1])
     shc_sets1, shr_sets1 = create_sets(rail_part, names.rail_shadow_sets[0], names.rail_contact_surf)
     shc_sets2, shr_sets2 = create_sets(rail_part, names.rail_shadow_sets[1], names.rail_contact_surf)
@@ -94,7 +119,7 @@ def create(the_model, rail_length, use_rail_rp, has_substructure=False):
         if has_substructure:
             raise NotImplementedError('Combination of rail substructure and reference point not '
                                       + 'supported yet')
-        rp_coord = add_ctrl_point(the_model, y_coord=0.0)
+        rp_coord = add_ctrl_point(the_model, y_coord=RAIL_RP_Y_COORD)
         rail_rp_set = names.rail_rp_set
         bc_sets, br_sets = create_sets(rail_part, names.rail_bottom_nodes)
         constrained_sets_collection.append(bc_sets)
@@ -107,6 +132,84 @@ def create(the_model, rail_length, use_rail_rp, has_substructure=False):
         for c_set, r_set in zip(c_sets, r_sets):
             add(the_model, rail_length, c_set, rail_rp_set, rp_coord, r_set)
 
+
+def add_to_inp(the_model, rail_length):
+    """Add the rail constraint equations directly to the input file, 
+    for a model where the constraints have been created by 
+    :py:func:`create` with `cae_equations=False`. The node pairs are 
+    the same as for :py:func:`create_sets`, but all nodes in a set are 
+    matched at once and no sets are created. The rail reference point 
+    is included if the set names.rail_rp_set exists in the rail part.
+    The nodes are referenced as names.rail_inst.<label>, which is not 
+    possible if the model contains a rail substructure, as the input 
+    file is then written without parts and instances. 
+    
+    .. note:: Uses direct editing of input and should be called after 
+              all cae options have been set.
+    
+    :param the_model: The full model 
+    :type the_model: Model object (Abaqus)
+    
+    :param rail_length: The length of the rail (z-dimension)
+    :type rail_length: float
+    
+    :returns: None
+    :rtype: None
+
+    """
+    
+    if names.rail_substructure in the_model.parts.keys():
+        raise NotImplementedError('Constraint equations in the input file are not supported '
+                                  + 'with rail substructure, create them in cae')
+    
+    rail_part = the_model.parts[names.rail_part]
+    
+    set_pairs = [names.rail_side_sets, 
+                 (names.rail_shadow_sets[0], names.rail_contact_surf),
+                 (names.rail_shadow_sets[1], names.rail_contact_surf)]
+    
+    if names.rail_rp_set in rail_part.sets.keys():
+        rp_label = rail_part.sets[names.rail_rp_set].nodes[0].label
+        rp_coord = (0.0, RAIL_RP_Y_COORD, 0.0)
+        set_pairs.append((names.rail_bottom_nodes, None))
+    else:
+        rp_label = None
+        rp_coord = None
+    
+    def get_labels_and_coords(set_name):
+        nodes = rail_part.sets[set_name].nodes
+        return (np.array([node.label for node in nodes], dtype=int), 
+                np.array([node.coordinates for node in nodes], dtype=float))
+    
+    constrained_labels = np.zeros(0, dtype=int)
+    data_strs = []
+    for c_set_name, r_set_name in set_pairs:
+        c_labels, c_coords = get_labels_and_coords(c_set_name)
+        r_labels, r_coords = None, None
+        if r_set_name is not None:
+            r_labels, r_coords = get_labels_and_coords(r_set_name)
+            r_inds = constraint_equations.pair_nodes(c_coords, r_coords)
+            r_labels, r_coords = r_labels[r_inds], r_coords[r_inds]
+        
+        # Nodes that are already constrained are skipped
+        new = np.logical_not(np.in1d(c_labels, constrained_labels))
+        constrained_labels = np.concatenate((constrained_labels, c_labels[new]))
+        if r_set_name is not None:
+            r_labels, r_coords = r_labels[new], r_coords[new]
+        data_strs.append(constraint_equations.get_data_str(c_labels[new], c_coords[new], 
+                                                           r_labels, r_coords, rail_length, 
+                                                           rp_label, rp_coord))
+    
+    # All equations in one keyword
+    data_str = '\n'.join([the_str for the_str in data_strs if len(the_str) > 0])
+    if len(data_str) > 0:
+        assy = the_model.rootAssembly
+        if assy.isOutOfDate:
+            assy.regenerate()
+        editor = inp_edit.KeywordBlockEditor(the_model.keywordBlock)
+        editor.add_at_end_of_cat('*Equation\n' + data_str, category='Assembly', name='Assembly')
+        editor.apply()
+
     
 
 
@@ -14,11 +14,18 @@ from rollover.three_d.rail import constraints as rail_constraints
 from rollover.three_d.rail import substructure as rail_substruct
 
 
-def from_file(the_model, model_file, shadow_extents, use_rail_rp=False):
+def from_file(the_model, model_file, shadow_extents, use_rail_rp=False, cae_equations=None):
     """Include a previously created rail part in the given model.
     Shadow regions and constraints are added, and an instance of the 
     rail part is 
     
+    .. note:: The constraint equations are added to the input file, 
+              by calling :py:func:`add_constraints_to_inp` after all 
+              cae options have been set. If the rail has a 
+              substructure, the input file is written without 
+              instance based node labels. The equations are then 
+              created in cae instead. 
+    
     :param the_model: The full model 
     :type the_model: Model object (Abaqus)
     
@@ -36,12 +43,20 @@ def from_file(the_model, model_file, shadow_extents, use_rail_rp=False):
                         and included in the constraint equations?
     :type use_rail_rp: bool
     
+    :param cae_equations: Should the constraint equations be created in
+                          cae? If None, they are only created in cae if
+                          the rail has a substructure. Otherwise, they
+                          are added by :py:func:`add_constraints_to_inp`
+    :type cae_equations: bool
+    
     :returns: Number of nodes, Number of elements
     :rtype: list[ int ]
 
     """
     
     has_substruct = get_part_from_file(the_model, model_file)
+    if cae_equations is None:
+        cae_equations = has_substruct
     
     rail_part = the_model.parts[names.rail_part]
     rail_length = get_rail_z_extent(rail_part)
@@ -61,7 +76,8 @@ def from_file(the_model, model_file, shadow_extents, use_rail_rp=False):
     rail_inst = the_model.rootAssembly.Instance(name=names.rail_inst, part=rail_part, dependent=ON)
     num_nodes += len(the_model.rootAssembly.nodes)
     
-    rail_constraints.create(the_model, rail_length, use_rail_rp, has_substruct)
+    rail_constraints.create(the_model, rail_length, use_rail_rp, has_substruct, 
+                            cae_equations=cae_equations)
     
     if has_substruct:
         # Apply tie between the compatible meshes
@@ -74,6 +90,32 @@ def from_file(the_model, model_file, shadow_extents, use_rail_rp=False):
     return num_nodes, num_elems
     
     
+def add_constraints_to_inp(the_model):
+    """Add the rail constraint equations to the input file, see 
+    :py:func:`rollover.three_d.rail.constraints.add_to_inp`. Nothing 
+    is added if the rail has a substructure, as the equations are then
+    created in cae by :py:func:`from_file` (with the default 
+    `cae_equations`). 
+    
+    .. note:: Uses direct editing of input and should be called after 
+              all cae options have been set.
+    
+    :param the_model: The full model, with the rail included by 
+                      :py:func:`from_file`
+    :type the_model: Model object (Abaqus)
+    
+    :returns: None
+    :rtype: None
+    
+    """
+    
+    if names.rail_substructure in the_model.parts.keys():
+        return
+    
+    rail_length = get_rail_z_extent(the_model.parts[names.rail_part])
+    rail_constraints.add_to_inp(the_model, rail_length)
+    
+    
 def get_rail_z_extent(rail_part):
     """Get the dimension of `rail_part` along the z-direction.
     
@@ -0,0 +1,120 @@
+"""This module saves and reads the interface mesh of the rail
+substructure, see :py:mod:`rollover.three_d.rail.substructure`. The
+interface mesh is a dictionary with the keys
+
+- `node_coord`: The node coordinates, np.array [num_nodes, 3]
+- `face_elements`: For each interface face, a dictionary with the
+  element connectivity (0-based indices in `node_coord`) for each
+  element type, np.array [num_elems, num_elem_nodes]
+- `face_vertex_coord`: For each interface face, the coordinates of its
+  vertices, np.array [num_vertices, 3]
+
+The interface mesh is saved in the `.npz` format, with the arrays
+`node_coord`, `face_vertex_coord` (the vertices of all faces after each
+other) and `face_num_vertices` (number of vertices of each face), and
+the connectivity arrays named `face<face index>_<element type>`, e.g.
+`face0_M3D4`. :py:func:`save_json` writes the interface mesh as a json
+file, for debugging only.
+
+This module does not depend on Abaqus.
+
+.. codeauthor:: Knut Andreas Meyer
+"""
+
+from __future__ import print_function
+import numpy as np
+
+from rollover.utils import naming_mod as names
+from rollover.utils import json_io
+
+
+def group_by_type(elem_types, connectivities):
+    """Group the element connectivities by element type
+
+    :param elem_types: The type of each element
+    :type elem_types: list[ str ]
+
+    :param connectivities: The connectivity of each element
+    :type connectivities: list[ list[ int ] ]
+
+    :returns: The connectivity for each element type
+              [num_elems, num_elem_nodes]
+    :rtype: dict
+
+    """
+    grouped = {}
+    for elem_type, connectivity in zip(elem_types, connectivities):
+        grouped.setdefault(elem_type, []).append(connectivity)
+    return dict([(elem_type, np.array(conn, dtype=int)) for elem_type, conn in grouped.items()])
+
+
+def save(interface_mesh, file_name=names.substructure_interface_mesh_file):
+    """Save the interface mesh to an .npz file
+
+    :param interface_mesh: The interface mesh, see the module
+                           description
+    :type interface_mesh: dict
+
+    :param file_name: Name of the file to write
+    :type file_name: str
+
+    :returns: None
+    :rtype: None
+
+    """
+    face_vertex_coord = [np.asarray(vert_coord, dtype=float).reshape((-1, 3))
+                         for vert_coord in interface_mesh['face_vertex_coord']]
+    arrays = {'node_coord': np.asarray(interface_mesh['node_coord'], dtype=float),
+              'face_vertex_coord': np.concatenate(face_vertex_coord, axis=0),
+              'face_num_vertices': np.array([len(vc) for vc in face_vertex_coord], dtype=int)}
+    for face_ind, face_elements in enumerate(interface_mesh['face_elements']):
+        for elem_type, connectivity in face_elements.items():
+            arrays['face%u_%s' % (face_ind, elem_type)] = np.asarray(connectivity, dtype=int)
+    np.savez(file_name, **arrays)
+
+
+def read(file_name=names.substructure_interface_mesh_file):
+    """Read the interface mesh saved by :py:func:`save`
+
+    :param file_name: Name of the file to read
+    :type file_name: str
+
+    :returns: The interface mesh, see the module description
+    :rtype: dict
+
+    """
+    with np.load(file_name) as data:
+        face_num_vertices = data['face_num_vertices']
+        split_inds = np.cumsum(face_num_vertices)[:-1]
+        interface_mesh = {'node_coord': data['node_coord'],
+                          'face_vertex_coord': np.split(data['face_vertex_coord'], split_inds),
+                          'face_elements': [{} for _ in face_num_vertices]}
+        for key in data.files:
+            if key.startswith('face') and key[4].isdigit():
+                face_str, elem_type = key[4:].split('_', 1)
+                interface_mesh['face_elements'][int(face_str)][elem_type] = data[key]
+    return interface_mesh
+
+
+def save_json(interface_mesh, file_name=names.substructure_interface_mesh_json_file):
+    """Save the interface mesh as a json file, for debugging. The file
+    cannot be read by :py:func:`read`.
+
+    :param interface_mesh: The interface mesh, see the module
+                           description
+    :type interface_mesh: dict
+
+    :param file_name: Name of the file to write
+    :type file_name: str
+
+    :returns: None
+    :rtype: None
+
+    """
+    contents = {'node_coord': np.asarray(interface_mesh['node_coord']).tolist(),
+                'face_vertex_coord': [np.asarray(vert_coord).tolist()
+                                      for vert_coord in interface_mesh['face_vertex_coord']],
+                'face_elements': [dict([(elem_type, np.asarray(conn).tolist())
+                                        for elem_type, conn in face_elements.items()])
+                                  for face_elements in interface_mesh['face_elements']]}
+    json_io.save(file_name, contents)
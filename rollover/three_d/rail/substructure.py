@@ -19,9 +19,10 @@ from abaqus import mdb, session
 import part, mesh, regionToolset
 
 from rollover.utils import naming_mod as names
-from rollover.utils import json_io
 from rollover.three_d.rail import constraints
+from rollover.three_d.rail import interface_mesh
 from rollover.three_d.utils import mesh_tools
+from rollover.three_d.utils import spatial_hash
 
 
 def use_from_plugin():
@@ -289,46 +290,48 @@ def setup_elastic_section(the_model, the_part, Emod=210.e3, nu=0.3):
 def save_interface_mesh(the_part, set_name):
     face_vertex_coord = []
     face_elements = []
-    node_coord = []
-    node_dict = {}
-    orphan_nodes = []
+    node_dict = {}      # Index in old_inds for each node index in the_part
+    old_inds = []
     for face in the_part.sets[set_name].faces:
         region = mesh_tools.get_source_region(face)
         elems, offset_vec = mesh_tools.create_offset_mesh(the_part, face, region, 
                                                           offset_distance=0.0)
         face_vertex_coord.append([the_part.vertices[i].pointOn[0] for i in face.getVertices()])
-        new_elems = []
+        elem_types = []
+        connectivities = []
         for elem in elems:
-            new_elems.append({'connectivity': [], 'type': str(elem.type)})
+            elem_types.append(str(elem.type))
+            connectivities.append([])
             for old_ind in elem.connectivity:
                 if old_ind not in node_dict:
-                    # Check if we have an equal node with the same coordinates
-                    new_ind = find_node_by_coord(coord=the_part.nodes[old_ind].coordinates,
-                                                 nodes=orphan_nodes)
-                    if new_ind is None:                    
-                        new_ind = len(node_coord)
-                        node_dict[old_ind] = new_ind
-                        node_coord.append(the_part.nodes[old_ind].coordinates)
-                        orphan_nodes.append(the_part.nodes[old_ind])
-                else:
-                    new_ind = node_dict[old_ind]
-                    
-                new_elems[-1]['connectivity'].append(new_ind)
+                    node_dict[old_ind] = len(old_inds)
+                    old_inds.append(old_ind)
+                connectivities[-1].append(node_dict[old_ind])
                 
-        face_elements.append(new_elems[:])
-    
-    interface_mesh = {'face_vertex_coord': face_vertex_coord,
-                      'face_elements': face_elements,
-                      'node_coord': node_coord}
-    
-    json_io.save(names.substructure_interface_mesh_file, interface_mesh)
+        face_elements.append(interface_mesh.group_by_type(elem_types, connectivities))
+    
+    # Merge nodes with the same coordinates (the offset meshes of 
+    # neighbouring faces have separate nodes along the common edge)
+    all_coord = [the_part.nodes[old_ind].coordinates for old_ind in old_inds]
+    unique_inds = spatial_hash.get_unique_inds(np.array(all_coord), tol=1.e-6)
+    is_unique = unique_inds == np.arange(len(old_inds))
+    new_inds = (np.cumsum(is_unique) - 1)[unique_inds]
+    node_coord = np.array(all_coord)[is_unique]
+    orphan_nodes = [the_part.nodes[old_inds[i]] for i in np.nonzero(is_unique)[0]]
+    for face_elems in face_elements:
+        for elem_type in face_elems:
+            face_elems[elem_type] = new_inds[face_elems[elem_type]]
+    
+    interface_mesh.save({'face_vertex_coord': face_vertex_coord,
+                         'face_elements': face_elements,
+                         'node_coord': node_coord})
     
     the_part.deleteNode(nodes=orphan_nodes)
     
 
 def add_interface_mesh(rail_part):
     try:
-        interface_mesh = json_io.read(names.substructure_interface_mesh_file)
+        the_mesh = interface_mesh.read()
     except IOError as e:
         print('Could not find/read the interface, IOError was:')
         print(e)
@@ -340,21 +343,24 @@ def add_interface_mesh(rail_part):
                      'S8': QUAD8, 'S8R': QUAD8, 'S8R5': QUAD8}
                      
     orph_nodes = mesh.MeshNodeArray(nodes=[rail_part.Node(coord) 
-                                           for coord in interface_mesh['node_coord']])
+                                           for coord in the_mesh['node_coord'].tolist()])
     orph_elements = []
-    for face_elements in interface_mesh['face_elements']:
+    for face_elements in the_mesh['face_elements']:
         orph_elements.append([])
-        for element in face_elements:
-            elnodes = [orph_nodes[i] for i in element['connectivity']]
-            elem_shape = etype_2_shape[element['type']]
-            try:
-                orph_elements[-1].append(rail_part.Element(nodes=elnodes, elemShape=elem_shape))
-            except Exception as e:
-                print(element['type'])
-                raise e
+        for elem_type, connectivity in face_elements.items():
+            elem_shape = etype_2_shape[elem_type]
+            # Abaqus requires python ints (not numpy ints) as indices
+            for elem_conn in connectivity.tolist():
+                elnodes = [orph_nodes[i] for i in elem_conn]
+                try:
+                    orph_elements[-1].append(rail_part.Element(nodes=elnodes, 
+                                                               elemShape=elem_shape))
+                except Exception as e:
+                    print(elem_type)
+                    raise e
     
     for face in rail_part.sets[names.rail_substructure_interface_set].faces:
-        if_face_ind = find_matching_face(rail_part, face, interface_mesh['face_vertex_coord'])
+        if_face_ind = find_matching_face(rail_part, face, the_mesh['face_vertex_coord'])
         face_points = [rail_part.vertices[vi].pointOn[0] for vi in face.getVertices()]
         if len(face_points) < 3:
             print('Interface faces must have at least 3 vertices for automatic matching mesh '
@@ -383,18 +389,13 @@ def add_interface_mesh(rail_part):
     
 def find_matching_face(the_part, base_face, faces_vert_coord):
     tol = 1.e-6
-    base_vert_coords = [np.array(the_part.vertices[i].pointOn[0]) 
-                        for i in base_face.getVertices()]
+    base_vert_coords = np.array([the_part.vertices[i].pointOn[0] 
+                                 for i in base_face.getVertices()])
     
     for face_ind, vert_coords in enumerate(faces_vert_coord):
-        dist = []
-        for base_coord in base_vert_coords:
-            all_dist = []
-            for coord in vert_coords:
-                all_dist.append(np.linalg.norm(base_coord - np.array(coord)))
-            dist.append(min(all_dist))
-        dist = np.array(dist)
-        if all(dist<tol):
+        vert_hash = spatial_hash.SpatialHash(np.array(vert_coords), tol)
+        inds, _ = vert_hash.find_closest(base_vert_coords)
+        if np.all(inds >= 0):
             return face_ind
     
     print('Attempted to find match to face with vertices')
@@ -409,18 +410,15 @@ def find_matching_face(the_part, base_face, faces_vert_coord):
         
 def get_matching_nodes(the_part, face_points, element_region):
     tol = 1.e-4
-    point_nodes = []
-    for i, face_point in enumerate(face_points):
-        found = False
-        for element in element_region.elements:
-            for node in element.getNodes():                    
-                if np.linalg.norm(np.array(face_point) - np.array(node.coordinates)) < tol:
-                    point_nodes.append(node)
-                    found = True
-                    break
-            if found:
-                break
-                
+    nodes = {}
+    for element in element_region.elements:
+        for node in element.getNodes():
+            nodes[node.label] = node
+    nodes = list(nodes.values())
+    
+    node_hash = spatial_hash.SpatialHash(np.array([node.coordinates for node in nodes]), tol)
+    inds, _ = node_hash.find_closest(np.array(face_points))
+    point_nodes = [nodes[i] for i in inds if i >= 0]
         
     if len(point_nodes) != len(face_points):
         print('Searching for nodes at points:')
@@ -429,17 +427,3 @@ def get_matching_nodes(the_part, face_points, element_region):
         raise ValueError('Could not find matching nodes')
         
     return point_nodes
-    
-    
-def find_node_by_coord(coord, nodes):
-    tol = 1.e-6
-    
-    coord = np.array(coord)
-    for i, node in enumerate(nodes):
-        if np.linalg.norm(coord - np.array(node.coordinates)) < tol:
-            return i
-        
-    # Could not find a matching node, return None
-    return None
-    
-
@@ -0,0 +1,326 @@
+"""This module is used to extract the results after each rolling step
+from the Abaqus result (`.fil`) file, and save them in a results folder
+for fast post-processing of many cycles. The following quantities are
+saved for each cycle, at the end of the rolling step:
+
+- `wheel_rp_u`: Wheel reference point displacements and rotations
+  [num_cycles, 6]
+- `contact_node_u`: Wheel contact node displacements
+  [num_cycles, num_contact_nodes, 3]
+- `rail_rp_u`: Rail reference point displacements [num_cycles, 6] (if
+  a rail reference point is used)
+
+The results folder contains `names.cycle_results_index_file`, listing
+the chunk files, and `.npz` files with the results for `chunk_cycles`
+cycles each (one array per quantity, and `cycle` with the cycle
+numbers). The contact node labels and initial coordinates are saved
+in the index file. Reading one quantity for all cycles, see
+:py:func:`read`, only loads that array from each chunk file.
+
+The `.fil` output is added by :py:mod:`rollover.three_d.utils.fil_output`
+and read by :py:mod:`rollover.three_d.utils.fil_reader`. As in
+:file:`usub/urdfil_mod.f90`, the output request with more than one
+node is the contact nodes. The first output request with one node is
+the wheel reference point, and the second the rail reference point.
+
+This module does not depend on Abaqus.
+
+.. codeauthor:: Knut Andreas Meyer
+"""
+
+from __future__ import print_function
+import os, json
+
+import numpy as np
+
+from rollover.utils import naming_mod as names
+from rollover.three_d.utils import fil_reader
+from rollover.three_d.utils import restart_chunks
+
+QUANTITIES = ['wheel_rp_u', 'contact_node_u', 'rail_rp_u']
+CHUNK_CYCLES = 100
+
+
+def extract(fil_files, results_dir=names.cycle_results_dir, chunk_cycles=CHUNK_CYCLES,
+            completed=None):
+    """Extract the results from the rolling steps in `fil_files` and add
+    them to `results_dir`. Cycles already in `results_dir` are skipped,
+    such that the results can be extracted while the simulation is
+    running, or from the chunk jobs in
+    :py:mod:`rollover.three_d.utils.restart_chunks` as they complete.
+    Rolling steps that may still be running are not extracted, see
+    :py:func:`read_rolling_results`.
+
+    :param fil_files: The `.fil` files, in the order they were
+                      simulated
+    :type fil_files: list[ str ]
+
+    :param results_dir: The results folder, created if it doesn't exist
+    :type results_dir: str
+
+    :param chunk_cycles: Number of cycles per chunk file (for a new
+                         results folder)
+    :type chunk_cycles: int
+
+    :param completed: Have the jobs writing `fil_files` completed? If
+                      None, this is checked from the status file of
+                      each job.
+    :type completed: bool
+
+    :returns: The number of extracted cycles
+    :rtype: int
+
+    """
+
+    index = read_index(results_dir)
+    if index is None:
+        if not os.path.exists(results_dir):
+            os.makedirs(results_dir)
+        index = {'chunk_cycles': chunk_cycles, 'chunks': []}
+
+    # Continue filling the last chunk if not full
+    buffer = {}
+    if len(index['chunks']) > 0 and get_num_cycles(index['chunks'][-1]) < index['chunk_cycles']:
+        chunk = index['chunks'].pop()
+        with np.load(os.path.join(results_dir, chunk['file'])) as data:
+            buffer = dict([(key, list(data[key])) for key in data.files])
+    last_cycle = index['chunks'][-1]['cycles'][1] if len(index['chunks']) > 0 else 0
+    if len(buffer) > 0:
+        last_cycle = buffer['cycle'][-1]
+
+    num_extracted = 0
+    for fil_file in fil_files:
+        for cycle_nr, results in read_rolling_results(fil_file, index, completed):
+            if cycle_nr <= last_cycle:
+                continue
+            elif cycle_nr != last_cycle + 1:
+                raise ValueError('Cycle ' + str(cycle_nr) + ' in ' + fil_file
+                                 + ' does not follow cycle ' + str(last_cycle))
+            buffer.setdefault('cycle', []).append(cycle_nr)
+            for key in results:
+                buffer.setdefault(key, []).append(results[key])
+            last_cycle = cycle_nr
+            num_extracted = num_extracted + 1
+            if len(buffer['cycle']) == index['chunk_cycles']:
+                write_chunk(results_dir, index, buffer)
+                buffer = {}
+
+    if len(buffer) > 0:
+        write_chunk(results_dir, index, buffer)
+
+    return num_extracted
+
+
+def read(results_dir, quantity, first_cycle=1, last_cycle=None):
+    """Read the results for `quantity` for the cycles `first_cycle` to
+    `last_cycle`.
+
+    :param results_dir: The results folder
+    :type results_dir: str
+
+    :param quantity: The quantity to read, one of `QUANTITIES`
+    :type quantity: str
+
+    :param first_cycle: The first cycle to read
+    :type first_cycle: int
+
+    :param last_cycle: The last cycle to read, defaults to the last
+                       extracted cycle
+    :type last_cycle: int
+
+    :returns: The cycle numbers [num_cycles] and the results
+              [num_cycles, ...]
+    :rtype: tuple( np.array )
+
+    """
+
+    index = read_index(results_dir)
+    if index is None:
+        raise IOError('No results in ' + results_dir)
+    last_cycle = index['chunks'][-1]['cycles'][1] if last_cycle is None else last_cycle
+
+    cycles = []
+    values = []
+    for chunk in index['chunks']:
+        if chunk['cycles'][1] < first_cycle or chunk['cycles'][0] > last_cycle:
+            continue
+        with np.load(os.path.join(results_dir, chunk['file'])) as data:
+            if quantity not in data.files:
+                raise ValueError(quantity + ' is not available in ' + results_dir)
+            chunk_cycles = data['cycle']
+            inds = np.logical_and(chunk_cycles >= first_cycle, chunk_cycles <= last_cycle)
+            cycles.append(chunk_cycles[inds])
+            values.append(data[quantity][inds])
+
+    if len(cycles) == 0:
+        return np.zeros(0, dtype=int), np.zeros(0)
+    return np.concatenate(cycles), np.concatenate(values)
+
+
+def read_contact_nodes(results_dir):
+    """Read the wheel contact node labels and initial coordinates
+
+    :param results_dir: The results folder
+    :type results_dir: str
+
+    :returns: The node labels [num_contact_nodes] and the initial
+              coordinates [num_contact_nodes, 3]. The order is the same
+              as for `contact_node_u`.
+    :rtype: tuple( np.array )
+
+    """
+
+    index = read_index(results_dir)
+    if index is None or 'contact_node_labels' not in index:
+        raise IOError('No contact node info in ' + results_dir)
+    return np.array(index['contact_node_labels']), np.array(index['contact_node_coords'])
+
+
+def read_rolling_results(fil_file, index, completed=None):
+    """Read the results at the end of each rolling step in `fil_file`.
+    The contact node labels and initial coordinates are added to
+    `index` if available and not already set.
+
+    A rolling step is only considered finished when an increment of a
+    later step follows in `fil_file`, or when the job has completed.
+    Otherwise, the last increment in the file may be from a rolling
+    step that is still running.
+
+    :param fil_file: The `.fil` file
+    :type fil_file: str
+
+    :param index: The results index, see :py:func:`read_index`
+    :type index: dict
+
+    :param completed: Has the job writing `fil_file` completed? If
+                      None, this is checked from the job's status
+                      file, see
+                      :py:func:`rollover.three_d.utils.restart_chunks.is_completed`
+    :type completed: bool
+
+    :returns: Generator giving `(cycle_nr, results)`, where `results`
+              is a dictionary with the results for each quantity
+    :rtype: generator
+
+    """
+
+    last_increment = None
+    for increment in fil_reader.read_increments(fil_file):
+        if last_increment is not None and last_increment['step'] != increment['step']:
+            yield get_cycle_nr(last_increment['step']), get_results(last_increment, index)
+            last_increment = None
+        if is_rolling_step(increment['step']):
+            last_increment = increment
+
+    if last_increment is not None:
+        if completed is None:
+            completed = restart_chunks.is_completed(os.path.splitext(fil_file)[0])
+        if completed:
+            yield get_cycle_nr(last_increment['step']), get_results(last_increment, index)
+
+
+def get_results(increment, index):
+    """Get the results for each quantity in the output requests of
+    `increment`, see :py:func:`rollover.three_d.utils.fil_reader.read_increments`
+
+    :param increment: The increment data
+    :type increment: dict
+
+    :param index: The results index, see :py:func:`read_index`
+    :type index: dict
+
+    :returns: The results for each quantity
+    :rtype: dict
+
+    """
+
+    results = {}
+    rp_quantities = ['wheel_rp_u', 'rail_rp_u']
+    for request in increment['output']:
+        if fil_reader.FIL_NODE_DISP not in request:
+            continue
+        labels, u = request[fil_reader.FIL_NODE_DISP]
+        if len(labels) > 1:
+            sort_inds = np.argsort(labels)
+            results['contact_node_u'] = u[sort_inds, :3]
+            if 'contact_node_labels' not in index and fil_reader.FIL_NODE_COORD in request:
+                coord_labels, coords = request[fil_reader.FIL_NODE_COORD]
+                coord_inds = np.argsort(coord_labels)
+                index['contact_node_labels'] = labels[sort_inds].tolist()
+                index['contact_node_coords'] = (coords[coord_inds, :3]
+                                                - u[sort_inds, :3]).tolist()
+        elif len(rp_quantities) > 0:
+            results[rp_quantities.pop(0)] = u[0]
+    return results
+
+
+def is_rolling_step(step_nr):
+    # Rolling steps are 3, 7, 11, ..., see usub/step_type_mod.f90
+    return step_nr > 2 and (step_nr - 3) % 4 == 0
+
+
+def get_cycle_nr(step_nr):
+    # Cycle number of the rolling step step_nr
+    return (step_nr + 1)//4
+
+
+def get_num_cycles(chunk):
+    return chunk['cycles'][1] - chunk['cycles'][0] + 1
+
+
+def write_chunk(results_dir, index, buffer):
+    """Write the results in `buffer` to a new chunk file and update the
+    index
+
+    :param results_dir: The results folder
+    :type results_dir: str
+
+    :param index: The results index, see :py:func:`read_index`
+    :type index: dict
+
+    :param buffer: The cycle numbers (`'cycle'`) and results for each
+                   quantity
+    :type buffer: dict
+
+    """
+
+    cycles = [int(buffer['cycle'][0]), int(buffer['cycle'][-1])]
+    chunk_file = 'cycles_' + names.cycle_str(cycles[0]) + '.npz'
+    arrays = dict([(key, np.array(buffer[key])) for key in buffer])
+    with open(os.path.join(results_dir, chunk_file), 'wb') as fid:
+        np.savez_compressed(fid, **arrays)
+    index['chunks'].append({'file': chunk_file, 'cycles': cycles})
+    write_index(results_dir, index)
+
+
+def read_index(results_dir):
+    """Read the index file in `results_dir`
+
+    :param results_dir: The results folder
+    :type results_dir: str
+
+    :returns: The index, with the keys `'chunk_cycles'` and `'chunks'`
+              (list of dictionaries with `'file'` and `'cycles'` (first
+              and last cycle)), and possibly `'contact_node_labels'` and
+              `'contact_node_coords'`. None if no index exists.
+    :rtype: dict
+
+    """
+
+    index_file = os.path.join(results_dir, names.cycle_results_index_file)
+    if not os.path.exists(index_file):
+        return None
+    with open(index_file, 'r') as fid:
+        return json.load(fid)
+
+
+def write_index(results_dir, index):
+    # Write to a temporary file first, such that the index file is
+    # always complete.
+    index_file = os.path.join(results_dir, names.cycle_results_index_file)
+    tmp_file = index_file + '.tmp'
+    with open(tmp_file, 'w') as fid:
+        json.dump(index, fid)
+    if os.path.exists(index_file):
+        os.remove(index_file)
+    os.rename(tmp_file, index_file)
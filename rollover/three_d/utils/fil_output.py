@@ -32,25 +32,28 @@ def add(the_model, num_cycles):
     if assy.isOutOfDate:
         assy.regenerate()
     
-    kwb = the_model.keywordBlock
+    editor = inp_edit.KeywordBlockEditor(the_model.keywordBlock)
     use_substr = names.rail_substructure in the_model.parts.keys()
     rail_rp = names.rail_rp_set if names.rail_rp_set in assy.sets.keys() else None
     
     # Setup output after first rollover
-    add_to_step(kwb, 'COORD, U', names.get_step_rolling(1), rail_rp, use_substr)
+    add_to_step(editor, 'COORD, U', names.get_step_rolling(1), rail_rp, use_substr)
     
     
     for cycle_nr in range(2,num_cycles+1):
-        add_to_step(kwb, '', names.get_step_return(cycle_nr), rail_rp, use_substr)
-        add_to_step(kwb, 'U', names.get_step_rolling(cycle_nr), rail_rp, use_substr)
+        add_to_step(editor, '', names.get_step_return(cycle_nr), rail_rp, use_substr)
+        add_to_step(editor, 'U', names.get_step_rolling(cycle_nr), rail_rp, use_substr)
+    
+    editor.apply()
         
         
-def add_to_step(kwb, varstr, step_name, rail_rp=None, use_substr=False):
+def add_to_step(editor, varstr, step_name, rail_rp=None, use_substr=False):
     """ Add output specified to given step. 
     
-    :param kwb: The keyword block that can be used to edit input file
-                directly.
-    :type kwb: KeywordBlock object (Abaqus)
+    :param editor: The editor used to edit the input file directly. 
+                   The output is added when calling its apply method.
+    :type editor: KeywordBlockEditor object 
+                  (:py:class:`rollover.utils.inp_file_edit.KeywordBlockEditor`)
     
     :param varstr: The string specifying which variables to add to 
                    output
@@ -77,7 +80,7 @@ def add_to_step(kwb, varstr, step_name, rail_rp=None, use_substr=False):
     
     for set in sets:
         add_str = get_node_file_output_str(set, varstr)
-        inp_edit.add_at_end_of_cat(kwb, add_str, category='Step', name=step_name)
+        editor.add_at_end_of_cat(add_str, category='Step', name=step_name)
     
     
 def get_node_file_output_str(nset, varstr, frequency=99999999):
@@ -0,0 +1,230 @@
+"""This module is used to read the node output in the Abaqus result
+(`.fil`) file, as added by :py:mod:`rollover.three_d.utils.fil_output`,
+without Abaqus. This allows post-processing e.g. the wheel reference
+point motion and the contact node displacements over many cycles
+without opening the `.odb` file.
+
+The binary `.fil` file consists of blocks of 512 words (8 bytes each).
+If written as a Fortran sequential unformatted file, each block has a
+4 byte record marker before and after it, and this is detected
+automatically. Each record starts with the record length (in words,
+including the 2 first words) and the record type key, followed by the
+attributes. The file is memory-mapped and read in windows of blocks,
+such that only one increment is kept in memory at a time, see
+:py:func:`read_increments`. Consecutive records of the same type and
+length (e.g. the displacements of all nodes in an output request) are
+converted to arrays without looping over the records.
+
+This module does not depend on Abaqus.
+
+.. codeauthor:: Knut Andreas Meyer
+"""
+
+from __future__ import print_function
+import os
+
+import numpy as np
+
+# Abaqus .fil file record keys (same as in usub/urdfil_mod.f90)
+FIL_INCREMENT_START = 2000      # Written at start of increment with output requests
+FIL_INCREMENT_END = 2001        # Written at end of increment with output requests
+FIL_OUTPUT_REQUEST_DEF = 1911   # Written for each output request
+FIL_NODE_DISP = 101             # Node displacements, attributes = [Node num, u1, u2, ...]
+FIL_NODE_COORD = 107            # Node (deformed) coordinates, attr = [Node num, x1, x2, ...]
+
+BLOCK_WORDS = 512               # Number of words per block
+BLOCK_BYTES = 8*BLOCK_WORDS     # Number of bytes per block (excluding record markers)
+WINDOW_BLOCKS = 256             # Default number of blocks to read at a time
+
+# Increment start record, word indices of attributes (0-based, including length and key)
+INCREMENT_TOTAL_TIME = 2
+INCREMENT_STEP_TIME = 3
+INCREMENT_STEP = 7
+INCREMENT_NUMBER = 8
+
+
+def read_increments(fil_file, window_blocks=WINDOW_BLOCKS):
+    """Read the increments in `fil_file` one at a time. For each
+    increment, the node output is given for each output request (in
+    the order the requests are given in the input file), as a dictionary
+    with the record type key as key (e.g. `FIL_NODE_DISP`) and the node
+    labels and values as value.
+
+    .. code-block:: python
+
+        for inc in read_increments('rollover.fil'):
+            labels, u = inc['output'][1][FIL_NODE_DISP]
+
+    If the number of values differ between nodes in the same output
+    request, the missing values are set to `nan`.
+
+    :param fil_file: The path to the binary `.fil` file
+    :type fil_file: str
+
+    :param window_blocks: Number of blocks to read at a time. Must
+                          be larger than the longest record.
+    :type window_blocks: int
+
+    :returns: Generator giving a dictionary for each increment with the
+              keys `'step'`, `'increment'`, `'total_time'`,
+              `'step_time'`, and `'output'`. `'output'` is a list with
+              a dictionary for each output request, with values
+              `(labels, values)`, where `labels` is an int array
+              [num_nodes] and `values` a float array
+              [num_nodes, num_values]
+    :rtype: generator
+
+    """
+
+    increment = None
+    for key, data in read_records(fil_file, window_blocks):
+        if key == FIL_INCREMENT_START:
+            increment = get_increment_info(data)
+        elif increment is None:     # Model data before first increment
+            continue
+        elif key == FIL_INCREMENT_END:
+            increment['output'] = [merge_node_data(request) for request in increment['output']]
+            yield increment
+            increment = None
+        elif key == FIL_OUTPUT_REQUEST_DEF:
+            increment['output'].extend([{} for _ in range(data.shape[0])])
+        else:
+            if len(increment['output']) == 0:
+                increment['output'].append({})
+            increment['output'][-1].setdefault(key, []).append(data)
+
+
+def read_records(fil_file, window_blocks=WINDOW_BLOCKS):
+    """Read the records in `fil_file`. Consecutive records with the
+    same type key and length are given together.
+
+    :param fil_file: The path to the binary `.fil` file
+    :type fil_file: str
+
+    :param window_blocks: Number of blocks to read at a time. Must
+                          be larger than the longest record.
+    :type window_blocks: int
+
+    :returns: Generator giving `(key, data)` where `key` is the record
+              type key and `data` the words in the records as a float
+              array [num_records, record_length]. The integer
+              attributes can be obtained by :py:func:`get_int`
+    :rtype: generator
+
+    """
+
+    blocks = get_blocks(fil_file)
+    num_words = blocks.shape[0]*BLOCK_WORDS
+    buf_start = 0                   # Word index of the first word in buf
+    buf = np.zeros(0)
+    pos = 0                         # Word index of the current record
+    while pos < num_words:
+        if pos + 2 > buf_start + len(buf):
+            buf, buf_start = read_window(blocks, pos, window_blocks)
+        ind = pos - buf_start
+        record_length, key = get_int(buf[ind:ind+2])
+        if record_length < 2:       # Padding at end of file
+            break
+        if ind + record_length > len(buf):
+            if pos + record_length > num_words:
+                raise IOError('Incomplete record at the end of ' + fil_file)
+            buf, buf_start = read_window(blocks, pos, window_blocks)
+            ind = 0
+            if record_length > len(buf):
+                raise ValueError('Record longer than window_blocks blocks in ' + fil_file)
+
+        num_records = get_num_same(buf, ind, record_length, key)
+        data = buf[ind:ind + num_records*record_length].reshape((num_records, record_length))
+        yield key, data
+        pos = pos + num_records*record_length
+
+
+def get_num_same(buf, ind, record_length, key):
+    # Number of consecutive records in buf, starting at ind, with the given length and key.
+    # Check an increasing number of records to avoid checking the full buf for short runs
+    max_num = (len(buf) - ind) // record_length
+    if max_num < 2 or np.any(get_int(buf[ind + record_length:ind + record_length + 2])
+                             != [record_length, key]):
+        return 1
+    num_check = 64
+    while True:
+        num_check = min(num_check, max_num)
+        records = buf[ind:ind + num_check*record_length].reshape((num_check, record_length))
+        same = np.all(get_int(records[:, :2]) == [record_length, key], axis=1)
+        if not np.all(same):
+            return int(np.argmin(same))
+        elif num_check == max_num:
+            return max_num
+        num_check = 4*num_check
+
+
+def get_blocks(fil_file):
+    """Memory-map `fil_file` as an array of blocks
+
+    :param fil_file: The path to the binary `.fil` file
+    :type fil_file: str
+
+    :returns: The words in each block, float array [num_blocks, 512]
+    :rtype: np.array
+
+    """
+
+    file_size = os.path.getsize(fil_file)
+    with open(fil_file, 'rb') as fid:
+        first_marker = np.fromfile(fid, dtype='<i4', count=1)
+
+    if file_size % (BLOCK_BYTES + 8) == 0 and first_marker[0] == BLOCK_BYTES:
+        block_type = np.dtype([('head', '<i4'), ('words', '<f8', (BLOCK_WORDS,)),
+                               ('tail', '<i4')])
+        return np.memmap(fil_file, dtype=block_type, mode='r')['words']
+    elif file_size % BLOCK_BYTES == 0:
+        return np.memmap(fil_file, dtype='<f8', mode='r').reshape((-1, BLOCK_WORDS))
+    else:
+        raise ValueError(fil_file + ' is not a binary .fil file')
+
+
+def read_window(blocks, pos, window_blocks):
+    # Copy at least window_blocks blocks of words, starting at word index pos
+    first_block = pos // BLOCK_WORDS
+    words = np.array(blocks[first_block:first_block + window_blocks + 1]).reshape(-1)
+    offset = pos - first_block*BLOCK_WORDS
+    return words[offset:], pos
+
+
+def get_int(words):
+    """Get the integer values of the words `words`. As in
+    :file:`usub/urdfil_mod.f90`, the first 4 bytes of each word are used.
+
+    :param words: The words, float array
+    :type words: np.array
+
+    :returns: The integer values, same shape as `words`
+    :rtype: np.array
+
+    """
+    return np.ascontiguousarray(words).view('<i4')[..., ::2]
+
+
+def get_increment_info(data):
+    # Get the increment info from the increment start record
+    record = data[0]
+    step, increment = get_int(record[[INCREMENT_STEP, INCREMENT_NUMBER]])
+    return {'step': int(step), 'increment': int(increment),
+            'total_time': float(record[INCREMENT_TOTAL_TIME]),
+            'step_time': float(record[INCREMENT_STEP_TIME]), 'output': []}
+
+
+def merge_node_data(request):
+    # Convert the records for each key in an output request to labels and values
+    output = {}
+    for key, data_list in request.items():
+        labels = np.concatenate([get_int(data[:, 2]) for data in data_list])
+        num_values = max([data.shape[1] for data in data_list]) - 3
+        values = np.empty((len(labels), num_values))
+        values.fill(np.nan)
+        row = 0
+        for data in data_list:
+            values[row:row + data.shape[0], :data.shape[1] - 3] = data[:, 3:]
+            row = row + data.shape[0]
+        output[key] = (labels, values)
+    return output
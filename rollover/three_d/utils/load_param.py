@@ -0,0 +1,280 @@
+"""This module describes the load parameters for each cycle, see
+:py:class:`LoadSchedule`, and writes the loading files,
+`names.loading_file` (text) and `names.loading_binary_file`, which are
+read by the user subroutine DISP. If the binary file exists, it is
+used instead of the text file. It contains the parameters for each
+cycle, such that they are obtained by direct indexing.
+
+This module does not depend on Abaqus.
+
+.. codeauthor:: Knut Andreas Meyer
+"""
+
+from __future__ import print_function
+import struct
+
+import numpy as np
+
+from rollover.utils import naming_mod as names
+
+LOADING_FILE_FORMAT = '%0.0f' + 3*', %25.15e'
+
+LOADING_BINARY_MAGIC = b'LOADPARM'
+LOADING_BINARY_VERSION = 1
+LOADING_BINARY_HEADER_FORMAT = '<8s4i2d'
+LOADING_BINARY_HEADER_SIZE = struct.calcsize(LOADING_BINARY_HEADER_FORMAT)
+
+
+class LoadSchedule(object):
+    """The load parameters as function of the cycle number. The
+    parameters are given as "cycle data type": If value is scalar, the
+    same value will be applied to all cycles. If list, it should have
+    the same length as `cycles`, and the value will be applied from
+    the corresponding cycle and onwards. If `ramp` is True, the values
+    are instead linearly interpolated between the cycles in `cycles`.
+    Before the first and after the last cycle in `cycles`, the values
+    are constant.
+
+    The values for many cycles are obtained at once, see :py:meth:`get`.
+
+    :param vertical_load: Vertical wheel load
+    :type vertical_load: float / list[ float ]
+
+    :param cycles: List of cycle numbers where new load parameters are
+                   specified (increasing).
+    :type cycles: list[ int ]
+
+    :param speed: The linear speed of the wheel
+    :type speed: float / list[ float ]
+
+    :param slip: The slip ratio of the rolling
+    :type slip: float / list[ float ]
+
+    :param rail_ext: The rail extension length
+    :type rail_ext: float / list[ float ]
+
+    :param ramp: Should the values be linearly interpolated between
+                 the cycles in `cycles`?
+    :type ramp: bool
+
+    """
+
+    parameters = ['vertical_load', 'speed', 'slip', 'rail_ext']
+
+    def __init__(self, vertical_load, cycles=[1], speed=1.0, slip=0.0, rail_ext=0.0,
+                 ramp=False):
+        self.cycles = np.array(cycles, dtype=int).reshape(-1)
+        if np.any(np.diff(self.cycles) <= 0):
+            raise ValueError('The cycles for the load parameters must be increasing')
+        self.ramp = ramp
+        self.values = {}
+        for name, value in zip(self.parameters, [vertical_load, speed, slip, rail_ext]):
+            value = np.array(value, dtype=float).reshape(-1)
+            if len(value) == 1:
+                value = value*np.ones(len(self.cycles))
+            elif len(value) != len(self.cycles):
+                raise ValueError(name + ' should be scalar or have the same length as cycles')
+            self.values[name] = value
+
+    @classmethod
+    def from_settings(cls, loading_param):
+        """Create the load schedule from the loading settings, see
+        :py:func:`rollover.three_d.utils.loading.setup`. Other settings
+        are ignored.
+
+        :param loading_param: The loading settings
+        :type loading_param: dict
+
+        :returns: The load schedule
+        :rtype: LoadSchedule
+
+        """
+        keys = cls.parameters + ['cycles', 'ramp']
+        return cls(**dict([(key, loading_param[key]) for key in keys if key in loading_param]))
+
+    def get(self, cycle_nrs, name):
+        """Get the value of the parameter `name` for each cycle in
+        `cycle_nrs`
+
+        :param cycle_nrs: The cycle numbers
+        :type cycle_nrs: int / np.array( int )
+
+        :param name: The parameter name, one of `parameters`
+        :type name: str
+
+        :returns: The value for each cycle in `cycle_nrs`
+        :rtype: float / np.array( float )
+
+        """
+        values = self.values[name]
+        if self.ramp:
+            return np.interp(cycle_nrs, self.cycles, values)
+        inds = np.searchsorted(self.cycles, cycle_nrs, side='right') - 1
+        return values[np.maximum(inds, 0)]
+
+    def get_loading_file_cycles(self):
+        """Get the cycles for which the parameters change, and should be
+        written to the loading file. Without ramps, these are the cycles
+        in `cycles`. With ramps, each cycle between the cycles in
+        `cycles` are included if any parameter in the loading file
+        (i.e. not the vertical load) changes.
+
+        :returns: The cycle numbers
+        :rtype: np.array( int )
+
+        """
+        if not self.ramp:
+            return self.cycles
+        changes = np.zeros(len(self.cycles) - 1, dtype=bool)
+        for name in ['speed', 'slip', 'rail_ext']:
+            changes = np.logical_or(changes, np.diff(self.values[name]) != 0)
+        ramp_cycles = [np.arange(self.cycles[i], self.cycles[i + 1])
+                       for i in np.flatnonzero(changes)]
+        return np.unique(np.concatenate([self.cycles] + ramp_cycles))
+
+    def write_loading_file(self, initial_depression_speed, rolling_length, rolling_radius,
+                           file_name=names.loading_file):
+        """Write the loading file, `names.loading_file`, used by the user
+        subroutine DISP.
+
+        :param initial_depression_speed: The speed at which the wheel is
+                                         lowered during the initial
+                                         depression step
+        :type initial_depression_speed: float
+
+        :param rolling_length: The length the wheel shall roll (not
+                               accounting for rail extensions)
+        :type rolling_length: float
+
+        :param rolling_radius: The rolling radius used to calculate
+                               wheel rotation as function of slip.
+        :type rolling_radius: float
+
+        :param file_name: Path to the loading file
+        :type file_name: str
+
+        :returns: None
+        :rtype: None
+
+        """
+        file_cycles = self.get_loading_file_cycles()
+        rolling_time = rolling_length/self.get(file_cycles, 'speed')
+        rot_per_length = (1 + self.get(file_cycles, 'slip'))/rolling_radius
+        rail_ext = self.get(file_cycles, 'rail_ext')
+
+        with open(file_name, 'w') as fid:
+            fid.write('%25.15e\n' % (rolling_length))
+            fid.write('%25.15e\n' % (-initial_depression_speed))
+            fid.write('%0.0f\n' % (len(file_cycles)))
+            np.savetxt(fid, np.transpose([file_cycles, rolling_time, rot_per_length, rail_ext]),
+                       fmt=LOADING_FILE_FORMAT)
+
+    def write_binary_loading_file(self, initial_depression_speed, rolling_length,
+                                  rolling_radius, file_name=names.loading_binary_file):
+        """Write the binary loading file, `names.loading_binary_file`,
+        used by the user subroutine DISP instead of the text file if it
+        exists. The file starts with a 40 byte header (little endian)
+
+        - Magic bytes, :code:`LOADING_BINARY_MAGIC` (8 bytes)
+        - Format version (int32)
+        - Header size in bytes, i.e. offset to the data (int32)
+        - Number of cycles in the table, `num_cycles` (int32)
+        - Reserved, currently 0 (int32)
+        - Rolling length (float64)
+        - Initial depression speed, negative (float64)
+
+        followed by the rolling times, the rotations per length and the
+        rail extensions for the cycles 1 to `num_cycles` (float64). As
+        the parameters are constant after the last cycle in `cycles`,
+        this is `num_cycles`.
+
+        See :py:meth:`write_loading_file` for a description of the
+        parameters.
+
+        """
+        file_cycles = np.arange(1, max(self.cycles[-1], 1) + 1)
+        rolling_time = rolling_length/self.get(file_cycles, 'speed')
+        rot_per_length = (1 + self.get(file_cycles, 'slip'))/rolling_radius
+        rail_ext = self.get(file_cycles, 'rail_ext')
+
+        header = struct.pack(LOADING_BINARY_HEADER_FORMAT, LOADING_BINARY_MAGIC,
+                             LOADING_BINARY_VERSION, LOADING_BINARY_HEADER_SIZE,
+                             len(file_cycles), 0, rolling_length, -initial_depression_speed)
+        with open(file_name, 'wb') as fid:
+            fid.write(header)
+            np.concatenate((rolling_time, rot_per_length, rail_ext)).astype('<f8').tofile(fid)
+
+
+def read_binary_loading_file(file_name=names.loading_binary_file):
+    """Read the binary loading file written by
+    :py:meth:`LoadSchedule.write_binary_loading_file`
+
+    :param file_name: Path to the binary loading file
+    :type file_name: str
+
+    :returns: The rail (rolling) length, the initial depression speed,
+              and the rolling time, rotation per length and rail
+              extension for each cycle in the table [num_cycles, 3]
+    :rtype: tuple( float, float, np.array )
+
+    """
+
+    with open(file_name, 'rb') as fid:
+        header = struct.unpack(LOADING_BINARY_HEADER_FORMAT,
+                               fid.read(LOADING_BINARY_HEADER_SIZE))
+        magic, version, header_size, num_cycles, _, rolling_length, depression_speed = header
+        if magic != LOADING_BINARY_MAGIC:
+            raise ValueError(file_name + ' is not a binary loading file')
+        elif version > LOADING_BINARY_VERSION:
+            raise ValueError('Unsupported binary loading file version: ' + str(version))
+        fid.seek(header_size)
+        table = np.fromfile(fid, dtype='<f8', count=3*num_cycles)
+    return rolling_length, -depression_speed, table.reshape((3, num_cycles)).transpose()
+
+
+def write_loading_file(initial_depression_speed, rolling_length, rolling_radius,
+                       cycles, load, speed, slip, rail_ext, file_name=names.loading_file):
+    """Write the loading file, `names.loading_file`, used by the user
+    subroutine DISP, see :py:meth:`LoadSchedule.write_loading_file`.
+
+    :param initial_depression_speed: The speed at which the wheel is
+                                     lowered during the initial
+                                     depression step
+    :type initial_depression_speed: float
+
+    :param rolling_length: The length the wheel shall roll (not
+                           accounting for rail extensions)
+    :type rolling_length: float
+
+    :param rolling_radius: The rolling radius used to calculate wheel
+                           rotation as function of slip.
+    :type rolling_radius: float
+
+    :param cycles: List of cycle numbers where new load parameters are
+                   specified.
+    :type cycles: list[ int ]
+
+    :param load: List of vertical wheel loads for each cycle in cycles.
+    :type load: list[ float ]
+
+    :param speed: List of linear wheel speeds for each cycle in cycles.
+    :type speed: list[ float ]
+
+    :param slip: List of wheel slips for each cycle in cycles.
+    :type slip: float / list[ float ]
+
+    :param rail_ext: List of rail extension length for each cycle in
+                     cycles.
+    :type rail_ext: list[ float ]
+
+    :param file_name: Path to the loading file
+    :type file_name: str
+
+    :returns: None
+    :rtype: None
+
+    """
+
+    schedule = LoadSchedule(load, cycles, speed, slip, rail_ext)
+    schedule.write_loading_file(initial_depression_speed, rolling_length, rolling_radius,
+                                file_name)
@@ -5,19 +5,23 @@ from abaqusConstants import *
 import step, load
 
 from rollover.utils import naming_mod as names
+from rollover.three_d.utils.load_param import LoadSchedule
 
 
 def setup(the_model, rolling_length, rolling_radius, vertical_load, 
           cycles=[1], speed=1.0, slip=0.0, rail_ext=0.0, num_cycles=1, 
           initial_depression=0.1, inbetween_step_time=1.e-6, inbetween_max_incr=100,
-          max_incr=1000, min_incr=100):
+          max_incr=1000, min_incr=100, cae_cycles=None, ramp=False):
     """Setup the loading for the rollover simulation
     
     "cycle data type": If value is scalar, the same value will be 
                        applied to all cycles. If list, it should have 
                        the same length as `cycles`, and the value will 
                        be applied from the corresponding cycle and 
-                       onwards.
+                       onwards. If `ramp` is True, the values are 
+                       instead linearly interpolated between the 
+                       cycles in `cycles`, see 
+                       :py:class:`rollover.three_d.utils.load_param.LoadSchedule`
     
     :param the_model: The model to which the contact settings should be
                       applied
@@ -70,21 +74,27 @@ def setup(the_model, rolling_length, rolling_radius, vertical_load,
     :param min_incr: Min number of increments during the rolling step
     :type min_incr: int
     
+    :param cae_cycles: Number of cycles to create in CAE. The steps for
+                       the remaining cycles are appended to the input 
+                       file by 
+                       :py:func:`rollover.three_d.utils.step_template.append_cycles`.
+                       If None (default), all cycles are created in CAE.
+    :type cae_cycles: int
     
-    :returns: Number of cycles used
+    :param ramp: Should the load parameters be linearly interpolated 
+                 between the cycles in `cycles`? See "cycle data type".
+    :type ramp: bool
+    
+    :returns: Number of cycles created in CAE
     :rtype: int
     
     """
     
-    # Change floats to lists
-    vertical_load = [vertical_load] if isinstance(vertical_load, (int, float)) else vertical_load
-    speed = [speed] if isinstance(speed, (int, float)) else speed
-    slip = [slip] if isinstance(slip, (int, float)) else slip
-    rail_ext = [rail_ext] if isinstance(rail_ext, (int, float)) else rail_ext
+    schedule = LoadSchedule(vertical_load, cycles, speed, slip, rail_ext, ramp)
     
-    # Write loading file
-    write_loading_file(initial_depression/inbetween_step_time, rolling_length, 
-                       rolling_radius, cycles, vertical_load, speed, slip, rail_ext)
+    # Write loading files
+    for write_file in [schedule.write_loading_file, schedule.write_binary_loading_file]:
+        write_file(initial_depression/inbetween_step_time, rolling_length, rolling_radius)
     
     # Check if rail substructure is used
     use_rail_substructure = names.rail_substructure in the_model.parts.keys()
@@ -166,15 +176,19 @@ def setup(the_model, rolling_length, rolling_radius, vertical_load,
     wheel_rp_fz = the_model.ConcentratedForce(name=names.wheel_vert_load, 
                                               createStepName=step_name, 
                                               region=wheel_rp, 
-                                              cf2=-vertical_load[0])
+                                              cf2=-float(schedule.get(1, 'vertical_load')))
     
     wheel_rp_bc.setValuesInStep(stepName=step_name, u2=FREED)
     
     # Setup the remaining steps
-    for cycle_nr in range(1, num_cycles+1):
+    if cae_cycles is not None:
+        num_cycles = min(num_cycles, cae_cycles)
+    cycle_nrs = np.arange(1, num_cycles+1)
+    # Abaqus requires python floats
+    step_times = (rolling_length/schedule.get(cycle_nrs, 'speed')).tolist()
+    vertical_loads = schedule.get(cycle_nrs, 'vertical_load').tolist()
+    for cycle_nr, step_time, fz in zip(cycle_nrs.tolist(), step_times, vertical_loads):
         # 1: ROLLING STEP ----------------------------------------------
-        fz, v = get_cycle_data(cycle_nr, cycles, [vertical_load, speed])
-        step_time = rolling_length/v
         new_step_name = names.get_step_rolling(cycle_nr)
         step_name = setup_step(the_model, new_step_name, step_name,
                                step_time, min_incr, max_incr)
@@ -227,87 +241,6 @@ def setup(the_model, rolling_length, rolling_radius, vertical_load,
     return num_cycles
 
 
-def write_loading_file(initial_depression_speed, rolling_length, rolling_radius,
-                       cycles, load, speed, slip, rail_ext):
-    """Write the loading file, `names.loading_file`, used by the user 
-    subroutine DISP.
-    
-    :param initial_depression_speed: The speed at which the wheel is 
-                                     lowered during the initial 
-                                     depression step
-    :type initial_depression_speed: float
-    
-    :param rolling_length: The length the wheel shall roll (not 
-                           accounting for rail extensions)
-    :type rolling_length: float
-    
-    :param rolling_radius: The rolling radius used to calculate wheel 
-                           rotation as function of slip.
-    :type rolling_radius: float
-    
-    :param cycles: List of cycle numbers where new load parameters are
-                   specified.
-    :type cycles: list[ int ]
-    
-    :param load: List of vertical wheel loads for each cycle in cycles.
-    :type load: list[ float ]
-    
-    :param speed: List of linear wheel speeds for each cycle in cycles.
-    :type speed: list[ float ]
-    
-    :param slip: List of wheel slips for each cycle in cycles.
-    :type slip: float / list[ float ]
-    
-    :param rail_ext: List of rail extension length for each cycle in 
-                     cycles.
-    :type rail_ext: list[ float ]
-    
-    :returns: None
-    :rtype: None
-    
-    """
-    
-    with open(names.loading_file, 'w') as fid:
-        fid.write('%25.15e\n' % (rolling_length))
-        fid.write('%25.15e\n' % (-initial_depression_speed))
-        fid.write('%0.0f\n' % (len(cycles)))
-        for c, v, s, rext in zip(cycles, speed, slip, rail_ext):
-            rolling_time = rolling_length/v
-            rot_per_length = (1+s)/rolling_radius
-            fid.write(('%0.0f' + 3*', %25.15e' + '\n') % (c, rolling_time, rot_per_length, rext))
-    
-    
-def get_cycle_data(cycle_nr, cycles, cycle_data):
-    """ Given a list of cycle data, give the relevant data for 
-    `cycle_nr`
-    
-    :param cycle_nr: The cycle number for which the cycle data should be 
-                     extracted
-    :type cycle_nr: int
-    
-    :param cycles: List of cycles for which the items in cycle data are
-                   specified for.
-    :type cycles: list[ int ]
-    
-    :param cycle_data: List of cycle data. 
-    
-                       Each cycle data is a list with the same length as
-                       cycles.
-    :type cycle_data: list[ list [float/int] ]
-    
-    :returns: A list containing the items in each list in cycle data on 
-              the position `i` in cycle_nr before `cycle_nr < cycles[i]`
-    :rtype: list[ float/int ]
-    
-    """
-    search_cycles = cycles[:]
-    search_cycles.append(np.iinfo(np.int).max)  # Append max int possible
-    
-    ind = np.argmax(cycle_nr < np.array(search_cycles))-1
-    
-    return [data[ind] for data in cycle_data]
-
-    
 def setup_step(the_model, name, prev_name, step_time, min_num, max_num, amp=step.RAMP):
     """
 
@@ -1,8 +1,11 @@
-"""This module is used to control the output to the Abaqus result 
-(`.fil`) file
+"""This module is used to control the field output to the Abaqus 
+output database (`.odb`) file. The output requests can either be 
+created in cae, see :py:func:`add`, or be written directly to the input
+file, see :py:func:`add_to_inp`. The latter is much faster for many 
+cycles, and gives the same output requests in each step. 
 
-.. note:: Uses direct editing of input and should be called after all
-          cae options have been set.
+.. note:: :py:func:`add_to_inp` uses direct editing of input and should
+          be called after all cae options have been set.
 
 .. codeauthor:: Knut Andreas Meyer
 """
@@ -54,11 +57,7 @@ def add(the_model, field_output_requests, num_cycles):
     wheel_inst = assy.instances[names.wheel_inst]
     rail_inst = assy.instances[names.rail_inst]
     
-    # Delete default outputs
-    for fo in the_model.fieldOutputRequests.keys():
-        del the_model.fieldOutputRequests[fo]
-    for ho in the_model.historyOutputRequests.keys():
-        del the_model.historyOutputRequests[ho]
+    delete_default_requests(the_model)
 
     # Add user specified outputs
     for foname in field_output_requests:
@@ -91,4 +90,234 @@ def add(the_model, field_output_requests, num_cycles):
                     pass    # This is ok if it is the last cycle, then no subsequent step exists
                 
                 prev_step_active = names.get_step_rolling(cnr)
-                prev_step_deactive = names.get_step_return(cnr+1)
\ No newline at end of file
+                prev_step_deactive = names.get_step_return(cnr+1)
+
+
+# Variables written with *Node Output and *Contact Output, all other
+# variables are written with *Element Output
+NODE_OUTPUT_VARIABLES = ['U', 'UT', 'UR', 'V', 'VT', 'VR', 'A', 'AT', 'AR', 'RF', 'RT', 'RM', 
+                         'CF', 'TF', 'VF', 'COORD', 'NT']
+CONTACT_OUTPUT_VARIABLES = ['CSTRESS', 'CDISP', 'CFORCE', 'CNAREA', 'CSTATUS']
+
+# Frequency written by cae for output at the last increment
+LAST_INCREMENT_FREQUENCY = 99999
+
+
+def delete_default_requests(the_model):
+    """Delete the default field and history output requests
+    
+    :param the_model: The model from which the requests are deleted
+    :type the_model: Model object (Abaqus)
+    
+    :returns: None
+    :rtype: None
+    
+    """
+    for fo in the_model.fieldOutputRequests.keys():
+        del the_model.fieldOutputRequests[fo]
+    for ho in the_model.historyOutputRequests.keys():
+        del the_model.historyOutputRequests[ho]
+    
+    
+def add_to_inp(the_model, field_output_requests, num_cycles):
+    """Add the user specified field output requests by writing the 
+    `*Output, field` keywords directly to the input file. The output 
+    requests are the same as created by :py:func:`add`, but each step 
+    is only edited once, and all steps in one pass. The default output 
+    requests should be deleted before, see 
+    :py:func:`delete_default_requests`.
+    
+    :param the_model: The model to which the output requests will be 
+                      added
+    :type the_model: Model object (Abaqus)
+    
+    :param field_output_requests: A dictionary with field output 
+                                  request specifications, see 
+                                  :py:func:`add`
+    :type field_output_requests: dict
+    
+    :param num_cycles: Number of rollover cycles created in cae
+    :type num_cycles: int
+    
+    :returns: None
+    :rtype: None
+    
+    """
+    
+    assy = the_model.rootAssembly
+    if assy.isOutOfDate:
+        assy.regenerate()
+    
+    editor = inp_edit.KeywordBlockEditor(the_model.keywordBlock)
+    use_substr = names.rail_substructure in the_model.parts.keys()
+    
+    for step_name, requests in get_changed_requests(field_output_requests, num_cycles):
+        add_str = get_step_output_str(requests, field_output_requests, use_substr)
+        editor.add_at_end_of_cat(add_str, category='Step', name=step_name)
+    editor.apply()
+        
+        
+def get_step_names(num_cycles):
+    """Get the names of the steps created in cae, in order, see 
+    :py:func:`rollover.three_d.utils.loading.setup`. Each cycle 
+    consists of the rolling step followed by the return, reapply and 
+    release steps (named by the next cycle number), also for the last
+    cycle.
+    
+    :param num_cycles: Number of rollover cycles created in cae
+    :type num_cycles: int
+    
+    :returns: The step names
+    :rtype: list[ str ]
+    
+    """
+    step_names = [names.step1, names.step2]
+    for cycle_nr in range(1, num_cycles + 1):
+        step_names.extend([names.get_step_rolling(cycle_nr), 
+                           names.get_step_return(cycle_nr + 1), 
+                           names.get_step_reapply(cycle_nr + 1),
+                           names.get_step_release(cycle_nr + 1)])
+    return step_names
+    
+    
+def get_active_requests(field_output_requests, num_cycles):
+    """Get the active output requests in each step, as created by 
+    :py:func:`add`: Requests with `cycle` = 1 are active in all steps. 
+    Otherwise, the request is active until the end of the first rolling
+    step, and a copy named by the request name and the cycle number is
+    active in the rolling step of every `cycle` cycle thereafter.
+    
+    :param field_output_requests: The field output request 
+                                  specifications, see :py:func:`add`
+    :type field_output_requests: dict
+    
+    :param num_cycles: Number of rollover cycles created in cae
+    :type num_cycles: int
+    
+    :returns: List of `(step_name, requests)`, where `requests` is a 
+              list of `(name, foname)` for each active request. `name`
+              is the name of the request in cae and `foname` the key
+              in `field_output_requests`.
+    :rtype: list[ tuple ]
+    
+    """
+    
+    step_names = get_step_names(num_cycles)
+    active_requests = [(step_name, []) for step_name in step_names]
+    
+    first_cycle_steps = 3   # Preload, loading and rolling step in cycle 1
+    for foname in sorted(field_output_requests):
+        cycle = field_output_requests[foname]['cycle']
+        if cycle > 1:
+            for step_name, requests in active_requests[:first_cycle_steps]:
+                requests.append((foname, foname))
+            for cnr in range(1, num_cycles + 1, cycle)[1:]:
+                step_ind = step_names.index(names.get_step_rolling(cnr))
+                active_requests[step_ind][1].append((foname + names.cycle_str(cnr), foname))
+        else:
+            for step_name, requests in active_requests:
+                requests.append((foname, foname))
+    
+    return active_requests
+    
+    
+def get_changed_requests(field_output_requests, num_cycles):
+    """Get the steps in which the active output requests change, 
+    see :py:func:`get_active_requests`. As output requests are 
+    propagated to subsequent steps, the output requests only need to be
+    written to these steps.
+    
+    :returns: List of `(step_name, requests)`, see 
+              :py:func:`get_active_requests`
+    :rtype: list[ tuple ]
+    
+    """
+    changed_requests = []
+    prev_requests = []
+    for step_name, requests in get_active_requests(field_output_requests, num_cycles):
+        if requests != prev_requests:
+            changed_requests.append((step_name, requests))
+        prev_requests = requests
+    return changed_requests
+    
+    
+def get_step_output_str(requests, field_output_requests, use_substr=False):
+    """Get the string with the output requests to add to a step. Output
+    requests defined in previous steps are replaced (`op=NEW`), and all
+    output is deactivated if `requests` is empty.
+    
+    :param requests: List of `(name, foname)` for each request, see 
+                     :py:func:`get_active_requests`
+    :type requests: list[ tuple ]
+    
+    :param field_output_requests: The field output request 
+                                  specifications, see :py:func:`add`
+    :type field_output_requests: dict
+    
+    :param use_substr: Is a rail substructure used?
+    :type use_substr: bool
+    
+    :returns: The string to add
+    :rtype: str
+    
+    """
+    if len(requests) == 0:
+        return '*Output, field, op=NEW, frequency=0'
+    
+    sep = '_' if use_substr else '.'
+    lines = []
+    for i, (name, foname) in enumerate(requests):
+        fout = field_output_requests[foname]
+        if fout['set'] == 'FULL_MODEL':
+            set_name = None
+        elif fout['set'] == 'WHEEL_RP':
+            set_name = names.wheel_inst + sep + names.wheel_rp_set
+        else:
+            set_name = names.rail_inst + sep + fout['set']
+        
+        output_line = '*Output, field'
+        if i == 0:
+            output_line = output_line + ', op=NEW'
+        if fout['freq'] == -1:
+            output_line = output_line + ', frequency=%0.0f' % LAST_INCREMENT_FREQUENCY
+        elif fout['freq'] != 1:
+            output_line = output_line + ', frequency=%0.0f' % fout['freq']
+        
+        lines.extend(['** ', '** FIELD OUTPUT: ' + name, '** ', output_line])
+        lines.extend(get_variable_lines(fout['var'], set_name))
+        
+    return '\n'.join(lines)
+    
+    
+def get_variable_lines(variables, set_name=None):
+    """Get the lines specifying the node, element and contact output
+    variables for an output request
+    
+    :param variables: The variables to output
+    :type variables: list[ str ]
+    
+    :param set_name: The set name, including the instance name. None 
+                     for output for the full model.
+    :type set_name: str
+    
+    :returns: The lines to add
+    :rtype: list[ str ]
+    
+    """
+    node_vars = [var for var in variables if var in NODE_OUTPUT_VARIABLES]
+    contact_vars = [var for var in variables if var in CONTACT_OUTPUT_VARIABLES]
+    elem_vars = [var for var in variables 
+                 if var not in NODE_OUTPUT_VARIABLES + CONTACT_OUTPUT_VARIABLES]
+    
+    lines = []
+    if len(node_vars) > 0:
+        lines.append('*Node Output' + ('' if set_name is None else ', nset=' + set_name))
+        lines.append(', '.join(node_vars))
+    if len(elem_vars) > 0:
+        lines.append('*Element Output' + ('' if set_name is None else ', elset=' + set_name)
+                     + ', directions=YES')
+        lines.append(', '.join(elem_vars))
+    if len(contact_vars) > 0:
+        lines.append('*Contact Output')
+        lines.append(', '.join(contact_vars))
+    return lines
@@ -0,0 +1,526 @@
+"""Run a long rollover simulation as a sequence of Abaqus jobs (chunks)
+with `chunk_cycles` cycles each, using Abaqus restart. This bounds the
+size of the input file, the memory usage and the size of each `.odb`
+file, and allows multi-day runs to continue from the last completed
+chunk if a job fails or the computer is restarted.
+
+- The first chunk is the input file written by CAE, cut or extended to
+  `chunk_cycles` cycles.
+- The following chunks are restart input files (`*Restart, read`),
+  containing only the steps for their cycles. They are generated from
+  the cycle templates in the input file, see
+  :py:mod:`rollover.three_d.utils.step_template`.
+- Restart data is written (`RESTART_WRITE`) only in the last step of
+  each chunk (a release step), and each chunk continues from the end of
+  that step in the previous chunk's job (`oldjob`).
+- The user subroutines save their loading state after each rolling
+  step (:file:`load_state.txt`). This file is saved for each completed
+  chunk and copied back before the next chunk is run, together with
+  the loading file and the reference point coordinates that must be in
+  the working directory. The first rolling step of each restarted
+  chunk writes the node coordinates to the :file:`.fil` file, as the
+  contact node mesh is set up from these.
+- The progress is saved in `names.chunk_state_file`. When the driver
+  is run again, completed chunks are skipped.
+
+The solver is given as a function, :py:func:`run_abaqus` runs Abaqus
+and :py:func:`run_stand_in` can be used to test the chunking without
+Abaqus.
+
+This module does not depend on Abaqus.
+
+.. codeauthor:: Knut Andreas Meyer
+"""
+
+from __future__ import print_function
+import os, shutil, json
+
+from rollover.utils import naming_mod as names
+from rollover.three_d.utils import step_template
+
+RESTART_WRITE = '*Restart, write, overlay, number interval=1, time marks=NO'
+COMPLETED_MESSAGE = 'THE ANALYSIS HAS COMPLETED SUCCESSFULLY'
+REQUIRED_FILES = [names.loading_file, names.rp_coord_file]
+NUM_INITIAL_STEPS = 2   # Steps before the first rolling step
+NUM_STEPS_PER_CYCLE = 4
+
+
+def run_chunks(inp_file, chunk_cycles, loading_param, solver=None, job=names.job,
+               num_template_cycles=None):
+    """Run the rollover simulation in `inp_file` as chunks of
+    `chunk_cycles` cycles, until `loading_param['num_cycles']` cycles
+    have been simulated. Completed chunks (according to
+    `names.chunk_state_file`) are not run again.
+
+    :param inp_file: The input file written by CAE, containing the
+                     model and at least 2 cycles
+    :type inp_file: str
+
+    :param chunk_cycles: Number of cycles per chunk
+    :type chunk_cycles: int
+
+    :param loading_param: The loading settings, see
+                          :py:func:`rollover.three_d.utils.loading.setup`
+    :type loading_param: dict
+
+    :param solver: Function to run a job, called as
+                   `solver(job_name, oldjob_name)`, returning True if
+                   successful. `oldjob_name` is None for the first
+                   chunk. Defaults to :py:func:`run_abaqus`.
+    :type solver: function
+
+    :param job: Base name of the chunk jobs, see :py:func:`get_chunk_job`
+    :type job: str
+
+    :param num_template_cycles: Number of cycles in `inp_file` to use as
+                                templates, see
+                                :py:func:`rollover.three_d.utils.step_template.read_templates`.
+                                Defaults to `loading_param['cae_cycles']`,
+                                or all cycles in `inp_file` if not
+                                given.
+    :type num_template_cycles: int
+
+    :returns: True if all chunks completed successfully
+    :rtype: bool
+
+    """
+    if solver is None:
+        solver = run_abaqus
+    if num_template_cycles is None:
+        num_template_cycles = loading_param.get('cae_cycles', None)
+
+    for file_name in REQUIRED_FILES:
+        if not os.path.exists(file_name):
+            raise IOError('The file ' + file_name + ' is required to run the simulation')
+
+    templates, load_set = step_template.read_templates(inp_file, num_template_cycles)
+    chunks = get_chunks(loading_param['num_cycles'], chunk_cycles)
+    num_completed = get_num_completed(job, chunks)
+
+    for chunk_nr in range(num_completed + 1, len(chunks) + 1):
+        first_cycle, last_cycle = chunks[chunk_nr - 1]
+        chunk_job = get_chunk_job(job, chunk_nr)
+        if chunk_nr == 1:
+            oldjob = None
+            write_first_chunk(inp_file, chunk_job + '.inp', last_cycle, templates, load_set,
+                              loading_param)
+        else:
+            oldjob = get_chunk_job(job, chunk_nr - 1)
+            shutil.copy(get_load_state_file(oldjob), names.load_state_file)
+            write_restart_chunk(chunk_job + '.inp', first_cycle, last_cycle, templates,
+                                load_set, loading_param)
+
+        print('Running ' + chunk_job + ' (cycles ' + str(first_cycle) + ' to '
+              + str(last_cycle) + ')')
+        if not solver(chunk_job, oldjob):
+            print(chunk_job + ' failed, rerun to continue from the last completed chunk')
+            return False
+
+        shutil.copy(names.load_state_file, get_load_state_file(chunk_job))
+        save_chunk_state(job, chunks, chunk_nr)
+
+    return True
+
+
+def get_chunks(num_cycles, chunk_cycles):
+    """Get the first and last cycle of each chunk
+
+    :param num_cycles: Total number of cycles
+    :type num_cycles: int
+
+    :param chunk_cycles: Number of cycles per chunk (the last chunk may
+                         have fewer cycles)
+    :type chunk_cycles: int
+
+    :returns: `[first_cycle, last_cycle]` for each chunk
+    :rtype: list[ list[ int ] ]
+
+    """
+    if chunk_cycles < 1:
+        raise ValueError('At least 1 cycle per chunk is required')
+    return [[first, min(first + chunk_cycles - 1, num_cycles)]
+            for first in range(1, num_cycles + 1, chunk_cycles)]
+
+
+def get_chunk_job(job, chunk_nr):
+    """Get the job name for chunk number `chunk_nr`
+
+    :param job: The base job name
+    :type job: str
+
+    :param chunk_nr: The chunk number, starting at 1
+    :type chunk_nr: int
+
+    :returns: The job name
+    :rtype: str
+
+    """
+    return job + '_chunk_' + str(chunk_nr).zfill(4)
+
+
+def get_load_state_file(chunk_job):
+    # The load state file saved after chunk_job completed
+    return chunk_job + '_' + names.load_state_file
+
+
+def get_last_step_nr(cycle_nr):
+    """Get the step number of the last step in cycle `cycle_nr` (the
+    release step before the rolling step in cycle `cycle_nr+1`), see
+    also :file:`usub/step_type_mod.f90`
+
+    :param cycle_nr: The cycle number
+    :type cycle_nr: int
+
+    :returns: The step number
+    :rtype: int
+
+    """
+    return NUM_INITIAL_STEPS + NUM_STEPS_PER_CYCLE*cycle_nr
+
+
+def get_num_completed(job, chunks):
+    """Get the number of completed chunks from `names.chunk_state_file`.
+    If it was created for other chunks, all chunks are considered
+    incomplete.
+
+    :param job: The base job name
+    :type job: str
+
+    :param chunks: The chunks, see :py:func:`get_chunks`
+    :type chunks: list[ list[ int ] ]
+
+    :returns: The number of completed chunks
+    :rtype: int
+
+    """
+    if not os.path.exists(names.chunk_state_file):
+        return 0
+    with open(names.chunk_state_file, 'r') as fid:
+        state = json.load(fid)
+    if state['job'] != job or state['chunks'][:state['completed']] != chunks[:state['completed']]:
+        print('Existing ' + names.chunk_state_file + ' is for other chunks, starting over')
+        return 0
+    return state['completed']
+
+
+def save_chunk_state(job, chunks, num_completed):
+    # Write to a temporary file first, such that the state file is
+    # always complete.
+    tmp_file = names.chunk_state_file + '.tmp'
+    with open(tmp_file, 'w') as fid:
+        json.dump({'job': job, 'chunks': chunks, 'completed': num_completed}, fid, indent=1)
+    if os.path.exists(names.chunk_state_file):
+        os.remove(names.chunk_state_file)
+    os.rename(tmp_file, names.chunk_state_file)
+
+
+def write_first_chunk(inp_file, chunk_inp_file, last_cycle, templates, load_set,
+                      loading_param):
+    """Write the input file for the first chunk, containing the cycles
+    1 to `last_cycle`. The lines in `inp_file` are copied until the
+    step `rolling_<last_cycle+1>`, and missing cycles are added from
+    `templates`. Restart data is written in the last step.
+
+    :param inp_file: The input file written by CAE
+    :type inp_file: str
+
+    :param chunk_inp_file: The input file to write
+    :type chunk_inp_file: str
+
+    :param last_cycle: The last cycle in the chunk
+    :type last_cycle: int
+
+    :param templates: The cycle templates, see
+                      :py:func:`rollover.three_d.utils.step_template.read_templates`
+    :type templates: list[ dict ]
+
+    :param load_set: The node set of the vertical wheel load
+    :type load_set: str
+
+    :param loading_param: The loading settings
+    :type loading_param: dict
+
+    :returns: None
+    :rtype: None
+
+    """
+    end_step = '*Step, name=' + names.get_step_rolling(last_cycle + 1) + ','
+    last_step = '*Step, name=' + names.get_step_release(last_cycle + 1) + ','
+    num_cycles = 0
+    in_last_step = False
+    with open(inp_file, 'r') as fid_in:
+        with open(chunk_inp_file, 'w', step_template.WRITE_BUFFER_SIZE) as fid:
+            for line in fid_in:
+                if line.startswith(end_step):
+                    break
+                if line.startswith('*Step, name=rolling_'):
+                    num_cycles += 1
+                in_last_step = in_last_step or line.startswith(last_step)
+                if in_last_step and line.lower().startswith('*restart'):
+                    line = RESTART_WRITE + '\n'
+                fid.write(line)
+
+    if num_cycles < last_cycle:
+        with open(chunk_inp_file, 'a', step_template.WRITE_BUFFER_SIZE) as fid:
+            fid.write('\n')
+            write_cycles(fid, num_cycles + 1, last_cycle, templates, load_set, loading_param)
+
+
+def write_restart_chunk(chunk_inp_file, first_cycle, last_cycle, templates, load_set,
+                        loading_param):
+    """Write the restart input file for the chunk with cycles
+    `first_cycle` to `last_cycle`, continuing from the end of cycle
+    `first_cycle-1`.
+
+    :param chunk_inp_file: The input file to write
+    :type chunk_inp_file: str
+
+    :param first_cycle: The first cycle in the chunk
+    :type first_cycle: int
+
+    :param last_cycle: The last cycle in the chunk
+    :type last_cycle: int
+
+    :param templates: The cycle templates, see
+                      :py:func:`rollover.three_d.utils.step_template.read_templates`
+    :type templates: list[ dict ]
+
+    :param load_set: The node set of the vertical wheel load
+    :type load_set: str
+
+    :param loading_param: The loading settings
+    :type loading_param: dict
+
+    :returns: None
+    :rtype: None
+
+    """
+    with open(chunk_inp_file, 'w', step_template.WRITE_BUFFER_SIZE) as fid:
+        fid.write('*Heading\n** Rollover cycles ' + str(first_cycle) + ' to '
+                  + str(last_cycle) + '\n')
+        fid.write('*Restart, read, step=%d\n' % get_last_step_nr(first_cycle - 1))
+        write_cycles(fid, first_cycle, last_cycle, templates, load_set, loading_param,
+                     coord_output=True)
+
+
+def write_cycles(fid, first_cycle, last_cycle, templates, load_set, loading_param,
+                 coord_output=False):
+    """Write the cycles `first_cycle` to `last_cycle` to `fid`, with
+    restart output in the last step.
+
+    :param fid: The opened input file
+    :type fid: file
+
+    :param first_cycle: The first cycle to write
+    :type first_cycle: int
+
+    :param last_cycle: The last cycle to write
+    :type last_cycle: int
+
+    :param templates: The cycle templates
+    :type templates: list[ dict ]
+
+    :param load_set: The node set of the vertical wheel load
+    :type load_set: str
+
+    :param loading_param: The loading settings
+    :type loading_param: dict
+
+    :param coord_output: Should the node coordinates be written to the
+                         .fil file in the first rolling step?
+    :type coord_output: bool
+
+    :returns: None
+    :rtype: None
+
+    """
+    cycle_nrs = range(first_cycle, last_cycle + 1)
+    static_lines, cload_lines = step_template.get_schedule_lines(cycle_nrs, load_set,
+                                                                 **loading_param)
+    for cycle_nr, static, cload in zip(cycle_nrs, static_lines, cload_lines):
+        cycle_str = step_template.format_cycle(templates, cycle_nr, static, cload)
+        if coord_output and cycle_nr == first_cycle:
+            cycle_str = set_coord_output(cycle_str)
+        if cycle_nr == last_cycle:
+            cycle_str = set_restart_write(cycle_str)
+        fid.write(cycle_str)
+
+
+def set_coord_output(cycle_str):
+    """Add node coordinates (COORD) to the `*Node file` output in the
+    first step in `cycle_str`
+
+    :param cycle_str: The steps for a cycle
+    :type cycle_str: str
+
+    :returns: The modified steps
+    :rtype: str
+
+    """
+    lines = cycle_str.split('\n')
+    keyword = None
+    for i, line in enumerate(lines):
+        if line.startswith('*'):
+            keyword = line.split(',')[0].strip().lower()
+            if keyword == '*end step':
+                break
+        elif keyword == '*node file' and 'COORD' not in line.upper():
+            lines[i] = 'COORD, ' + line
+    return '\n'.join(lines)
+
+
+def set_restart_write(cycle_str):
+    """Write restart data at the end of the last step in `cycle_str`
+
+    :param cycle_str: The steps for a cycle
+    :type cycle_str: str
+
+    :returns: The modified steps
+    :rtype: str
+
+    """
+    lines = cycle_str.split('\n')
+    last_step_ind = max([i for i, line in enumerate(lines) if line.startswith('*Step')])
+    restart_inds = [i for i, line in enumerate(lines)
+                    if i > last_step_ind and line.lower().startswith('*restart')]
+    if len(restart_inds) > 0:
+        for i in restart_inds:
+            lines[i] = RESTART_WRITE
+    else:
+        end_ind = max([i for i, line in enumerate(lines) if line.lower().startswith('*end step')])
+        lines.insert(end_ind, RESTART_WRITE)
+    return '\n'.join(lines)
+
+
+def is_completed(job):
+    """Check if the job completed successfully, according to its
+    status (:file:`.sta`) file
+
+    :param job: The job name
+    :type job: str
+
+    :returns: True if the job completed successfully
+    :rtype: bool
+
+    """
+    if not os.path.exists(job + '.sta'):
+        return False
+    with open(job + '.sta', 'r') as fid:
+        return COMPLETED_MESSAGE in fid.read()
+
+
+def run_abaqus(job, oldjob=None, abaqus_cmd='abaqus', user=None, cpus=1):
+    """Run an Abaqus job and wait for it to complete
+
+    :param job: The job name (input file without .inp)
+    :type job: str
+
+    :param oldjob: The job to restart from, None if not a restart
+    :type oldjob: str
+
+    :param abaqus_cmd: The command to run Abaqus
+    :type abaqus_cmd: str
+
+    :param user: The user subroutine object file, None if given in
+                 the abaqus environment file
+    :type user: str
+
+    :param cpus: Number of cpus to use
+    :type cpus: int
+
+    :returns: True if the job completed successfully
+    :rtype: bool
+
+    """
+    cmd = abaqus_cmd + ' job=' + job + ' cpus=' + str(cpus) + ' ask_delete=OFF interactive'
+    if oldjob is not None:
+        cmd = cmd + ' oldjob=' + oldjob
+    if user is not None:
+        cmd = cmd + ' user=' + user
+    os.system(cmd)
+    return is_completed(job)
+
+
+def run_stand_in(job, oldjob=None, fail_at_cycle=None):
+    """Stand-in for :py:func:`run_abaqus` to test the chunking without
+    Abaqus. The step names in the input file and the restart from
+    `oldjob` are checked. The rolling steps write the loading state
+    file, and a successful job writes a status file and, if requested
+    in the last step, a restart file (containing the last step number).
+
+    :param job: The job name (input file without .inp)
+    :type job: str
+
+    :param oldjob: The job to restart from, None if not a restart
+    :type oldjob: str
+
+    :param fail_at_cycle: Stop with failure at the rolling step of
+                          this cycle, to simulate a crash.
+    :type fail_at_cycle: int
+
+    :returns: True if the job completed successfully
+    :rtype: bool
+
+    """
+    with open(job + '.inp', 'r') as fid:
+        lines = [line.rstrip('\n') for line in fid if not line.startswith('**')]
+
+    restart_lines = [line for line in lines if line.lower().startswith('*restart, read')]
+    if len(restart_lines) > 0:
+        step_nr = int(restart_lines[0].split('step=')[1].split(',')[0])
+        with open(oldjob + '.res', 'r') as fid:
+            if json.load(fid)['last_step'] != step_nr:
+                raise ValueError(job + ' restarts from step ' + str(step_nr)
+                                 + ', which is not saved in ' + oldjob + '.res')
+        with open(names.load_state_file, 'r') as fid:
+            if int(fid.readline()) != (step_nr - NUM_INITIAL_STEPS)//NUM_STEPS_PER_CYCLE:
+                raise ValueError(names.load_state_file + ' does not match step ' + str(step_nr))
+    else:
+        step_nr = 0
+
+    restart_written = False
+    for line in lines:
+        if line.startswith('*Step'):
+            step_nr += 1
+            name = line.split('name=')[1].split(',')[0]
+            if name != get_step_name(step_nr):
+                raise ValueError('Step ' + str(step_nr) + ' in ' + job + ' is ' + name
+                                 + ', expected ' + get_step_name(step_nr))
+            restart_written = False
+            if name.startswith('rolling_'):
+                cycle_nr = int(name.split('_')[1])
+                if cycle_nr == fail_at_cycle:
+                    with open(job + '.sta', 'w') as fid:
+                        fid.write('THE ANALYSIS HAS NOT BEEN COMPLETED\n')
+                    return False
+                with open(names.load_state_file, 'w') as fid:
+                    fid.write(str(cycle_nr) + '\n')
+        elif line == RESTART_WRITE:
+            restart_written = True
+
+    if restart_written:
+        with open(job + '.res', 'w') as fid:
+            json.dump({'last_step': step_nr}, fid)
+    with open(job + '.sta', 'w') as fid:
+        fid.write(COMPLETED_MESSAGE + '\n')
+    return True
+
+
+def get_step_name(step_nr):
+    """Get the name of step number `step_nr`, see
+    :file:`usub/step_type_mod.f90`
+
+    :param step_nr: The step number, starting at 1
+    :type step_nr: int
+
+    :returns: The step name
+    :rtype: str
+
+    """
+    if step_nr <= NUM_INITIAL_STEPS:
+        return [names.step1, names.step2][step_nr - 1]
+    cycle_nr = (step_nr - NUM_INITIAL_STEPS - 1)//NUM_STEPS_PER_CYCLE + 1
+    step_type = (step_nr - NUM_INITIAL_STEPS - 1) % NUM_STEPS_PER_CYCLE
+    return [names.get_step_rolling(cycle_nr), names.get_step_return(cycle_nr + 1),
+            names.get_step_reapply(cycle_nr + 1),
+            names.get_step_release(cycle_nr + 1)][step_type]
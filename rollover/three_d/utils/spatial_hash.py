@@ -0,0 +1,235 @@
+"""Tolerance-aware spatial hashing of point coordinates, used to match
+points without comparing each point to all other points. The points
+are put in buckets on a grid with cell size equal to the tolerance, such
+that any match must be in the same or a neighbouring cell. The module
+only depends on numpy and can be used both from Abaqus python and from
+a regular python installation.
+
+Distances are measured in coordinates normalized by the tolerance,
+i.e. :code:`sum(((p - q)/tol)**2)`, and a point `q` matches `p` if this
+normalized squared distance is at most 1. Different tolerances can be
+given in each direction.
+
+.. codeauthor:: Knut Andreas Meyer
+"""
+
+from __future__ import print_function
+import itertools
+import numpy as np
+
+# Cells are slightly larger than the tolerance, such that round-off
+# cannot place a matching point outside the neighbouring cells.
+CELL_SCALE = 1.0 + 1.e-6
+
+
+class SpatialHash(object):
+    """Spatial hash of the points `points`, for finding the closest
+    point within the tolerance `tol` for many query points at once.
+
+    :param points: Coordinates of the points to put in the hash
+    :type points: np.array (shape = [npoints, ndim])
+
+    :param tol: Tolerance, either the same in all directions or one
+                value per direction.
+    :type tol: float / list[ float ]
+
+    """
+
+    def __init__(self, points, tol):
+        self.points = np.asarray(points, dtype=np.float64)
+        if self.points.ndim == 1:
+            self.points = self.points.reshape((-1, 1))
+        self.tol = np.ones(self.points.shape[1])*np.asarray(tol, dtype=np.float64)
+
+        # The cell indices occurring in each direction, used to number
+        # the cells compactly (avoiding integer overflow for small tol)
+        cells = self.get_cells(self.points)
+        self.cell_values = [np.unique(cells[:, i]) for i in range(cells.shape[1])]
+
+        keys, _ = self.get_keys(cells)
+        # Stable sort, such that points in the same cell keep their order
+        self.order = np.argsort(keys, kind='mergesort')
+        self.sorted_keys = keys[self.order]
+
+    def get_cells(self, points):
+        """Get the grid cell of each point
+
+        :param points: Coordinates of the points
+        :type points: np.array (shape = [npoints, ndim])
+
+        :returns: The cell indices in each direction
+        :rtype: np.array (shape = [npoints, ndim])
+
+        """
+        return np.floor(points/(self.tol*CELL_SCALE)).astype(np.int64)
+
+    def get_keys(self, cells):
+        """Get a single integer key for each cell
+
+        :param cells: The cell indices in each direction
+        :type cells: np.array (shape = [npoints, ndim])
+
+        :returns: The keys, and a mask telling which cells contain
+                  points. Keys for cells without points are -1.
+        :rtype: tuple( np.array, np.array )
+
+        """
+
+        keys = np.zeros(cells.shape[0], dtype=np.int64)
+        inside = np.ones(cells.shape[0], dtype=bool)
+        for values, cell_col in zip(self.cell_values, cells.transpose()):
+            pos = np.searchsorted(values, cell_col)
+            pos_valid = np.minimum(pos, max(values.size - 1, 0))
+            if values.size > 0:
+                inside = inside & (values[pos_valid] == cell_col)
+            else:
+                inside[:] = False
+            keys = keys*max(values.size, 1) + pos_valid
+        keys[np.logical_not(inside)] = -1
+        return keys, inside
+
+    def find_closest(self, query_points, lowest_index=False):
+        """Find the closest point in the hash for each query point,
+        considering only points within the tolerance. If multiple points
+        have the same distance, the one with the lowest index is chosen.
+
+        :param query_points: Coordinates of the points to find matches
+                             for.
+        :type query_points: np.array (shape = [nquery, ndim])
+
+        :param lowest_index: If True, the point with the lowest index
+                             within the tolerance is chosen instead of
+                             the closest point.
+        :type lowest_index: bool
+
+        :returns: The index of the closest point (-1 if no point within
+                  the tolerance), and the normalized squared distance to
+                  it (np.inf if no point within the tolerance)
+        :rtype: tuple( np.array, np.array )
+
+        """
+
+        query_points = np.asarray(query_points, dtype=np.float64)
+        if query_points.ndim == 1:
+            query_points = query_points.reshape((-1, self.points.shape[1]))
+        num_query = query_points.shape[0]
+        best_inds = -np.ones(num_query, dtype=np.intp)
+        best_dist2 = np.inf*np.ones(num_query)
+
+        query_cells = self.get_cells(query_points)
+        ndim = self.points.shape[1]
+        for offset in itertools.product([-1, 0, 1], repeat=ndim):
+            keys, _ = self.get_keys(query_cells + np.array(offset, dtype=np.int64))
+            first = np.searchsorted(self.sorted_keys, keys, side='left')
+            last = np.searchsorted(self.sorted_keys, keys, side='right')
+            num_in_cell = last - first
+            for k in range(np.max(num_in_cell) if num_query > 0 else 0):
+                qinds = np.nonzero(num_in_cell > k)[0]
+                pinds = self.order[first[qinds] + k]
+                dist2 = self.get_dist2(query_points[qinds], self.points[pinds])
+                if lowest_index:
+                    better = (dist2 <= 1.0) & ((best_inds[qinds] < 0)
+                                               | (pinds < best_inds[qinds]))
+                else:
+                    better = (dist2 <= 1.0) & ((dist2 < best_dist2[qinds])
+                                               | ((dist2 == best_dist2[qinds])
+                                                  & (pinds < best_inds[qinds])))
+                best_inds[qinds[better]] = pinds[better]
+                best_dist2[qinds[better]] = dist2[better]
+
+        return best_inds, best_dist2
+
+    def find_within(self, query_points):
+        """Find all pairs of query points and points in the hash within
+        the tolerance of each other.
+
+        :param query_points: Coordinates of the points to find matches
+                             for.
+        :type query_points: np.array (shape = [nquery, ndim])
+
+        :returns: The index of the query point and of the point in the
+                  hash for each pair, sorted by query index and then
+                  point index, and the normalized squared distance
+                  between them
+        :rtype: tuple( np.array, np.array, np.array )
+
+        """
+
+        query_points = np.asarray(query_points, dtype=np.float64)
+        if query_points.ndim == 1:
+            query_points = query_points.reshape((-1, self.points.shape[1]))
+        num_query = query_points.shape[0]
+        qinds = [np.zeros(0, dtype=np.intp)]
+        pinds = [np.zeros(0, dtype=np.intp)]
+        dist2 = [np.zeros(0)]
+
+        query_cells = self.get_cells(query_points)
+        ndim = self.points.shape[1]
+        for offset in itertools.product([-1, 0, 1], repeat=ndim):
+            keys, _ = self.get_keys(query_cells + np.array(offset, dtype=np.int64))
+            first = np.searchsorted(self.sorted_keys, keys, side='left')
+            num_in_cell = np.searchsorted(self.sorted_keys, keys, side='right') - first
+            # All (query point, point in cell) pairs
+            cell_qinds = np.repeat(np.arange(num_query), num_in_cell)
+            pos_in_cell = (np.arange(cell_qinds.size)
+                           - np.repeat(np.cumsum(num_in_cell) - num_in_cell, num_in_cell))
+            cell_pinds = self.order[np.repeat(first, num_in_cell) + pos_in_cell]
+            cell_dist2 = self.get_dist2(query_points[cell_qinds], self.points[cell_pinds])
+            within = cell_dist2 <= 1.0
+            qinds.append(cell_qinds[within])
+            pinds.append(cell_pinds[within])
+            dist2.append(cell_dist2[within])
+
+        qinds, pinds, dist2 = [np.concatenate(vals) for vals in (qinds, pinds, dist2)]
+        order = np.lexsort((pinds, qinds))
+        return qinds[order], pinds[order], dist2[order]
+
+    def get_dist2(self, points1, points2):
+        """Get the normalized squared distance between `points1` and
+        `points2`
+
+        :param points1: Coordinates of the first points
+        :type points1: np.array (shape = [npoints, ndim])
+
+        :param points2: Coordinates of the second points
+        :type points2: np.array (shape = [npoints, ndim])
+
+        :returns: The normalized squared distances
+        :rtype: np.array (shape = [npoints])
+
+        """
+        dist2 = 0.0
+        for p1, p2, the_tol in zip(points1.transpose(), points2.transpose(), self.tol):
+            dist2 = dist2 + ((p1 - p2)/the_tol)**2
+        return dist2
+
+
+def get_unique_inds(points, tol):
+    """Merge points within the tolerance of each other, e.g. nodes at the
+    same position. Each point is mapped to the first (lowest index)
+    point within the tolerance, and further to the point that one is
+    mapped to. For groups of points with a size much smaller than the
+    tolerance, this gives the first point in each group.
+
+    :param points: Coordinates of the points
+    :type points: np.array (shape = [npoints, ndim])
+
+    :param tol: Tolerance, see :py:class:`SpatialHash`
+    :type tol: float / list[ float ]
+
+    :returns: The index of the first point at the same position for
+              each point. The unique points are those mapped to
+              themselves.
+    :rtype: np.array( int ) (shape = [npoints])
+
+    """
+    points = np.asarray(points, dtype=np.float64)
+    if points.shape[0] == 0:
+        return np.zeros(0, dtype=np.intp)
+    first_inds, _ = SpatialHash(points, tol).find_closest(points, lowest_index=True)
+    # Follow the chains of merged points to the first point
+    while True:
+        next_inds = first_inds[first_inds]
+        if np.array_equal(next_inds, first_inds):
+            return first_inds
+        first_inds = next_inds
@@ -0,0 +1,430 @@
+"""Generate the steps for many rollover cycles directly in the input
+file. Creating the steps in Abaqus CAE (see
+:py:func:`rollover.three_d.utils.loading.setup`) takes a time that
+grows with the number of cycles, and becomes very slow for thousands of
+cycles. Instead, only the first cycles are created in CAE, and the steps
+of the remaining cycles are written to the input file from a template.
+
+The template consists of the steps for cycles 2 to `num_cae_cycles`
+(i.e. `num_cae_cycles - 1` cycles, 4 steps per cycle) in the input file
+written by CAE. These are repeated periodically, such that output
+requested every `k` cycles is retained if `num_cae_cycles - 1` is a
+multiple of `k`. For each cycle, the step names, the rolling step time
+and increments (`*Static`), and the vertical wheel load (`*Cload`) are
+set according to the `cycles`/`vertical_load`/`speed` schedule, or
+copied from the template. The slip and rail extension are given by the
+loading file, see :py:mod:`rollover.three_d.utils.load_param`.
+
+The input file is read once, and the steps are written directly to the
+end of the input file, such that the time is proportional to the size
+of the final input file.
+
+This module does not depend on Abaqus.
+
+.. codeauthor:: Knut Andreas Meyer
+"""
+
+from __future__ import print_function
+import re
+import numpy as np
+
+from rollover.utils import naming_mod as names
+from rollover.three_d.utils import load_param
+
+STEP_REGEX = re.compile(r'^\*Step, name=([A-Za-z]+)_(\d+)', re.IGNORECASE)
+STATIC_FORMAT = '%0.15g, %0.15g, %0.15g, %0.15g'
+CLOAD_FORMAT = '\n*Cload\n%s, 2, %0.15g'
+WRITE_BUFFER_SIZE = 2**22   # Bytes
+
+
+def append_cycles(inp_file, num_cae_cycles, rolling_length, vertical_load, cycles=[1],
+                  speed=1.0, num_cycles=1, max_incr=1000, min_incr=100, ramp=False,
+                  **loading_param):
+    """Append the steps for cycle `num_cae_cycles + 1` to `num_cycles`
+    to the input file `inp_file`, which contains the steps for the
+    first `num_cae_cycles` cycles. The loading parameters are the same
+    as for :py:func:`rollover.three_d.utils.loading.setup`, such that
+    the loading settings can be given directly as keyword arguments.
+
+    :param inp_file: Path to the input file written by Abaqus CAE
+    :type inp_file: str
+
+    :param num_cae_cycles: The number of cycles in `inp_file`, must be
+                           at least 2.
+    :type num_cae_cycles: int
+
+    :param rolling_length: The length the wheel shall roll
+    :type rolling_length: float
+
+    :param vertical_load: Vertical wheel load. See "cycle data type" in
+                          :py:func:`rollover.three_d.utils.loading.setup`
+    :type vertical_load: float / list[ float ]
+
+    :param cycles: List of cycle numbers where new load parameters are
+                   specified.
+    :type cycles: list[ int ]
+
+    :param speed: The linear speed of the wheel. See "cycle data type".
+    :type speed: float / list[ float ]
+
+    :param num_cycles: Total number of rollover cycles
+    :type num_cycles: int
+
+    :param max_incr: Max number of increments during the rolling step
+    :type max_incr: int
+
+    :param min_incr: Min number of increments during the rolling step
+    :type min_incr: int
+
+    :param ramp: Should the load parameters be linearly interpolated
+                 between the cycles in `cycles`, see
+                 :py:class:`rollover.three_d.utils.load_param.LoadSchedule`
+    :type ramp: bool
+
+    :param loading_param: Other loading settings, not used.
+
+    :returns: The number of appended cycles
+    :rtype: int
+
+    """
+    if num_cycles <= num_cae_cycles:
+        return 0
+
+    templates, load_set = read_templates(inp_file, num_cae_cycles)
+    cycle_nrs = np.arange(num_cae_cycles + 1, num_cycles + 1)
+    static_lines, cload_lines = get_schedule_lines(cycle_nrs, load_set, rolling_length,
+                                                   vertical_load, cycles, speed,
+                                                   max_incr, min_incr, ramp)
+    write_cycles(inp_file, templates, cycle_nrs, static_lines, cload_lines)
+
+    return len(cycle_nrs)
+
+
+def repeat_cycles(inp_file, num_cycles, num_cae_cycles=None):
+    """Append the steps for the cycles after those in `inp_file` up to
+    `num_cycles`, by repeating the cycles 2 to `num_cae_cycles` without
+    changes, except the step names.
+
+    :param inp_file: Path to the input file
+    :type inp_file: str
+
+    :param num_cycles: Total number of rollover cycles
+    :type num_cycles: int
+
+    :param num_cae_cycles: The number of cycles in `inp_file`. If None
+                           (default), the number of rolling steps in
+                           `inp_file` is used.
+    :type num_cae_cycles: int
+
+    :returns: The number of appended cycles
+    :rtype: int
+
+    """
+    templates, _ = read_templates(inp_file, num_cae_cycles)
+    num_cae_cycles = len(templates) + 1
+    if num_cycles <= num_cae_cycles:
+        return 0
+
+    cycle_nrs = np.arange(num_cae_cycles + 1, num_cycles + 1)
+    static_lines, cload_lines = get_template_lines(templates, cycle_nrs)
+    write_cycles(inp_file, templates, cycle_nrs, static_lines, cload_lines)
+
+    return len(cycle_nrs)
+
+
+def get_schedule_lines(cycle_nrs, load_set, rolling_length, vertical_load, cycles=[1],
+                       speed=1.0, max_incr=1000, min_incr=100, ramp=False, **loading_param):
+    """Get the `*Static` data lines and `*Cload` lines for the rolling
+    steps of the cycles `cycle_nrs` from the loading settings, see
+    :py:func:`append_cycles`.
+
+    :param cycle_nrs: The cycle numbers
+    :type cycle_nrs: np.array( int )
+
+    :param load_set: The node set of the vertical wheel load, see
+                     :py:func:`get_cload_set`
+    :type load_set: str
+
+    :returns: The `*Static` data line and the `*Cload` lines for each
+              cycle, to be given to :py:func:`write_cycles`
+    :rtype: tuple( list[ str ], list[ str ] )
+
+    """
+    schedule = load_param.LoadSchedule(vertical_load, cycles, speed, ramp=ramp)
+    step_times = rolling_length/schedule.get(cycle_nrs, 'speed')
+    static_lines = [STATIC_FORMAT % (dt/min_incr, dt, dt/max_incr, dt/min_incr)
+                    for dt in step_times]
+    cload_lines = [CLOAD_FORMAT % (load_set, -fz)
+                   for fz in schedule.get(cycle_nrs, 'vertical_load')]
+    return static_lines, cload_lines
+
+
+def get_template_lines(templates, cycle_nrs):
+    """Get the original `*Static` data lines and `*Cload` lines in
+    the templates for the rolling steps of the cycles `cycle_nrs`
+
+    :param templates: The cycle templates, see
+                      :py:func:`get_cycle_templates`
+    :type templates: list[ dict ]
+
+    :param cycle_nrs: The cycle numbers
+    :type cycle_nrs: np.array( int )
+
+    :returns: The `*Static` data line and the `*Cload` lines for each
+              cycle, to be given to :py:func:`write_cycles`
+    :rtype: tuple( list[ str ], list[ str ] )
+
+    """
+    inds = (np.asarray(cycle_nrs) - 2) % len(templates)
+    return [templates[i]['static'] for i in inds], [templates[i]['cload'] for i in inds]
+
+
+def write_cycles(inp_file, templates, cycle_nrs, static_lines, cload_lines):
+    """Append the steps for the cycles `cycle_nrs` to `inp_file`. The
+    template for cycle `n` is `templates[(n-2) % len(templates)]`.
+
+    :param inp_file: Path to the input file
+    :type inp_file: str
+
+    :param templates: The cycle templates, see
+                      :py:func:`get_cycle_templates`
+    :type templates: list[ dict ]
+
+    :param cycle_nrs: The cycle numbers to write
+    :type cycle_nrs: np.array( int )
+
+    :param static_lines: The `*Static` data line for each cycle
+    :type static_lines: list[ str ]
+
+    :param cload_lines: The `*Cload` keyword and data line (starting
+                        with a newline), or an empty string, for each
+                        cycle
+    :type cload_lines: list[ str ]
+
+    :returns: None
+    :rtype: None
+
+    """
+    with open(inp_file, 'a', WRITE_BUFFER_SIZE) as fid:
+        fid.write('\n')
+        for cycle_nr, static, cload in zip(cycle_nrs, static_lines, cload_lines):
+            fid.write(format_cycle(templates, cycle_nr, static, cload))
+
+
+def format_cycle(templates, cycle_nr, static, cload):
+    """Get the steps for the cycle `cycle_nr` from the template
+    `templates[(cycle_nr-2) % len(templates)]`
+
+    :param templates: The cycle templates, see
+                      :py:func:`get_cycle_templates`
+    :type templates: list[ dict ]
+
+    :param cycle_nr: The cycle number
+    :type cycle_nr: int
+
+    :param static: The `*Static` data line
+    :type static: str
+
+    :param cload: The `*Cload` keyword and data line (starting with a
+                  newline), or an empty string
+    :type cload: str
+
+    :returns: The steps (keyword lines and data lines)
+    :rtype: str
+
+    """
+    template = templates[(cycle_nr - 2) % len(templates)]
+    return template['text'].format(cycle=names.cycle_str(cycle_nr),
+                                   next_cycle=names.cycle_str(cycle_nr + 1),
+                                   static=static, cload=cload)
+
+
+def read_templates(inp_file, num_cae_cycles=None):
+    """Read the cycle templates from `inp_file` in a single pass. Only
+    the lines from the step `rolling_00002` until the step
+    `rolling_<num_cae_cycles+1>` are kept in memory.
+
+    :param inp_file: Path to the input file
+    :type inp_file: str
+
+    :param num_cae_cycles: The number of cycles to use as templates.
+                           If None (default), the number of rolling
+                           steps in `inp_file` is used.
+    :type num_cae_cycles: int
+
+    :returns: The templates, see :py:func:`get_cycle_templates`, and
+              the node set of the vertical wheel load, see
+              :py:func:`get_cload_set`
+    :rtype: tuple( list[ dict ], str )
+
+    """
+    first_step = '*Step, name=' + names.get_step_rolling(2)
+    end_step = (None if num_cae_cycles is None
+                else '*Step, name=' + names.get_step_rolling(num_cae_cycles + 1) + ',')
+    template_lines = []
+    load_lines = []
+    in_loading_step = False
+    with open(inp_file, 'r') as fid:
+        for line in fid:
+            if end_step is not None and line.startswith(end_step):
+                break
+            if len(template_lines) > 0 or line.startswith(first_step):
+                if not line.startswith('**'):
+                    template_lines.append(line.rstrip('\r\n'))
+            elif line.startswith('*Step, name=' + names.step2 + ','):
+                in_loading_step = True
+            if in_loading_step:
+                load_lines.append(line.rstrip('\r\n'))
+                in_loading_step = not line.lower().startswith('*end step')
+
+    if num_cae_cycles is None:
+        num_cae_cycles = 1 + sum([1 for line in template_lines
+                                  if line.startswith('*Step, name=rolling_')])
+
+    return get_cycle_templates(template_lines, num_cae_cycles), get_cload_set(load_lines)
+
+
+def get_cycle_templates(inp_lines, num_cae_cycles):
+    """Get the template for each of the cycles 2 to `num_cae_cycles`.
+
+    Comment lines are removed. The step names are replaced by the
+    fields `{cycle}` (rolling step) and `{next_cycle}` (return, reapply
+    and release steps). The data line of `*Static` in the rolling step
+    is replaced by `{static}`. Any `*Cload` in the rolling step is
+    removed and the field `{cload}` is added directly after `{static}`.
+
+    :param inp_lines: The lines in the input file
+    :type inp_lines: list[ str ]
+
+    :param num_cae_cycles: The number of cycles in the input file
+    :type num_cae_cycles: int
+
+    :returns: One dictionary per cycle, containing the template,
+              `'text'` (to be used with str.format), and the original
+              `*Static` data line, `'static'`, and `*Cload` keyword and
+              data line, `'cload'`, from the rolling step.
+    :rtype: list[ dict ]
+
+    """
+    if num_cae_cycles < 2:
+        raise ValueError('At least 2 cycles must be created in CAE to generate further cycles')
+
+    first_step = '*Step, name=' + names.get_step_rolling(2)
+    start = [i for i, line in enumerate(inp_lines) if line.startswith(first_step)]
+    if len(start) == 0:
+        raise ValueError('Could not find the step ' + names.get_step_rolling(2))
+
+    steps = split_steps([line.replace('{', '{{').replace('}', '}}')
+                         for line in inp_lines[start[0]:] if not line.startswith('**')])
+
+    if len(steps) != 4*(num_cae_cycles - 1):
+        raise ValueError('Expected 4 steps per cycle for cycles 2 to ' + str(num_cae_cycles)
+                         + ', but found ' + str(len(steps)) + ' steps')
+
+    templates = []
+    for cycle_nr in range(2, num_cae_cycles + 1):
+        cycle_steps = steps[4*(cycle_nr-2):4*(cycle_nr-1)]
+        expected_names = [names.get_step_rolling(cycle_nr), names.get_step_return(cycle_nr+1),
+                          names.get_step_reapply(cycle_nr+1), names.get_step_release(cycle_nr+1)]
+        template = {'static': None, 'cload': ''}
+        template_lines = []
+        for step_name, step_lines, field in zip(expected_names, cycle_steps,
+                                                ['cycle'] + 3*['next_cycle']):
+            match = STEP_REGEX.match(step_lines[0])
+            if match.group(1) + '_' + match.group(2) != step_name:
+                raise ValueError('Expected step ' + step_name + ', found ' + step_lines[0])
+            step_lines[0] = (step_lines[0][:match.start(2)] + '{' + field + '}'
+                             + step_lines[0][match.end(2):])
+            if field == 'cycle':
+                step_lines = get_rolling_step_template(step_lines, template)
+            template_lines.extend(step_lines)
+        template['text'] = '\n'.join(template_lines) + '\n'
+        templates.append(template)
+
+    return templates
+
+
+def split_steps(lines):
+    """Split lines into steps, each starting with a `*Step` line
+
+    :param lines: Lines, starting with a `*Step` line
+    :type lines: list[ str ]
+
+    :returns: The lines for each step
+    :rtype: list[ list[ str ] ]
+
+    """
+    steps = []
+    for line in lines:
+        if STEP_REGEX.match(line):
+            steps.append([])
+        steps[-1].append(line)
+    return steps
+
+
+def get_rolling_step_template(step_lines, template):
+    """Replace the `*Static` data line by `{static}{cload}` and remove
+    any `*Cload` keyword. The original lines are saved in `template`.
+
+    :param step_lines: The lines of the rolling step
+    :type step_lines: list[ str ]
+
+    :param template: Dictionary to which the original `*Static` data
+                     line, `'static'`, and `*Cload` lines, `'cload'`,
+                     are added.
+    :type template: dict
+
+    :returns: The template lines of the rolling step
+    :rtype: list[ str ]
+
+    """
+    template_lines = []
+    keyword = None
+    for line in step_lines:
+        unescaped = line.replace('{{', '{').replace('}}', '}')
+        if line.startswith('*'):
+            keyword = line.split(',')[0].strip().lower()
+            if keyword == '*cload':
+                template['cload'] = template['cload'] + '\n' + unescaped
+            else:
+                template_lines.append(line)
+        elif keyword == '*static':
+            template['static'] = unescaped
+            template_lines.append('{static}{cload}')
+            keyword = None      # Only first data line
+        elif keyword == '*cload':
+            template['cload'] = template['cload'] + '\n' + unescaped
+        else:
+            template_lines.append(line)
+
+    if template['static'] is None:
+        raise ValueError('No *Static data line found in step ' + step_lines[0])
+
+    return template_lines
+
+
+def get_cload_set(inp_lines):
+    """Get the node set (or node) to which the vertical wheel load is
+    applied, from the `*Cload` in the step where it is created
+    (`names.step2`).
+
+    :param inp_lines: The lines in the input file
+    :type inp_lines: list[ str ]
+
+    :returns: The node set as written in the input file
+    :rtype: str
+
+    """
+    in_step = False
+    in_cload = False
+    for line in inp_lines:
+        if line.startswith('*Step, name=' + names.step2 + ','):
+            in_step = True
+        elif in_step and line.startswith('*'):
+            in_cload = line.split(',')[0].strip().lower() == '*cload'
+            if line.lower().startswith('*end step'):
+                break
+        elif in_cload and not line.startswith('**'):
+            return line.split(',')[0].strip()
+
+    raise ValueError('Could not find the *Cload in step ' + names.step2)
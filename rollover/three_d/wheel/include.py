@@ -5,7 +5,7 @@
 
 from __future__ import print_function
 
-import shutil
+import os, shutil
 import numpy as np
 
 from abaqus import mdb
@@ -14,11 +14,13 @@ import regionToolset, mesh
 
 from rollover.utils import naming_mod as names
 from rollover.utils import inp_file_edit as inp_edit
+from rollover.utils import inp_writer
 from rollover.local_paths import data_path
 from rollover.utils import abaqus_python_tools as apt
+from rollover.three_d.wheel import stiffness_io
 
 def from_folder(the_model, folder, translation, start_labels=[1,1], 
-                stiffness=210.e3, symmetric=False):
+                stiffness=210.e3, symmetric=False, mapped_stiffness=False):
     """Include a wheel super element from a folder.
     
     :param the_model: The full model 
@@ -33,6 +35,8 @@ def from_folder(the_model, folder, translation, start_labels=[1,1],
                    - names.uel_elements_file
                    - names.uel_stiffness_file
                    
+                   and optionally names.uel_stiffness_binary_file
+                   
     :type folder: str
     
     :param translation: Translation on the wheel part when adding the 
@@ -49,6 +53,13 @@ def from_folder(the_model, folder, translation, start_labels=[1,1],
     :param symmetric: Should a symmetry set in the yz-plane be created?
     :type symmetric: bool
     
+    :param mapped_stiffness: Should the stiffness, scaled by 
+                             `stiffness`, be saved as 
+                             names.uel_stiffness_mapped_file? The user 
+                             subroutine then maps this file instead of 
+                             reading and scaling the stiffness. 
+    :type mapped_stiffness: bool
+    
     :returns: stiffness
     :rtype: float
     
@@ -106,6 +117,22 @@ def from_folder(the_model, folder, translation, start_labels=[1,1],
     assy.translate(instanceList=(names.wheel_inst, ), vector=translation)
     
     shutil.copy(folder + '/' + names.uel_stiffness_file, '.')
+    # The binary stiffness is read by the uel subroutine if it exists
+    if os.path.exists(folder + '/' + names.uel_stiffness_binary_file):
+        shutil.copy(folder + '/' + names.uel_stiffness_binary_file, '.')
+    elif os.path.exists(names.uel_stiffness_binary_file):
+        os.remove(names.uel_stiffness_binary_file)
+    
+    # The mapped stiffness is used before the other formats if it exists
+    if mapped_stiffness:
+        if os.path.exists(names.uel_stiffness_binary_file):
+            packed, ndof = stiffness_io.read_uel_stiffness(names.uel_stiffness_binary_file)
+        else:
+            packed, ndof = stiffness_io.read_uel_stiffness(names.uel_stiffness_file)
+        stiffness_io.save_uel_stiffness_mapped(names.uel_stiffness_mapped_file, packed, ndof,
+                                               scale_factor=stiffness)
+    elif os.path.exists(names.uel_stiffness_mapped_file):
+        os.remove(names.uel_stiffness_mapped_file)
     
     return stiffness
     
@@ -213,22 +240,11 @@ def get_inp_str_element_connectivity(wheel, wheel_folder, translation=[0.0, 0.0,
     contact_nodes = get_contact_nodes(wheel, wheel_folder, translation)
     element_number = len(wheel.elements) + 1
     
-    inp_str = '*Element, type=U1, ELSET=WHEEL_SUPER_ELEMENT\n'
-    
-    inp_str = inp_str + '%u, ' % element_number
-    inp_str = inp_str + '%u, ' % rp_node.label
-    num_per_line = 2    # Already 2 items placed
-    for node in contact_nodes:
-        # Check if line has become too long, use 70 chars as limit for
-        # safety against 80. This allows node label value up to 10^8-1
-        if num_per_line >= 16 or len(inp_str.split('\n')[-1]) > 70:
-            inp_str = inp_str + '\n'
-            num_per_line = 0
-            
-        inp_str = inp_str + '%u, ' % node.label
-        num_per_line = num_per_line + 1
-        
-    return inp_str[:-2] # Remove last comma and space
+    # New lines are started after 70 chars for safety against 80. This 
+    # allows node label values up to 10^8-1
+    labels = [element_number, rp_node.label] + [node.label for node in contact_nodes]
+    return ('*Element, type=U1, ELSET=WHEEL_SUPER_ELEMENT\n' 
+            + inp_writer.get_wrapped_int_str(labels))
 
     
 def get_contact_nodes(wheel, wheel_folder, translation=[0.0, 0.0, 0.0]):
@@ -0,0 +1,608 @@
+"""Module for reading and writing the stiffness matrix of the wheel
+super element. The functions only depend on numpy, such that they can
+be used both from Abaqus python and from a regular python installation.
+
+The stiffness matrix is symmetric and is therefore handled as a packed
+triangle whenever possible. The lower triangle is packed row by row,
+i.e. :code:`[K11, K21, K22, K31, K32, K33, ...]`, which is the order
+used by Abaqus when writing the substructure matrix to the `.mtx` file.
+The upper triangle packed row by row, i.e.
+:code:`[K11, K12, ..., K1n, K22, K23, ...]`, is used for the stiffness
+files read by the user element subroutine. These are written either as
+text (`names.uel_stiffness_file`) or in the binary format described in
+:py:func:`save_uel_stiffness_binary`. For large matrices, the full 
+matrix can also be saved pre-scaled in a memory-mappable format 
+(`names.uel_stiffness_mapped_file`), see 
+:py:func:`save_uel_stiffness_mapped`.
+
+.. codeauthor:: Knut Andreas Meyer
+"""
+
+from __future__ import print_function
+import os, struct, zlib
+import numpy as np
+
+MTX_STIFFNESS_KEYWORD = b'*MATRIX,TYPE=STIFFNESS'
+CHUNK_SIZE = 2**22      # Number of bytes to parse at once (4 MB)
+SCATTER_BLOCK_SIZE = 2**21  # Max number of entries to scatter at once
+
+# Binary uel stiffness file header, see save_uel_stiffness_binary
+UEL_BINARY_MAGIC = b'UELSTIFF'
+UEL_BINARY_VERSION = 1
+UEL_BINARY_HEADER_FORMAT = '<8s4i2I'
+UEL_BINARY_HEADER_SIZE = struct.calcsize(UEL_BINARY_HEADER_FORMAT)  # 32 bytes
+UEL_BINARY_DTYPES = {8: '<f8', 4: '<f4'}    # itemsize: dtype
+
+# Mapped uel stiffness file header, see save_uel_stiffness_mapped
+UEL_MAPPED_MAGIC = b'UELSTMAP'
+UEL_MAPPED_VERSION = 1
+UEL_MAPPED_HEADER_FORMAT = '<8s4i2Id'
+UEL_MAPPED_ALIGNMENT = 4096     # Data offset, multiple of the page size
+
+
+def read_mtx_stiffness(mtx_file, chunk_size=CHUNK_SIZE):
+    """Read the stiffness matrix from the mtx file `mtx_file` generated
+    by an Abaqus substructure generate step, and return it as a packed
+    lower triangle.
+
+    The file is read in binary chunks of `chunk_size` bytes, such that
+    the text of the full file is never kept in memory. The number of
+    dofs is determined from the node dof specification in the file
+    header, such that the packed triangle can be allocated once and
+    filled directly.
+
+    :param mtx_file: Name of the mtx file to read the stiffness matrix
+                     from.
+    :type mtx_file: str
+
+    :param chunk_size: Number of bytes to read and convert at once
+    :type chunk_size: int
+
+    :returns: The packed lower triangle and the number of dofs
+    :rtype: tuple( np.array, int )
+
+    """
+
+    with open(mtx_file, 'rb') as mtx:
+        ndof_header = read_mtx_header_ndof(mtx)
+        packed = read_text_values(mtx, get_packed_size(ndof_header), chunk_size)
+
+    ndof = get_ndof_from_packed_size(packed.size)
+    if ndof is None:
+        raise ValueError('Error reading matrix from ' + mtx_file + ', ' + str(packed.size)
+                         + ' values does not give a full triangular matrix')
+
+    return packed, ndof
+
+
+def read_text_values(fid, num_expected=0, chunk_size=CHUNK_SIZE):
+    """Read comma and/or whitespace separated values from the current
+    position in the opened file `fid` until the next keyword line
+    (starting with `*`) or the end of the file.
+
+    The file is read in chunks of `chunk_size` bytes. If `num_expected`
+    is correct, the values are filled directly into an array of that
+    size. Otherwise the chunks are collected and concatenated.
+
+    :param fid: The opened file (binary mode)
+    :type fid: file
+
+    :param num_expected: Expected number of values
+    :type num_expected: int
+
+    :param chunk_size: Number of bytes to read and convert at once
+    :type chunk_size: int
+
+    :returns: The values read
+    :rtype: np.array
+
+    """
+
+    values_all = np.empty(num_expected)
+    values_chunks = None    # Only used if num_expected is wrong
+
+    num_read = 0
+    rest = b''
+    at_end = False
+    while not at_end:
+        chunk = fid.read(chunk_size)
+        at_end = len(chunk) == 0
+        data = rest + chunk
+
+        # The data ends at the next keyword line
+        end_ind = data.find(b'*')
+        if end_ind >= 0:
+            data = data[:end_ind]
+            at_end = True
+
+        # Only convert full lines, keep the rest for next chunk
+        if at_end:
+            rest = b''
+        else:
+            split_ind = data.rfind(b'\n') + 1
+            data, rest = data[:split_ind], data[split_ind:]
+
+        values = convert_mtx_values(data)
+        if values_chunks is None and num_read + values.size > values_all.size:
+            # Not possible to fill directly, collect chunks instead
+            values_chunks = [values_all[:num_read]]
+        if values_chunks is None:
+            values_all[num_read:(num_read + values.size)] = values
+        else:
+            values_chunks.append(values)
+        num_read += values.size
+
+    if values_chunks is None:
+        return values_all[:num_read]
+    else:
+        return np.concatenate(values_chunks)
+
+
+def read_mtx_header_ndof(mtx):
+    """Read the header of an opened mtx file until the stiffness matrix
+    keyword, and determine the number of dofs from the element nodes and
+    the node dof specification. The latter gives the dofs from a given
+    node position in the element and onwards, until the next line. The
+    file position is left at the first line of the matrix.
+
+    :param mtx: The opened mtx file (binary mode)
+    :type mtx: file
+
+    :returns: The number of dofs. 0 if it could not be determined from
+              the header.
+    :rtype: int
+
+    """
+
+    node_str = b''
+    node_dofs = []
+    reading_nodes = False
+    line = mtx.readline()
+    while not line.upper().startswith(MTX_STIFFNESS_KEYWORD):
+        if len(line) == 0:
+            raise ValueError('Could not find "' + MTX_STIFFNESS_KEYWORD.decode()
+                             + '" in mtx file')
+        if line.startswith(b'** ELEMENT NODES'):
+            reading_nodes = True
+        elif reading_nodes and line.startswith(b'**'):
+            node_str = node_str + line[2:]
+        elif not line.startswith(b'*') and len(line.strip()) > 0:
+            reading_nodes = False
+            node_dofs.append([int(s) for s in line.strip().strip(b',').split(b',')])
+        else:
+            reading_nodes = False
+        line = mtx.readline()
+
+    num_nodes = len([n for n in node_str.split(b',') if len(n.strip()) > 0])
+    if num_nodes == 0 or len(node_dofs) == 0:
+        return 0
+
+    # Number of dofs for each node position, using that the dofs apply 
+    # until the next specified position.
+    ndof = 0
+    positions = [dofs[0] for dofs in node_dofs] + [num_nodes + 1]
+    for dofs, pos, next_pos in zip(node_dofs, positions[:-1], positions[1:]):
+        ndof += (next_pos - pos)*(len(dofs) - 1)
+
+    return ndof
+
+
+def convert_mtx_values(data):
+    """Convert a chunk of comma and/or whitespace separated values from
+    the mtx file into floats.
+
+    :param data: Text to be converted
+    :type data: bytes
+
+    :returns: The converted values
+    :rtype: np.array
+
+    """
+
+    text = data.replace(b',', b' ')
+    if not isinstance(text, str):   # Python 3
+        text = text.decode('ascii')
+
+    return np.fromstring(text, dtype=np.float64, sep=' ')
+
+
+def get_packed_size(ndof):
+    """Get the number of entries in a packed triangle for a symmetric
+    matrix with `ndof` rows and columns.
+
+    :param ndof: Number of rows (and columns) in matrix
+    :type ndof: int
+
+    :returns: Number of entries in the packed triangle
+    :rtype: int
+
+    """
+    return (ndof*(ndof+1))//2
+
+
+def get_ndof_from_packed_size(num_packed):
+    """Get the number of dofs from the number of entries in a packed
+    triangle.
+
+    :param num_packed: Number of entries in the packed triangle
+    :type num_packed: int
+
+    :returns: The number of dofs, or None if `num_packed` is not a
+              triangular number.
+    :rtype: int
+
+    """
+    ndof = int(round(-0.5 + np.sqrt(0.25 + 2*num_packed)))
+    if get_packed_size(ndof) == num_packed:
+        return ndof
+    else:
+        return None
+
+
+def get_packed_row_indices(row_start, row_end):
+    """Get the row and column indices for the entries in the packed
+    lower triangle belonging to rows `row_start` to `row_end` (not
+    including `row_end`). The entries have the positions
+    :code:`get_packed_size(row_start):get_packed_size(row_end)` in the
+    packed triangle.
+
+    :param row_start: First row
+    :type row_start: int
+
+    :param row_end: Row after the last row
+    :type row_end: int
+
+    :returns: Row and column indices
+    :rtype: tuple( np.array, np.array )
+
+    """
+
+    row_nums = np.arange(row_start, row_end)
+    row_lengths = row_nums + 1
+    row_first = np.cumsum(row_lengths) - row_lengths
+    rows = np.repeat(row_nums, row_lengths)
+    cols = np.arange(rows.size) - np.repeat(row_first, row_lengths)
+
+    return rows, cols
+
+
+def unpack_symmetric(packed, ndof=None, block_size=SCATTER_BLOCK_SIZE, upper=False):
+    """Scatter a packed triangle into a full symmetric matrix. The
+    scattering of the lower triangle is done in blocks of rows to limit
+    the memory used by the index arrays. The upper triangle is copied
+    row by row.
+
+    :param packed: The packed triangle
+    :type packed: np.array
+
+    :param ndof: Number of rows (and columns) of the matrix. Calculated
+                 from the size of `packed` if not given.
+    :type ndof: int
+
+    :param block_size: Approximate number of entries to scatter at once
+    :type block_size: int
+
+    :param upper: Is `packed` the upper triangle? Default is the lower.
+    :type upper: bool
+
+    :returns: The symmetric matrix
+    :rtype: np.array
+
+    """
+
+    if ndof is None:
+        ndof = get_ndof_from_packed_size(packed.size)
+
+    kmat = np.empty((ndof, ndof), dtype=packed.dtype)
+    if upper:
+        start = 0
+        for i in range(ndof):
+            end = start + ndof - i
+            kmat[i, i:] = packed[start:end]
+            kmat[i:, i] = packed[start:end]
+            start = end
+        return kmat
+
+    row_start = 0
+    while row_start < ndof:
+        num_rows = max(1, block_size//(row_start + 1))
+        row_end = min(ndof, row_start + num_rows)
+        rows, cols = get_packed_row_indices(row_start, row_end)
+        values = packed[get_packed_size(row_start):get_packed_size(row_end)]
+        kmat[rows, cols] = values
+        kmat[cols, rows] = values
+        row_start = row_end
+
+    return kmat
+
+
+def get_packed_upper(kmat):
+    """Pack the upper triangle of the square matrix `kmat` row by row.
+
+    :param kmat: The (symmetric) matrix
+    :type kmat: np.array
+
+    :returns: The packed upper triangle
+    :rtype: np.array
+
+    """
+
+    ndof = kmat.shape[0]
+    packed = np.empty(get_packed_size(ndof), dtype=kmat.dtype)
+    start = 0
+    for i in range(ndof):
+        end = start + ndof - i
+        packed[start:end] = kmat[i, i:]
+        start = end
+
+    return packed
+
+
+def save_uel_stiffness_text(file_name, packed, ndof):
+    """Save the packed upper triangle of the stiffness matrix to the
+    text format read by the fortran uel subroutine: The number of dofs
+    on the first line, followed by one value per line.
+
+    :param file_name: Name of the file to write
+    :type file_name: str
+
+    :param packed: The packed upper triangle
+    :type packed: np.array
+
+    :param ndof: Number of dofs
+    :type ndof: int
+
+    :returns: None
+    :rtype: None
+
+    """
+
+    with open(file_name, 'w') as fid:
+        fid.write('%5u\n' % ndof)   # First line for allocating matrix
+        np.savetxt(fid, packed, fmt='%25.15e')
+
+
+def read_uel_stiffness_text(file_name, chunk_size=CHUNK_SIZE):
+    """Read the packed upper triangle of the stiffness matrix from a
+    text file written by :py:func:`save_uel_stiffness_text`.
+
+    :param file_name: Name of the file to read
+    :type file_name: str
+
+    :param chunk_size: Number of bytes to read and convert at once
+    :type chunk_size: int
+
+    :returns: The packed upper triangle and the number of dofs
+    :rtype: tuple( np.array, int )
+
+    """
+
+    with open(file_name, 'rb') as fid:
+        ndof = int(fid.readline())
+        packed = read_text_values(fid, get_packed_size(ndof), chunk_size)
+
+    if packed.size != get_packed_size(ndof):
+        raise ValueError('Error reading stiffness from ' + file_name + ', expected '
+                         + str(get_packed_size(ndof)) + ' values but found '
+                         + str(packed.size))
+
+    return packed, ndof
+
+
+def save_uel_stiffness_binary(file_name, packed, ndof, dtype='<f8'):
+    """Save the packed upper triangle of the stiffness matrix to a
+    binary file. The file starts with a 32 byte header (little endian)
+
+    - Magic bytes, :code:`UEL_BINARY_MAGIC` (8 bytes)
+    - Format version (int32)
+    - Header size in bytes, i.e. offset to the data (int32)
+    - Number of bytes per value, 8 or 4 (int32)
+    - Number of dofs, `ndof` (int32)
+    - CRC32 checksum of the data bytes (uint32)
+    - Reserved, currently 0 (uint32)
+
+    followed by the packed upper triangle, as little endian floats.
+
+    :param file_name: Name of the file to write
+    :type file_name: str
+
+    :param packed: The packed upper triangle
+    :type packed: np.array
+
+    :param ndof: Number of dofs
+    :type ndof: int
+
+    :param dtype: Data type to save as, '<f8' (default) or '<f4'
+    :type dtype: str
+
+    :returns: None
+    :rtype: None
+
+    """
+
+    if packed.size != get_packed_size(ndof):
+        raise ValueError(str(packed.size) + ' values does not match ndof = ' + str(ndof))
+
+    data = np.ascontiguousarray(packed, dtype=dtype)
+    checksum = zlib.crc32(data) & 0xffffffff
+    header = struct.pack(UEL_BINARY_HEADER_FORMAT, UEL_BINARY_MAGIC, UEL_BINARY_VERSION,
+                         UEL_BINARY_HEADER_SIZE, data.itemsize, ndof, checksum, 0)
+    with open(file_name, 'wb') as fid:
+        fid.write(header)
+        data.tofile(fid)
+
+
+def read_uel_stiffness_binary(file_name, verify_checksum=True):
+    """Read the packed upper triangle of the stiffness matrix from a
+    binary file written by :py:func:`save_uel_stiffness_binary`.
+
+    :param file_name: Name of the file to read
+    :type file_name: str
+
+    :param verify_checksum: Should the checksum of the data be verified?
+    :type verify_checksum: bool
+
+    :returns: The packed upper triangle and the number of dofs
+    :rtype: tuple( np.array, int )
+
+    """
+
+    with open(file_name, 'rb') as fid:
+        header = fid.read(UEL_BINARY_HEADER_SIZE)
+        if len(header) < UEL_BINARY_HEADER_SIZE:
+            raise ValueError(file_name + ' is too short to be a binary uel stiffness file')
+        magic, version, header_size, itemsize, ndof, checksum, _ = struct.unpack(
+            UEL_BINARY_HEADER_FORMAT, header)
+        if magic != UEL_BINARY_MAGIC:
+            raise ValueError(file_name + ' is not a binary uel stiffness file')
+        if version > UEL_BINARY_VERSION:
+            raise ValueError(file_name + ' has version ' + str(version)
+                             + ', only up to version ' + str(UEL_BINARY_VERSION)
+                             + ' is supported')
+        if itemsize not in UEL_BINARY_DTYPES:
+            raise ValueError(file_name + ' has unsupported value size ' + str(itemsize))
+
+        fid.seek(header_size)
+        data = np.fromfile(fid, dtype=UEL_BINARY_DTYPES[itemsize],
+                           count=get_packed_size(ndof))
+
+    if data.size != get_packed_size(ndof):
+        raise ValueError(file_name + ' is truncated, expected ' + str(get_packed_size(ndof))
+                         + ' values but found ' + str(data.size))
+    if verify_checksum and (zlib.crc32(data) & 0xffffffff) != checksum:
+        raise ValueError('Checksum mismatch for ' + file_name)
+
+    return data.astype(np.float64), ndof
+
+
+def is_uel_stiffness_binary(file_name):
+    """Check if `file_name` is a binary uel stiffness file.
+
+    :param file_name: Name of the file to check
+    :type file_name: str
+
+    :returns: True if the file starts with :code:`UEL_BINARY_MAGIC`
+    :rtype: bool
+
+    """
+
+    with open(file_name, 'rb') as fid:
+        return fid.read(len(UEL_BINARY_MAGIC)) == UEL_BINARY_MAGIC
+
+
+def read_uel_stiffness(file_name):
+    """Read the packed upper triangle of the stiffness matrix from a
+    uel stiffness file, either in text or binary format.
+
+    :param file_name: Name of the file to read
+    :type file_name: str
+
+    :returns: The packed upper triangle and the number of dofs
+    :rtype: tuple( np.array, int )
+
+    """
+
+    if is_uel_stiffness_binary(file_name):
+        return read_uel_stiffness_binary(file_name)
+    else:
+        return read_uel_stiffness_text(file_name)
+
+
+def save_uel_stiffness_mapped(file_name, packed, ndof, scale_factor=1.0,
+                              block_size=SCATTER_BLOCK_SIZE):
+    """Save the full stiffness matrix, scaled by `scale_factor`, to a
+    binary file that can be memory-mapped directly by the user element.
+    The file starts with a header (little endian)
+
+    - Magic bytes, :code:`UEL_MAPPED_MAGIC` (8 bytes)
+    - Format version (int32)
+    - Header size in bytes, i.e. offset to the data (int32), equal to
+      :code:`UEL_MAPPED_ALIGNMENT`
+    - Number of bytes per value, 8 (int32)
+    - Number of dofs, `ndof` (int32)
+    - Reserved, currently 0 (2 x uint32)
+    - The scale factor (float64)
+
+    padded with zeros to :code:`UEL_MAPPED_ALIGNMENT` bytes, such that
+    the data start at a page boundary. The data are the full matrix as
+    little endian doubles. As the matrix is symmetric, the row-major
+    and column-major orders are identical. 
+
+    :param file_name: Name of the file to write
+    :type file_name: str
+
+    :param packed: The packed upper triangle (unscaled)
+    :type packed: np.array
+
+    :param ndof: Number of dofs
+    :type ndof: int
+
+    :param scale_factor: Factor to scale the stiffness with, i.e. the 
+                         Young's modulus of the wheel
+    :type scale_factor: float
+
+    :param block_size: Approximate number of entries to write at once
+    :type block_size: int
+
+    :returns: None
+    :rtype: None
+
+    """
+
+    if packed.size != get_packed_size(ndof):
+        raise ValueError(str(packed.size) + ' values does not match ndof = ' + str(ndof))
+
+    header = struct.pack(UEL_MAPPED_HEADER_FORMAT, UEL_MAPPED_MAGIC, UEL_MAPPED_VERSION,
+                         UEL_MAPPED_ALIGNMENT, 8, ndof, 0, 0, scale_factor)
+    # Position of the first entry in each row of the packed upper triangle
+    row_starts = np.arange(ndof, dtype=np.int64)
+    row_starts = row_starts*ndof - (row_starts*(row_starts - 1))//2
+    cols = np.arange(ndof, dtype=np.int64)
+    num_rows = max(1, block_size//ndof)
+    with open(file_name, 'wb') as fid:
+        fid.write(header + b'\0'*(UEL_MAPPED_ALIGNMENT - len(header)))
+        for row_start in range(0, ndof, num_rows):
+            rows = np.arange(row_start, min(ndof, row_start + num_rows), dtype=np.int64)
+            first = np.minimum(rows[:, np.newaxis], cols)
+            second = np.maximum(rows[:, np.newaxis], cols)
+            block = packed[row_starts[first] + second - first]*scale_factor
+            block.astype('<f8').tofile(fid)
+
+
+def read_uel_stiffness_mapped(file_name):
+    """Memory-map the full stiffness matrix from a file written by 
+    :py:func:`save_uel_stiffness_mapped`.
+
+    :param file_name: Name of the file to read
+    :type file_name: str
+
+    :returns: The (scaled) stiffness matrix, opened read-only, and the 
+              scale factor
+    :rtype: tuple( np.memmap, float )
+
+    """
+
+    header_size = struct.calcsize(UEL_MAPPED_HEADER_FORMAT)
+    with open(file_name, 'rb') as fid:
+        header = fid.read(header_size)
+    if len(header) < header_size:
+        raise ValueError(file_name + ' is too short to be a mapped uel stiffness file')
+    magic, version, data_offset, itemsize, ndof, _, _, scale_factor = struct.unpack(
+        UEL_MAPPED_HEADER_FORMAT, header)
+    if magic != UEL_MAPPED_MAGIC:
+        raise ValueError(file_name + ' is not a mapped uel stiffness file')
+    if version > UEL_MAPPED_VERSION:
+        raise ValueError(file_name + ' has version ' + str(version)
+                         + ', only up to version ' + str(UEL_MAPPED_VERSION)
+                         + ' is supported')
+    if itemsize != 8:
+        raise ValueError(file_name + ' has unsupported value size ' + str(itemsize))
+
+    expected_size = data_offset + itemsize*ndof*ndof
+    if os.path.getsize(file_name) < expected_size:
+        raise ValueError(file_name + ' is truncated, expected ' + str(expected_size) 
+                         + ' bytes')
+
+    kmat = np.memmap(file_name, dtype='<f8', mode='r', offset=data_offset, shape=(ndof, ndof))
+
+    return kmat, scale_factor
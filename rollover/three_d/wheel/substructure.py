@@ -59,21 +59,17 @@ def generate(wheel_param):
     section_bb, contact_2d_nodes = generate_2d_mesh(wheel_model, **wheel_section_param)
     
     # Revolve 2d mesh to obtain 3d mesh
-    if wheel_param['quadratic_order']:
-        # Use direct input editing, gives better accuracy of node 
-        # position and works with second order accuracy.
-        # Need to re-assign the wheel part, as we delete and recreate 
-        # this part.
-        wheel_part, mesh_angles = three_d_mesh.generate(wheel_model, wheel_param['mesh_sizes'][0])
-        # Need to take special care to not include a half element
-        wheel_angles = get_wheel_angles(mesh_angles, wheel_param['wheel_angles'])
-    else: # Use Abaqus' sweep function (note: Lower coordinate accuracy, 
-          # could be replaced by an easier function in three_d_mesh!)
-        generate_3d_mesh(wheel_model, wheel_param['mesh_sizes'])
-        wheel_angles = wheel_param['wheel_angles']
+    # Use direct input editing, gives better accuracy of node position
+    # than Abaqus' sweep function and works with second order elements.
+    # Need to re-assign the wheel part, as we delete and recreate this 
+    # part.
+    wheel_part, mesh_3d = three_d_mesh.generate(wheel_model, wheel_param['mesh_sizes'][0],
+                                                wheel_param['quadratic_order'])
+    # Need to take special care to not include a half element
+    wheel_angles = get_wheel_angles(mesh_3d['angles'], wheel_param['wheel_angles'])
     
     # Create retained node set
-    create_retained_set(wheel_part, wheel_angles, contact_2d_nodes)
+    create_retained_set(wheel_part, wheel_angles, contact_2d_nodes, mesh_3d)
     
     # Create inner node set
     create_inner_set(wheel_part, section_bb)
@@ -241,7 +237,13 @@ def generate_2d_mesh(wheel_model, wheel_profile, mesh_sizes, wheel_contact_pos,
 def generate_3d_mesh(wheel_model, mesh_sizes):
     """ Given a wheel_model containing a meshed planar 3d wheel section 
     (in the xy-plane with y the radial direction), create a 3d revolved
-    mesh.
+    mesh using Abaqus' sweep function. 
+    
+    .. note:: 
+        
+        Not used by :py:func:`generate`, which uses 
+        :py:func:`rollover.three_d.wheel.three_d_mesh.generate` for both
+        linear and quadratic elements. 
     
     :param wheel_model: The model containing the wheel part
     :type wheel_model: Model object (Abaqus)
@@ -270,7 +272,7 @@ def generate_3d_mesh(wheel_model, mesh_sizes):
     wheel_part.deleteMesh()
     
 
-def create_retained_set(wheel_part, wheel_angles, contact_2d_nodes):
+def create_retained_set(wheel_part, wheel_angles, contact_2d_nodes, mesh_3d=None):
     """Create a set for the retained dofs
     
     The wheel part should have a 3d-revolved mesh. This function will 
@@ -278,6 +280,13 @@ def create_retained_set(wheel_part, wheel_angles, contact_2d_nodes):
     contact_2d_nodes that are within the angular interval specified 
     by wheel_angles.
     
+    If the mesh specification, mesh_3d, from 
+    :py:func:`rollover.three_d.wheel.three_d_mesh.generate` is given, 
+    the node labels are determined directly from the revolution 
+    bookkeeping, and the set is created at once. Otherwise, the nodes 
+    are found by bounding cylinders and boxes for each coordinate in 
+    contact_2d_nodes (slow for large meshes).
+    
     :param wheel_part: The wheel part containing the orphan 3d mesh
     :type wheel_part: Part object (Abaqus)
     
@@ -291,11 +300,21 @@ def create_retained_set(wheel_part, wheel_angles, contact_2d_nodes):
                              positions to retain in the 3d-mesh.
     :type contact_2d_nodes: list[ list[ float ] ]
     
+    :param mesh_3d: The mesh specification used to create the 3d-mesh
+                    of the wheel part. 
+    :type mesh_3d: dict
+    
     :returns: None
     :rtype: None
 
     """
     set_name = names.wheel_contact_nodes
+    if mesh_3d is not None:
+        labels = three_d_mesh.get_retained_node_labels(mesh_3d, contact_2d_nodes, 
+                                                       wheel_angles, tol=BB_TOL)
+        wheel_part.SetFromNodeLabels(name=set_name, nodeLabels=tuple(labels.tolist()))
+        return
+    
     tmp_set = get_nodes_in_ang_int(wheel_part, wheel_angles, contact_2d_nodes[0])
     wheel_part.Set(name=set_name, objectToCopy=tmp_set)
     for coord in contact_2d_nodes[1:]:
@@ -1,26 +1,36 @@
 """Analyze the results from a wheel substructure and create the 
-necessary data structures to setup the user element. 
+necessary data structures to setup the user element. Only 
+:py:func:`create_test_part` requires Abaqus, such that the remaining 
+functions can also be used from a regular python installation. 
 
 .. codeauthor:: Knut Andreas Meyer
 """
 
 # Python imports
 from __future__ import print_function
+import os
 import numpy as np
 
-# Abaqus imports
-from abaqusConstants import *
-
 # Project imports
-import rollover.utils.abaqus_python_tools as apt
 import rollover.utils.naming_mod as names
+from rollover.three_d.wheel import stiffness_io
+from rollover.three_d.utils import spatial_hash
+
+NEAR_DISTANCE_FACTOR = 3.0      # Default near distance in compress_stiffness, 
+                                # relative to the typical node spacing
+SPARSE_BLOCK_SIZE = 2**22      # Max number of values in the near-field products at once
+FAR_FIELD_BLOCK_SIZE = 32       # Initial rank in compress_stiffness, doubled until enough
+NUM_OVERSAMPLING = 10           # Min. extra vectors in get_largest_eigenpairs
+NUM_SUBSPACE_ITERATIONS = 4     # Number of subspace iterations in get_largest_eigenpairs
 
-def get_uel_mesh(quadratic_elements=True):
+def get_uel_mesh(quadratic_elements=True, binary_stiffness=False):
     """Determine the mesh from the substructure simulation.
     Produces the following files:
     
     - `names.uel_stiffness_file`: The stiffness matrix to be read by the 
       fortran uel subroutine
+    - `names.uel_stiffness_binary_file`: The stiffness matrix in binary 
+      format (only if `binary_stiffness=True`)
     - `names.uel_coordinates_file`: The coordinates of the contact nodes 
       in the user element. 
     - `names.uel_elements_file`: The indices of the user element nodes 
@@ -40,12 +50,13 @@ def get_uel_mesh(quadratic_elements=True):
     else:
         elements = get_element_connectivity(coords)
     
-    save_uel(ke, coords, elements)
+    save_uel(ke, coords, elements, binary_stiffness)
     
     
 def get_stiffness(mtx_file):
     """Extracts the stiffness from the mtx file `mtx_file`, which was
-    generated by an Abaqus substructure generate step.
+    generated by an Abaqus substructure generate step. See 
+    :py:func:`rollover.three_d.wheel.stiffness_io.read_mtx_stiffness`
     
     :param mtx_file: Name of the mtx file to read the stiffness matrix 
                      from.
@@ -56,39 +67,9 @@ def get_stiffness(mtx_file):
 
     """
     
-    with open(mtx_file, 'r') as mtx:
-        mtx_str = mtx.read()
-
-    mat_str = mtx_str.split('*MATRIX,TYPE=STIFFNESS')[-1].split('*')[0].strip(',').strip('\n')
-    mat_vec = []
-    for entry in mat_str.split():
-        ent = entry.strip(',').strip('\n')
-        try:
-            mat_vec.append(float(ent))
-        except ValueError as e:
-            if len(ent) == 0:
-                pass
-            else:
-                print('Cannot convert "' + ent + '" to a float')
-                raise e
-
-    mat_vec = np.array(mat_vec)
-    ndof = -0.5+np.sqrt(0.25+mat_vec.size*2)
-    if np.abs(ndof-int(ndof)) < 1.e-10:
-        ndof = int(ndof)
-    else:
-        print('Error reading matrix from ' + mtx_file + '.mtx')
-        return None
+    packed, ndof = stiffness_io.read_mtx_stiffness(mtx_file)
     
-    kmat = np.zeros((ndof,ndof))
-    k = 0
-    for i in range(ndof):
-        for j in range(i+1):
-            kmat[i,j] = mat_vec[k]
-            kmat[j,i] = kmat[i,j]
-            k = k + 1
-            
-    return kmat
+    return stiffness_io.unpack_symmetric(packed, ndof)
 
 
 def get_mtx_nodes(mtx_file):
@@ -317,24 +298,24 @@ def get_mesh_inds(coords):
     unique_angles = get_unique(angles, ang_tol)
     unique_xcoords = get_unique(xcoords, TOL)
             
-    index_matrix = []
-    for ang in unique_angles:
-        index_matrix.append([])
-        last_failed = True  # The first x-coordinate should be found
-        for xcoord in unique_xcoords:
-            try: 
-                coord_index = find_coord(find_coords=(ang, xcoord), 
-                                         search_coords=(angles, xcoords),
+    # Find the node closest to each (angle, x) pair, using a spatial 
+    # hash to only compare with the nodes in the neighbouring buckets.
+    node_hash = spatial_hash.SpatialHash(np.transpose([angles, xcoords]), 
                                          tol=[ang_tol, TOL])
-                this_failed = False
-            except ValueError:
-                this_failed = True
-                
-            if last_failed and this_failed:
-                raise ValueError('Could not determine coordinates')
-            elif not this_failed:
-                index_matrix[-1].append(coord_index)
-            last_failed = this_failed
+    query_coords = np.transpose([np.repeat(unique_angles, len(unique_xcoords)),
+                                 np.tile(unique_xcoords, len(unique_angles))])
+    coord_inds, _ = node_hash.find_closest(query_coords)
+    coord_inds = coord_inds.reshape((len(unique_angles), len(unique_xcoords)))
+    
+    # Two consecutive x-coordinates cannot be missing, and the first 
+    # x-coordinate should be found
+    failed = coord_inds < 0
+    failed_before = np.concatenate((np.ones((failed.shape[0], 1), dtype=bool), 
+                                    failed[:, :-1]), axis=1)
+    if np.any(failed & failed_before):
+        raise ValueError('Could not determine coordinates')
+    
+    index_matrix = [list(inds[inds >= 0]) for inds in coord_inds]
     
     return index_matrix
     
@@ -412,7 +393,7 @@ def find_coord(find_coords, search_coords, tol=1.e-6):
     return min_ind
     
     
-def save_uel(stiffness, coordinates, elements):
+def save_uel(stiffness, coordinates, elements, binary_stiffness=False):
     """ Save the stiffness, node coordinates and element connectivity
     for the user element to be imported. Stiffness will be read by 
     fortran subroutine, while coordinates and elements will be read by 
@@ -431,21 +412,27 @@ def save_uel(stiffness, coordinates, elements):
                      `names.uel_elements_file`
     :type elements: np.array
     
+    :param binary_stiffness: Should the stiffness also be saved in the 
+                             binary format to 
+                             `names.uel_stiffness_binary_file`? If 
+                             present, this file is read by the fortran 
+                             uel subroutine instead of the text file. 
+    :type binary_stiffness: bool
+    
     :returns: None
     :rtype: None
     
     """
 
-    # Create file to import stiffness matrix in fortran uel subroutine
-    with open(names.uel_stiffness_file, 'w') as fid:
-        ndof = stiffness.shape[0]
-        fid.write('%5u\n' % ndof)   # First line for allocating matrix
-        for i in range(ndof):
-            for j in range(i, ndof):
-                fid.write('%25.15e\n' % stiffness[i,j])
-                # If verifying that correct indices are transferred, 
-                # use the following format:
-                # fid.write('%5u, %5u, %25.15e\n' % (i+1, j+1, stiffness[i,j]))
+    # Create file(s) to import stiffness matrix in fortran uel subroutine
+    ndof = stiffness.shape[0]
+    packed = stiffness_io.get_packed_upper(stiffness)
+    stiffness_io.save_uel_stiffness_text(names.uel_stiffness_file, packed, ndof)
+    if binary_stiffness:
+        stiffness_io.save_uel_stiffness_binary(names.uel_stiffness_binary_file, packed, ndof)
+    elif os.path.exists(names.uel_stiffness_binary_file):
+        # Remove old binary file, which would be read instead of the text
+        os.remove(names.uel_stiffness_binary_file)
                 
     # Create file with node coordinates
     np.save(file=names.uel_coordinates_file, arr=coordinates)
@@ -453,6 +440,554 @@ def save_uel(stiffness, coordinates, elements):
     # Create file with element nodes
     np.save(file=names.uel_elements_file, arr=elements)
 
+
+
+def compress_stiffness(stiffness, coordinates, rtol=1.e-3, near_distance=None, 
+                       displacements=None):
+    """ Approximate the stiffness matrix of the user element by a sparse
+    plus low-rank form, :code:`K ~ S + V diag(lambda) V^T`. The sparse
+    part, S, contains the exact coupling between nodes closer than
+    `near_distance` and all couplings to the reference point (the 6 
+    first dofs). The remaining far-field coupling, :code:`R = K - S`, 
+    is approximated by its eigenvectors, V, with the largest absolute 
+    eigenvalues. These are calculated by randomized subspace iteration,
+    see :py:func:`get_largest_eigenpairs`, only requiring products with
+    R. The number of eigenpairs is doubled until the rank is found. For
+    the spectral norm target, the rank is also checked with an estimate
+    of the residual norm, see :py:func:`get_residual_norm`. 
+    
+    The rank is chosen such that 
+    :code:`||K - S - V diag(lambda) V^T||_2 <= rtol*||Kc||_2`, where 
+    Kc is the part of K coupling the contact nodes. Hence, the force 
+    error for any displacement u is bounded by 
+    :code:`rtol*||Kc||_2*||u||`. (The reference point part is excluded 
+    from the norm, as it is dominated by the rotational stiffness, and 
+    is exact in S.) 
+    
+    If `displacements` are given, the rank is instead chosen as the 
+    smallest rank giving relative force errors, see 
+    :py:func:`get_compressed_force_error`, below `rtol` for these 
+    displacements. This typically allows a much lower rank, but the 
+    accuracy is only known for displacements similar to those given. 
+    
+    The compression is refused if the compressed stiffness would not be
+    smaller than the dense stiffness in packed (upper triangle) format, 
+    see :py:func:`get_storage`.
+    
+    The near node pairs are found with 
+    :py:class:`rollover.three_d.utils.spatial_hash.SpatialHash`, and 
+    the products with S are calculated for all columns at once with the
+    3x3 blocks of the node pairs, see :py:func:`apply_sparse`. 
+    
+    :param stiffness: Stiffness matrix, ordered as written by 
+                      :py:func:`save_uel` (reference point dofs first)
+    :type stiffness: np.array
+    
+    :param coordinates: Node coordinates, as written by 
+                        :py:func:`save_uel`
+    :type coordinates: np.array (shape = [nnodes, 3])
+    
+    :param rtol: Relative accuracy target, in the spectral norm or for
+                 the forces if `displacements` are given
+    :type rtol: float
+    
+    :param near_distance: Maximum distance between nodes with exact 
+                          coupling. Defaults to 
+                          :code:`NEAR_DISTANCE_FACTOR` times the median
+                          distance to the closest node. 
+    :type near_distance: float
+    
+    :param displacements: Displacements for which the force error 
+                          should be below `rtol`, one column per load 
+                          case. See :py:func:`get_contact_displacements`
+    :type displacements: np.array (shape = [ndof, ncases])
+    
+    :returns: Dictionary with the compressed stiffness, or None if it
+              would not be smaller than the packed dense stiffness
+              
+              - rp_rows: The rows of the reference point dofs, 
+                shape = [num_rp_dofs, ndof]
+              - rp_cols: The columns of the reference point dofs, 
+                without the reference point rows, 
+                shape = [ndof - num_rp_dofs, num_rp_dofs]
+              - node_rows, node_cols: The near node pairs, sorted by 
+                node_rows, see :py:func:`get_near_node_pairs`
+              - blocks: The 3x3 stiffness blocks coupling the near node
+                pairs, shape = [num_pairs, 3, 3]
+              - vectors: The eigenvectors of the far-field part, 
+                shape = [ndof, rank]
+              - eigenvalues: The corresponding eigenvalues
+              - rtol, near_distance: The parameters used
+              
+    :rtype: dict
+    
+    """
+    
+    ndof = stiffness.shape[0]
+    num_rp_dofs = ndof - 3*coordinates.shape[0]
+    if near_distance is None:
+        near_distance = NEAR_DISTANCE_FACTOR*np.median(get_closest_distances(coordinates))
+    
+    # Sparse part: reference point dofs and near nodes
+    node_rows, node_cols = get_near_node_pairs(coordinates, near_distance)
+    near_rows, near_cols = get_dof_pairs(node_rows, node_cols, offset=num_rp_dofs)
+    compressed = {'rp_rows': stiffness[:num_rp_dofs, :], 
+                  'rp_cols': stiffness[num_rp_dofs:, :num_rp_dofs],
+                  'node_rows': node_rows, 'node_cols': node_cols, 
+                  'blocks': np.reshape(stiffness[near_rows, near_cols], (-1, 3, 3)),
+                  'rtol': rtol, 'near_distance': near_distance, 'ndof': ndof}
+    
+    # Max rank giving less storage than the packed dense stiffness
+    sparse_storage = get_storage(dict(compressed, vectors=np.zeros(0), 
+                                      eigenvalues=np.zeros(0)))
+    max_rank = (stiffness_io.get_packed_size(ndof) - 1 - sparse_storage)//(ndof + 1)
+    if max_rank < 0:
+        return None
+    
+    # Low-rank part: largest eigenvalues of the far-field part
+    def apply_far_field(u):
+        return np.dot(stiffness, u) - apply_sparse(compressed, u)
+    
+    if displacements is None:
+        contact_stiffness = stiffness[num_rp_dofs:, num_rp_dofs:]
+        kc_eigenvalues, _ = get_largest_eigenpairs(lambda u: np.dot(contact_stiffness, u), 
+                                                   ndof - num_rp_dofs, 1)
+        kc_norm = np.abs(kc_eigenvalues[0])
+    else:
+        force_norms = np.sqrt(np.sum(np.dot(stiffness, displacements)**2, axis=0))
+        far_forces = apply_far_field(displacements)
+    
+    random_state = np.random.RandomState(0)
+    block_size = min(FAR_FIELD_BLOCK_SIZE, max(max_rank, 1))
+    rank = None
+    while rank is None:
+        eigenvalues, vectors = get_largest_eigenpairs(apply_far_field, ndof, block_size, 
+                                                      random_state=random_state)
+        if displacements is None:
+            rank = np.count_nonzero(np.abs(eigenvalues) > rtol*kc_norm)
+            if rank == block_size and block_size < ndof:
+                rank = None
+            elif get_residual_norm(apply_far_field, eigenvalues[:rank], vectors[:, :rank], 
+                                   random_state) > rtol*kc_norm:
+                # The last eigenvalues of the block are not converged
+                rank = None
+        else:
+            rank = get_force_error_rank(far_forces, force_norms, eigenvalues, vectors, 
+                                        displacements, rtol)
+        if rank is None:
+            if block_size >= max_rank:
+                return None
+            block_size = min(2*block_size, max_rank)
+    
+    if rank > max_rank:
+        return None
+    compressed['vectors'] = vectors[:, :rank]
+    compressed['eigenvalues'] = eigenvalues[:rank]
+    
+    return compressed
+    
+
+def get_largest_eigenpairs(apply_matrix, ndof, num_eig, num_iter=NUM_SUBSPACE_ITERATIONS,
+                           num_oversampling=NUM_OVERSAMPLING, random_state=None):
+    """ Get the eigenpairs with the largest absolute eigenvalues of a 
+    symmetric matrix by randomized subspace iteration. Only products 
+    with the matrix are required, costing :code:`O(ndof^2*num_eig)` 
+    for a dense matrix, instead of :code:`O(ndof^3)` for the full 
+    eigendecomposition. 
+    
+    :param apply_matrix: Function returning the product of the matrix 
+                         and a matrix with `ndof` rows
+    :type apply_matrix: function
+    
+    :param ndof: Size of the matrix
+    :type ndof: int
+    
+    :param num_eig: Number of eigenpairs
+    :type num_eig: int
+    
+    :param num_iter: Number of subspace iterations
+    :type num_iter: int
+    
+    :param num_oversampling: Number of extra vectors in the subspace 
+                             (in addition to half of `num_eig`), 
+                             improving the accuracy of the last 
+                             eigenpairs
+    :type num_oversampling: int
+    
+    :param random_state: Random number generator for the start vectors
+    :type random_state: np.random.RandomState
+    
+    :returns: The eigenvalues, sorted by decreasing absolute value, and
+              the corresponding eigenvectors (shape = [ndof, num_eig])
+    :rtype: tuple( np.array, np.array )
+    
+    """
+    
+    if random_state is None:
+        random_state = np.random.RandomState(0)
+    num_vectors = min(num_eig + num_eig//2 + num_oversampling, ndof)
+    basis = random_state.randn(ndof, num_vectors)
+    for _ in range(num_iter + 1):
+        basis, _ = np.linalg.qr(apply_matrix(basis))
+    eigenvalues, small_vectors = np.linalg.eigh(np.dot(basis.T, apply_matrix(basis)))
+    order = np.argsort(-np.abs(eigenvalues))[:num_eig]
+    
+    return eigenvalues[order], np.dot(basis, small_vectors[:, order])
+    
+    
+def get_residual_norm(apply_matrix, eigenvalues, vectors, random_state=None):
+    """ Estimate the spectral norm of the residual, 
+    :code:`||A - V diag(lambda) V^T||_2`, of a truncated 
+    eigendecomposition of a symmetric matrix A, see 
+    :py:func:`get_largest_eigenpairs`
+    
+    :param apply_matrix: Function returning the product of A and a 
+                         matrix
+    :type apply_matrix: function
+    
+    :param eigenvalues: The eigenvalues
+    :type eigenvalues: np.array
+    
+    :param vectors: The eigenvectors, shape = [ndof, rank]
+    :type vectors: np.array
+    
+    :param random_state: Random number generator for the start vectors
+    :type random_state: np.random.RandomState
+    
+    :returns: The estimated norm
+    :rtype: float
+    
+    """
+    
+    def apply_residual(u):
+        return (apply_matrix(u) 
+                - np.dot(vectors, eigenvalues[:, np.newaxis]*np.dot(vectors.T, u)))
+    
+    residual_eigenvalues, _ = get_largest_eigenpairs(apply_residual, vectors.shape[0], 1, 
+                                                     random_state=random_state)
+    return np.abs(residual_eigenvalues[0])
+    
+    
+def get_force_error_rank(far_forces, force_norms, eigenvalues, vectors, displacements, 
+                         rtol):
+    """ Get the smallest rank of the far-field approximation for which 
+    the relative force errors for all `displacements` are below rtol, 
+    found by bisection. 
+    
+    :param far_forces: Forces from the far-field part of the stiffness
+                       for the displacements
+    :type far_forces: np.array (shape = [ndof, ncases])
+    
+    :param force_norms: Norms of the forces from the full stiffness for 
+                        the displacements
+    :type force_norms: np.array (shape = [ncases])
+    
+    :param eigenvalues: The largest eigenvalues of the far-field part, 
+                        sorted by decreasing absolute value
+    :type eigenvalues: np.array
+    
+    :param vectors: The corresponding eigenvectors
+    :type vectors: np.array
+    
+    :param displacements: Displacements, one column per load case
+    :type displacements: np.array (shape = [ndof, ncases])
+    
+    :param rtol: Maximum relative force error
+    :type rtol: float
+    
+    :returns: The rank, or None if the error is above rtol also when 
+              using all eigenpairs
+    :rtype: int
+    
+    """
+    
+    projections = eigenvalues[:, np.newaxis]*np.dot(vectors.T, displacements)
+    
+    def max_error(rank):
+        errors = far_forces - np.dot(vectors[:, :rank], projections[:rank])
+        return np.max(np.sqrt(np.sum(errors**2, axis=0))/force_norms)
+    
+    if max_error(eigenvalues.size) > rtol:
+        return None
+    
+    low, high = 0, eigenvalues.size
+    while low < high:
+        mid = (low + high)//2
+        if max_error(mid) <= rtol:
+            high = mid
+        else:
+            low = mid + 1
+    
+    return low
+    
+
+def get_storage(compressed):
+    """ Get the number of values stored for the compressed stiffness, 
+    counting the node indices of the sparse part as values. This should be 
+    compared with the dense stiffness in packed format, see 
+    :py:func:`rollover.three_d.wheel.stiffness_io.get_packed_size`. 
+    
+    :param compressed: The compressed stiffness, see 
+                       :py:func:`compress_stiffness`
+    :type compressed: dict
+    
+    :returns: The number of stored values
+    :rtype: int
+    
+    """
+    
+    return (compressed['rp_rows'].size + compressed['rp_cols'].size 
+            + compressed['blocks'].size + compressed['node_rows'].size 
+            + compressed['node_cols'].size + compressed['vectors'].size 
+            + compressed['eigenvalues'].size)
+    
+
+def apply_compressed_stiffness(compressed, displacements):
+    """ Calculate the forces :code:`K u` using the compressed stiffness
+    from :py:func:`compress_stiffness`
+    
+    :param compressed: The compressed stiffness
+    :type compressed: dict
+    
+    :param displacements: The displacements, one column per load case
+    :type displacements: np.array (shape = [ndof] or [ndof, ncases])
+    
+    :returns: The forces, same shape as displacements
+    :rtype: np.array
+    
+    """
+    
+    u = np.reshape(displacements, (compressed['ndof'], -1))
+    forces = apply_sparse(compressed, u)
+    vectors = compressed['vectors']
+    forces += np.dot(vectors, compressed['eigenvalues'][:, np.newaxis]*np.dot(vectors.T, u))
+    
+    return np.reshape(forces, np.shape(displacements))
+    
+
+def apply_sparse(compressed, u, block_size=SPARSE_BLOCK_SIZE):
+    """ Calculate the forces from the sparse part of the compressed 
+    stiffness, see :py:func:`compress_stiffness`. All load cases are 
+    calculated at once, using the 3x3 blocks of the near node pairs. As
+    the pairs are sorted by row node, the contributions to each node are
+    summed by :code:`np.add.reduceat`. The load cases are split in 
+    chunks such that at most about `block_size` values are calculated 
+    at once for the near node pairs. 
+    
+    :param compressed: The compressed stiffness
+    :type compressed: dict
+    
+    :param u: The displacements, one column per load case
+    :type u: np.array (shape = [ndof, ncases])
+    
+    :param block_size: Approximate number of values to calculate at 
+                       once
+    :type block_size: int
+    
+    :returns: The forces
+    :rtype: np.array (shape = [ndof, ncases])
+    
+    """
+    
+    num_rp_dofs = compressed['rp_rows'].shape[0]
+    forces = np.empty(u.shape)
+    forces[:num_rp_dofs] = np.dot(compressed['rp_rows'], u)
+    forces[num_rp_dofs:] = np.dot(compressed['rp_cols'], u[:num_rp_dofs])
+    
+    node_rows = compressed['node_rows']
+    if node_rows.size == 0:
+        return forces
+    starts = np.nonzero(np.concatenate(([True], node_rows[1:] != node_rows[:-1])))[0]
+    num_cols = max(1, block_size//(3*node_rows.size))
+    for start in range(0, u.shape[1], num_cols):
+        cols = slice(start, min(start + num_cols, u.shape[1]))
+        u_nodes = np.reshape(u[num_rp_dofs:, cols], (-1, 3, cols.stop - cols.start))
+        pair_forces = np.einsum('pij,pjc->pic', compressed['blocks'],
+                                u_nodes[compressed['node_cols']])
+        node_forces = np.zeros(u_nodes.shape)
+        node_forces[node_rows[starts]] = np.add.reduceat(pair_forces, starts, axis=0)
+        forces[num_rp_dofs:, cols] += np.reshape(node_forces, (-1, cols.stop - cols.start))
+
+    return forces
+    
+
+def get_compressed_force_error(stiffness, compressed, displacements):
+    """ Reference check of the compressed stiffness: Get the relative 
+    force error, :code:`||K u - K_c u||/||K u||`, compared to the full
+    stiffness for each displacement field. 
+    
+    :param stiffness: The full stiffness matrix
+    :type stiffness: np.array
+    
+    :param compressed: The compressed stiffness, see 
+                       :py:func:`compress_stiffness`
+    :type compressed: dict
+    
+    :param displacements: The displacements, one column per load case.
+                          See :py:func:`get_contact_displacements` for
+                          typical displacement fields.
+    :type displacements: np.array (shape = [ndof, ncases])
+    
+    :returns: The relative force error for each load case
+    :rtype: np.array
+    
+    """
+    
+    forces = np.dot(stiffness, displacements)
+    errors = apply_compressed_stiffness(compressed, displacements) - forces
+    
+    return np.sqrt(np.sum(errors**2, axis=0)/np.sum(forces**2, axis=0))
+    
+    
+def get_contact_displacements(coordinates, num_cases, patch_radius, seed=0):
+    """ Get displacement fields similar to those from contact: Random 
+    displacements of the nodes within `patch_radius` from randomly 
+    chosen center nodes. The reference point is not moved. 
+    
+    :param coordinates: Node coordinates, as written by 
+                        :py:func:`save_uel`
+    :type coordinates: np.array (shape = [nnodes, 3])
+    
+    :param num_cases: Number of displacement fields
+    :type num_cases: int
+    
+    :param patch_radius: Radius of the displaced region
+    :type patch_radius: float
+    
+    :param seed: Seed for the random number generator
+    :type seed: int
+    
+    :returns: The displacements, one column per case, including the 6
+              reference point dofs first. 
+    :rtype: np.array (shape = [ndof, num_cases])
+    
+    """
+    
+    random_state = np.random.RandomState(seed)
+    num_nodes = coordinates.shape[0]
+    displacements = np.zeros((6 + 3*num_nodes, num_cases))
+    for i, center in enumerate(random_state.randint(num_nodes, size=num_cases)):
+        dist = np.sqrt(np.sum((coordinates - coordinates[center])**2, axis=1))
+        patch_nodes = np.nonzero(dist <= patch_radius)[0]
+        patch_dofs = 6 + (3*patch_nodes[:, np.newaxis] + np.arange(3)).flatten()
+        displacements[patch_dofs, i] = random_state.randn(patch_dofs.size)
+        
+    return displacements
+
+
+def get_closest_distances(coordinates):
+    """ Get the distance from each node to the closest other node. The
+    nodes within a search distance are found with 
+    :py:class:`rollover.three_d.utils.spatial_hash.SpatialHash`, 
+    starting from a small distance that is doubled for the nodes 
+    without other nodes within it. 
+    
+    :param coordinates: Node coordinates
+    :type coordinates: np.array (shape = [nnodes, 3])
+    
+    :returns: The closest distances (np.inf if only one node)
+    :rtype: np.array
+    
+    """
+    
+    num_nodes = coordinates.shape[0]
+    closest = np.inf*np.ones(num_nodes)
+    if num_nodes < 2:
+        return closest
+    extent = np.max(np.max(coordinates, axis=0) - np.min(coordinates, axis=0))
+    if extent == 0.0:
+        return np.zeros(num_nodes)
+    
+    search_distance = extent/num_nodes
+    remaining = np.arange(num_nodes)
+    while remaining.size > 0:
+        query_inds, inds, dist2 = spatial_hash.SpatialHash(
+            coordinates, search_distance).find_within(coordinates[remaining])
+        dist2[remaining[query_inds] == inds] = np.inf
+        # Each node finds itself, hence all remaining nodes have pairs
+        starts = np.nonzero(np.concatenate(([True], query_inds[1:] != query_inds[:-1])))[0]
+        closest[remaining] = search_distance*np.sqrt(np.minimum.reduceat(dist2, starts))
+        remaining = remaining[np.isinf(closest[remaining])]
+        search_distance = 2*search_distance
+    
+    return closest
+    
+
+def get_near_node_pairs(coordinates, distance):
+    """ Get all pairs of nodes (including each node with itself) closer
+    than `distance`, found with 
+    :py:class:`rollover.three_d.utils.spatial_hash.SpatialHash`
+    
+    :param coordinates: Node coordinates
+    :type coordinates: np.array (shape = [nnodes, 3])
+    
+    :param distance: The maximum distance
+    :type distance: float
+    
+    :returns: Node numbers for the first and second node in each pair,
+              sorted by the first and then the second node
+    :rtype: tuple( np.array, np.array )
+    
+    """
+    
+    rows, cols, _ = spatial_hash.SpatialHash(coordinates, distance).find_within(coordinates)
+    
+    return rows, cols
+    
+    
+def get_dof_pairs(node_rows, node_cols, offset=0):
+    """ Get the dof pairs (3 dofs per node) coupling the node pairs 
+    given by node_rows and node_cols
+    
+    :param offset: Number of dofs before the first node dof
+    :type offset: int
+    
+    :returns: Dof numbers for the first and second dof in each pair
+    :rtype: tuple( np.array, np.array )
+    
+    """
+    dofs = np.arange(3)
+    num_pairs = node_rows.size
+    rows = offset + np.repeat(3*node_rows, 9) + np.tile(np.repeat(dofs, 3), num_pairs)
+    cols = offset + np.repeat(3*node_cols, 9) + np.tile(np.tile(dofs, 3), num_pairs)
+    return rows, cols
+    
+    
+def save_compressed_stiffness(file_name, compressed):
+    """ Save the compressed stiffness from :py:func:`compress_stiffness`
+    to an .npz file
+    
+    :param file_name: Name of the file to write
+    :type file_name: str
+    
+    :param compressed: The compressed stiffness
+    :type compressed: dict
+    
+    :returns: None
+    :rtype: None
+    
+    """
+    np.savez(file_name, **compressed)
+    
+    
+def read_compressed_stiffness(file_name):
+    """ Read the compressed stiffness saved by 
+    :py:func:`save_compressed_stiffness`
+    
+    :param file_name: Name of the file to read
+    :type file_name: str
+    
+    :returns: The compressed stiffness, see :py:func:`compress_stiffness`
+    :rtype: dict
+    
+    """
+    with np.load(file_name) as data:
+        compressed = dict([(key, data[key]) for key in data.files])
+    for key in ['rtol', 'near_distance']:
+        compressed[key] = float(compressed[key])
+    compressed['ndof'] = int(compressed['ndof'])
+    return compressed
+    
     
 def create_test_part(quadratic_elements=True):
     """ Create a test part to verify that the elements and nodes are 
@@ -460,6 +995,10 @@ def create_test_part(quadratic_elements=True):
     
     """
     
+    # Abaqus imports (only available in Abaqus python)
+    from abaqusConstants import QUAD4, QUAD8, THREE_D, DEFORMABLE_BODY
+    import rollover.utils.abaqus_python_tools as apt
+    
     if quadratic_elements:
         elem_shape=QUAD8
     else:
@@ -1,9 +1,9 @@
 """ This module is used to generate a 3d mesh based on a 2d section in
-the xy-plane that is revolved around the x-axis. Note that only 
-quadratic elements are supported. For linear elements, Abaqus' builtin
-routine works reasonably well (although the node coordinate accuracy 
-seem a bit low), see 
-:py:func:`~rollover.three_d.wheel.substructure.generate_3d_mesh`
+the xy-plane that is revolved around the x-axis. Both quadratic 
+(C3D20/C3D15 from S8/STRI65) and linear (C3D8/C3D6 from S4/S3) elements
+are supported. This replaces Abaqus' builtin routine, see 
+:py:func:`~rollover.three_d.wheel.substructure.generate_3d_mesh`, which
+gives lower node coordinate accuracy and is slower. 
 
 """
 from __future__ import print_function
@@ -11,8 +11,10 @@ import numpy as np
 
 
 from rollover.utils import naming_mod as names
+from rollover.utils import inp_writer
+from rollover.three_d.utils import spatial_hash
 
-def generate(wheel_model, mesh_size):
+def generate(wheel_model, mesh_size, quadratic_order=True):
     """ Based on a meshed 2d-profile of a wheel, generate a 3d-revolved
     mesh with angular spacing such that the elements on the outer radius 
     have a circumferential size of mesh_size.
@@ -24,8 +26,13 @@ def generate(wheel_model, mesh_size):
     :param mesh_size: The mesh size to decide the angular increments
     :type mesh_size: float
     
-    :returns: The wheel part and the angles for the element end planes
-    :type: tuple( Part object(Abaqus), np.array )
+    :param quadratic_order: Is the 2d mesh quadratic? Otherwise linear.
+    :type quadratic_order: bool
+    
+    :returns: The wheel part and the mesh specification, see 
+              :py:func:`make_3d_mesh_quad`. The node labels in the 
+              wheel part are the node numbers in the mesh + 1. 
+    :type: tuple( Part object(Abaqus), dict )
     
     """
     
@@ -34,7 +41,10 @@ def generate(wheel_model, mesh_size):
     mesh_2d = get_2d_mesh(wheel_part)
     
     # 2) Create the 3d-mesh
-    mesh_3d = make_3d_mesh_quad(mesh_2d, mesh_size)
+    if quadratic_order:
+        mesh_3d = make_3d_mesh_quad(mesh_2d, mesh_size)
+    else:
+        mesh_3d = make_3d_mesh_linear(mesh_2d, mesh_size)
     
     # 3) Save the 3d-mesh to a part definition in an abaqus input file
     input_file = save_3d_mesh_to_inp(mesh_3d)
@@ -44,7 +54,7 @@ def generate(wheel_model, mesh_size):
     
     wheel_model.PartFromInputFile(inputFileName=input_file)
     wheel_part = wheel_model.parts[names.wheel_part]
-    return wheel_part, mesh_3d['angles']
+    return wheel_part, mesh_3d
     
 
 def get_2d_mesh(wheel_part):
@@ -68,31 +78,22 @@ def get_2d_mesh(wheel_part):
     """
     node_coords = np.array([n.coordinates for n in wheel_part.nodes])
     elements = {'N3': [], 'N4': [], 'N6': [], 'N8': []}
-    edge_nodes = []
-    corner_nodes = []
+    all_elements = []
     for e in wheel_part.elements:
         enods = e.connectivity
         num_enods = len(enods)
         key = 'N' + str(num_enods)
         if key in elements:
             elements[key].append(enods)
+            all_elements.append(enods)
         else:
             raise ValueError('Unknown element type with '
                              + str(num_enods) + ' nodes.\n'
                              + '- Element label: ' + e.label + '\n'
                              + '- Element nodes: ' + enods + '\n'
                              + '- Element type : ' + e.type + '\n')
-        if num_enods > 4:   # 2nd order, second half of nodes on edges
-            for n in enods[:num_enods//2]:
-                if n not in corner_nodes:
-                    corner_nodes.append(n)
-            for n in enods[num_enods//2:]:
-                if n not in edge_nodes:
-                    edge_nodes.append(n)
-        else:               # 1st order elements, all nodes at corners
-            for n in enods:
-                if n not in corner_nodes:
-                    corner_nodes.append(n)
+    
+    edge_nodes, corner_nodes = get_edge_and_corner_nodes(all_elements)
     
     the_mesh = {'nodes': node_coords, 'elements': elements,
                 'edge_nodes': edge_nodes, 'corner_nodes': corner_nodes}
@@ -100,6 +101,44 @@ def get_2d_mesh(wheel_part):
     return the_mesh
     
 
+def get_edge_and_corner_nodes(elem_2d_con):
+    """ Determine which nodes in the 2d mesh that are on the element 
+    edges and which that are at the element corners. The nodes are 
+    given in the order they first appear in `elem_2d_con`.
+    
+    :param elem_2d_con: list of list of 2d nodes for each element
+    :type elem_2d_con: list[ list[ int ] ]
+    
+    :returns: list of edge nodes and list of corner nodes
+    :rtype: tuple( list[ int ], list[ int ] )
+    
+    """
+    
+    edge_nodes = []
+    corner_nodes = []
+    # Sets only used for fast lookup, the lists give the order
+    edge_node_set = set()
+    corner_node_set = set()
+    for enods in elem_2d_con:
+        num_enods = len(enods)
+        if num_enods > 4:   # 2nd order, second half of nodes on edges
+            corner_enods = enods[:num_enods//2]
+            edge_enods = enods[num_enods//2:]
+        else:               # 1st order elements, all nodes at corners
+            corner_enods = enods
+            edge_enods = []
+        for n in corner_enods:
+            if n not in corner_node_set:
+                corner_nodes.append(n)
+                corner_node_set.add(n)
+        for n in edge_enods:
+            if n not in edge_node_set:
+                edge_nodes.append(n)
+                edge_node_set.add(n)
+    
+    return edge_nodes, corner_nodes
+    
+
 def make_3d_mesh_quad(mesh_2d, mesh_size):
     """ Revolve a 2d-mesh into a 3d-mesh 
     
@@ -126,6 +165,11 @@ def make_3d_mesh_quad(mesh_2d, mesh_size):
                 of list of node labels
               - angles: np.array of angles for angular increments of 
                 elements. 
+              - node_sources: np.array with the 2d node number each 
+                node is revolved from
+              - node_angles: np.array with the angle each node is 
+                revolved with
+              - section_nodes: np.array with the 2d node coordinates
     :rtype: dict
     
     """
@@ -135,42 +179,43 @@ def make_3d_mesh_quad(mesh_2d, mesh_size):
     edge_node_num_2d = mesh_2d['edge_nodes']
     corner_node_num_2d = mesh_2d['corner_nodes']
     
-    r_outer = np.max(np.abs(nodes_2d[:, 1]))
-    num_angles = int(r_outer*2*np.pi/mesh_size)
-    angles = np.linspace(0, 2*np.pi, num_angles+1)[:-1]
+    angles = get_mesh_angles(nodes_2d, mesh_size)
+    num_angles = len(angles)
     delta_angle = angles[1]-angles[0]
     
-    # Calculate size of mesh and allocate variables
+    # Calculate size of mesh
     num_corner_nodes_2d = len(corner_node_num_2d)
     num_edge_nodes_2d = len(edge_node_num_2d)
     num_nodes_per_section = 2*num_corner_nodes_2d + num_edge_nodes_2d
     
-    nodes = np.zeros((num_nodes_per_section*num_angles, 3), dtype=np.float)
-    
-    corner_node_num = np.zeros((num_corner_nodes_2d, num_angles), dtype=np.int)
-    edge_ip_node_num = np.zeros((num_edge_nodes_2d, num_angles), dtype=np.int)
-    edge_op_node_num = np.zeros((num_corner_nodes_2d, num_angles), dtype=np.int)
-    
-    edge_op_node_num[-1,-1] = -1    # Used the first iteration in the loop
-    for i, ang in enumerate(angles):
-        # Corner nodes
-        corner_node_num[:, i] = edge_op_node_num[-1,i-1] + 1 + np.arange(num_corner_nodes_2d)
-        for j, num in enumerate(corner_node_num[:,i]):
-            coords_2d = nodes_2d[corner_node_num_2d[j], :]
-            nodes[num, :] = rotate_coords(coords_2d, ang)
-        # Edge nodes (in plane)
-        edge_ip_node_num[:, i] = corner_node_num[-1,i] + 1 + np.arange(num_edge_nodes_2d)
-        for j, num in enumerate(edge_ip_node_num[:,i]):
-            coords_2d = nodes_2d[edge_node_num_2d[j], :]
-            nodes[num, :] = rotate_coords(coords_2d, ang)
-            
-        # Edge nodes (out of plane, i.e. between angle increments, 
-        # stemming from corner nodes in 2d)
-        edge_op_node_num[:, i] = edge_ip_node_num[-1,i] + 1 + np.arange(num_corner_nodes_2d)
-        for j, num in enumerate(edge_op_node_num[:,i]):
-            coords_2d = nodes_2d[corner_node_num_2d[j], :]
-            nodes[num, :] = rotate_coords(coords_2d, ang + delta_angle/2.0)
-
+    # Node numbers: For each angle, first the corner nodes, then the 
+    # edge nodes in plane, and finally the edge nodes out of plane (i.e.
+    # between angle increments, stemming from corner nodes in 2d)
+    section_start = num_nodes_per_section*np.arange(num_angles, dtype=int)
+    corner_inds = np.arange(num_corner_nodes_2d, dtype=int)[:, np.newaxis]
+    edge_inds = np.arange(num_edge_nodes_2d, dtype=int)[:, np.newaxis]
+    corner_node_num = section_start + corner_inds
+    edge_ip_node_num = section_start + num_corner_nodes_2d + edge_inds
+    edge_op_node_num = section_start + num_corner_nodes_2d + num_edge_nodes_2d + corner_inds
+    
+    # Node coordinates, first index angle, second index node in section
+    nodes = np.zeros((num_angles, num_nodes_per_section, 3), dtype=np.float64)
+    corner_coords_2d = nodes_2d[np.array(corner_node_num_2d, dtype=int), :]
+    edge_coords_2d = nodes_2d[np.array(edge_node_num_2d, dtype=int), :]
+    nodes[:, :num_corner_nodes_2d, :] = revolve_coords(corner_coords_2d, angles)
+    nodes[:, num_corner_nodes_2d:(num_corner_nodes_2d + num_edge_nodes_2d), :] = \
+        revolve_coords(edge_coords_2d, angles)
+    nodes[:, (num_corner_nodes_2d + num_edge_nodes_2d):, :] = \
+        revolve_coords(corner_coords_2d, angles + delta_angle/2.0)
+    nodes = nodes.reshape((-1, 3))
+    
+    # Bookkeeping of the 2d node and angle for each 3d node
+    section_sources = np.concatenate((corner_node_num_2d, edge_node_num_2d, 
+                                      corner_node_num_2d)).astype(int)
+    node_sources = np.tile(section_sources, num_angles)
+    node_angles = np.repeat(angles, num_nodes_per_section)
+    node_angles[edge_op_node_num.flatten()] += delta_angle/2.0
+    
     angle_inds = np.arange(num_angles+1)
     angle_inds[-1] = 0
     hex20_elems = get_elements(elems_2d['N8'], angle_inds, corner_node_num_2d, 
@@ -183,11 +228,183 @@ def make_3d_mesh_quad(mesh_2d, mesh_size):
     
     mesh_3d = {'nodes': nodes,
                'elements': {'N15': wedge15_elems, 'N20': hex20_elems},
-               'angles': angles}
+               'angles': angles,
+               'node_sources': node_sources,
+               'node_angles': node_angles,
+               'section_nodes': nodes_2d}
     
     return mesh_3d
     
 
+def make_3d_mesh_linear(mesh_2d, mesh_size):
+    """ Revolve a linear 2d-mesh into a 3d-mesh 
+    
+    :param mesh_2d: Mesh specification, see :py:func:`make_3d_mesh_quad`. 
+                    For linear elements, all nodes are corner nodes.
+    :type mesh_2d: dict
+    
+    :param mesh_size: The circumferential mesh size at largest radius
+    :type mesh_size: float
+    
+    :returns: Mesh specification with the following fields:
+              
+              - nodes: np.array with node coordinates
+              - elements: dictionary with keys according to number 
+                of nodes in element: N6, N8. Each item contains an 
+                array with the node numbers of each element
+              - angles, node_sources, node_angles, section_nodes: See 
+                :py:func:`make_3d_mesh_quad`
+    :rtype: dict
+    
+    """
+    
+    nodes_2d = mesh_2d['nodes']
+    elems_2d = mesh_2d['elements']
+    corner_node_num_2d = mesh_2d['corner_nodes']
+    
+    angles = get_mesh_angles(nodes_2d, mesh_size)
+    num_angles = len(angles)
+    
+    # Node numbers: For each angle, the corner nodes
+    num_corner_nodes_2d = len(corner_node_num_2d)
+    section_start = num_corner_nodes_2d*np.arange(num_angles, dtype=int)
+    corner_node_num = section_start + np.arange(num_corner_nodes_2d, dtype=int)[:, np.newaxis]
+    
+    # Node coordinates
+    corner_coords_2d = nodes_2d[np.array(corner_node_num_2d, dtype=int), :]
+    nodes = revolve_coords(corner_coords_2d, angles).reshape((-1, 3))
+    
+    # Bookkeeping of the 2d node and angle for each 3d node
+    node_sources = np.tile(np.array(corner_node_num_2d, dtype=int), num_angles)
+    node_angles = np.repeat(angles, num_corner_nodes_2d)
+    
+    angle_inds = np.arange(num_angles+1)
+    angle_inds[-1] = 0
+    hex8_elems = get_linear_elements(elems_2d['N4'], angle_inds, corner_node_num_2d, 
+                                     corner_node_num)
+    wedge6_elems = get_linear_elements(elems_2d['N3'], angle_inds, corner_node_num_2d, 
+                                       corner_node_num)
+    
+    mesh_3d = {'nodes': nodes,
+               'elements': {'N6': wedge6_elems, 'N8': hex8_elems},
+               'angles': angles,
+               'node_sources': node_sources,
+               'node_angles': node_angles,
+               'section_nodes': nodes_2d}
+    
+    return mesh_3d
+    
+
+def get_retained_node_labels(mesh_3d, coords_2d, wheel_angles, tol):
+    """ Get the labels of the nodes revolved from the 2d coordinates 
+    `coords_2d` that are within the angular interval `wheel_angles`, 
+    using the bookkeeping from the revolution. 
+    
+    :param mesh_3d: Mesh specification, see :py:func:`make_3d_mesh_quad`
+    :type mesh_3d: dict
+    
+    :param coords_2d: List of coordinates in the xy-plane (negative y) 
+                      describing which node positions to retain
+    :type coords_2d: list[ list[ float ] ]
+    
+    :param wheel_angles: Interval of angles (wrt. negative y-direction,
+                         positive rotation around x-axis) for retained
+                         nodes
+    :type wheel_angles: list[ float ] (len=2)
+    
+    :param tol: Tolerance for matching `coords_2d` to the 2d nodes
+    :type tol: float
+    
+    :returns: The node labels (node numbers + 1), sorted
+    :rtype: np.array( int )
+    
+    """
+    if wheel_angles[0] >= wheel_angles[1]:
+        raise ValueError('The second wheel angle must be greater than the first')
+    
+    # Find the 2d nodes
+    section_nodes = np.asarray(mesh_3d['section_nodes'])[:, :2]
+    coords_2d = np.asarray(coords_2d, dtype=np.float64)[:, :2]
+    node_hash = spatial_hash.SpatialHash(section_nodes, tol)
+    source_nodes, _ = node_hash.find_closest(coords_2d)
+    if np.any(source_nodes < 0):
+        raise ValueError('Could not find 2d node at ' 
+                         + str(coords_2d[np.argmax(source_nodes < 0)]))
+    
+    # Rotating the 2d node (x, -r, 0) with the mesh angle gives z < 0 
+    # for small positive mesh angles, i.e. wheel angle = -mesh angle.
+    wheel_node_angles = np.mod(np.pi - mesh_3d['node_angles'], 2*np.pi) - np.pi
+    in_interval = ((wheel_node_angles >= wheel_angles[0]) 
+                   & (wheel_node_angles <= wheel_angles[1]))
+    is_source = np.zeros(section_nodes.shape[0], dtype=bool)
+    is_source[source_nodes] = True
+    
+    return np.nonzero(in_interval & is_source[mesh_3d['node_sources']])[0] + 1
+    
+
+def get_mesh_angles(nodes_2d, mesh_size):
+    """ Get the angles for the element end planes, such that the 
+    elements at the largest radius have a circumferential size of 
+    approximately `mesh_size`. 
+    
+    :param nodes_2d: Node coordinates of the 2d mesh
+    :type nodes_2d: np.array
+    
+    :param mesh_size: The circumferential mesh size at largest radius
+    :type mesh_size: float
+    
+    :returns: The angles, in the interval [0, 2*pi)
+    :rtype: np.array
+    
+    """
+    
+    r_outer = np.max(np.abs(nodes_2d[:, 1]))
+    num_angles = int(r_outer*2*np.pi/mesh_size)
+    return np.linspace(0, 2*np.pi, num_angles+1)[:-1]
+    
+
+def get_linear_elements(elem_2d_con, angle_inds, corner_node_num_2d, corner_node_num):
+    """ Get the node lists of the revolved linear elements belonging to
+    a given set of node lists of elements from the 2d mesh. The node 
+    order follows the corner nodes in :py:func:`get_elements`. 
+    
+    :param elem_2d_con: list of list of 2d nodes for each element
+    :type elem_2d_con: list[ list[ int ] ]
+    
+    :param angle_inds: indices of angles, counting 0, 1, 2, ..., N, 0
+    :type angle_inds: np.array
+    
+    :param corner_node_num_2d: node numbers of corner nodes from 2d
+    :type corner_node_num_2d: list[ int ]
+    
+    :param corner_node_num: array of node numbers for corner nodes in 
+                            3d. First index refers to index in 
+                            corner_node_num_2d and second index to 
+                            angle_inds
+    :type corner_node_num: np.array( int )
+    
+    :returns: array with the element node numbers for the 3d mesh, 
+              one row per element
+    :rtype: np.array
+    
+    """
+    
+    num_angles = len(angle_inds) - 1
+    if len(elem_2d_con) == 0:
+        return np.zeros((0, 0), dtype=corner_node_num.dtype)
+    
+    elem_2d_con = np.array(elem_2d_con, dtype=int)
+    corner_rows = get_row_numbers(elem_2d_con, corner_node_num_2d)[:, np.newaxis, :]
+    
+    # Index order: 2d element, angle increment, element node
+    ang0 = np.asarray(angle_inds[:-1])[np.newaxis, :, np.newaxis]
+    ang1 = np.asarray(angle_inds[1:])[np.newaxis, :, np.newaxis]
+    elems = np.concatenate((corner_node_num[corner_rows, ang1], 
+                            corner_node_num[corner_rows, ang0]), axis=2)
+    
+    return elems.reshape((elem_2d_con.shape[0]*num_angles, -1))
+    
+
 def get_elements(elem_2d_con, angle_inds, corner_node_num_2d, edge_node_num_2d, 
                  corner_node_num, edge_ip_node_num, edge_op_node_num):
     """ Get the node lists of the revolved elements belonging to a given
@@ -222,31 +439,89 @@ def get_elements(elem_2d_con, angle_inds, corner_node_num_2d, edge_node_num_2d,
                              angle_inds. 
     :type edge_op_node_num: np.array( int )
     
-    :returns: list of list containing element node labels for 3d mesh
+    :returns: array with the element node numbers for the 3d mesh, 
+              one row per element
     :rtype: np.array
     
     """
-    elems = []
-    n = len(elem_2d_con[0])//2
-    
-    for enodes in elem_2d_con:
-        corner_rows = [corner_node_num_2d.index(node_num) for node_num in enodes[:n]]
-        edge_rows = [edge_node_num_2d.index(node_num) for node_num in enodes[n:]]
-        for i in range(len(angle_inds)-1):
-            elems.append([])
-            # Corner nodes
-            for j in range(2):
-                for cr in corner_rows:
-                    elems[-1].append(corner_node_num[cr, angle_inds[i+(1-j)]])
-            # Edge nodes in plane
-            for j in range(2):
-                for er in edge_rows:
-                    elems[-1].append(edge_ip_node_num[er, angle_inds[i+(1-j)]])
-            # Edge nodes between planes
-            for cr in corner_rows:
-                elems[-1].append(edge_op_node_num[cr, angle_inds[i]])
-        
-    return np.array(elems)
+    num_angles = len(angle_inds) - 1
+    if len(elem_2d_con) == 0:
+        return np.zeros((0, 0), dtype=corner_node_num.dtype)
+    
+    elem_2d_con = np.array(elem_2d_con, dtype=int)
+    n = elem_2d_con.shape[1]//2
+    
+    # Rows in the node number arrays for each node in elem_2d_con
+    corner_rows = get_row_numbers(elem_2d_con[:, :n], corner_node_num_2d)
+    edge_rows = get_row_numbers(elem_2d_con[:, n:], edge_node_num_2d)
+    
+    # Index order: 2d element, angle increment, element node
+    ang0 = np.asarray(angle_inds[:-1])[np.newaxis, :, np.newaxis]
+    ang1 = np.asarray(angle_inds[1:])[np.newaxis, :, np.newaxis]
+    corner_rows = corner_rows[:, np.newaxis, :]
+    edge_rows = edge_rows[:, np.newaxis, :]
+    elems = np.concatenate((corner_node_num[corner_rows, ang1],   # Corner nodes
+                            corner_node_num[corner_rows, ang0], 
+                            edge_ip_node_num[edge_rows, ang1],    # Edge nodes in plane
+                            edge_ip_node_num[edge_rows, ang0],
+                            edge_op_node_num[corner_rows, ang0]), # Edge nodes between planes
+                           axis=2)
+    
+    return elems.reshape((elem_2d_con.shape[0]*num_angles, -1))
+    
+
+def get_row_numbers(node_nums, row_node_nums):
+    """ Get the index in `row_node_nums` for each node number in 
+    `node_nums`, i.e. the vectorized version of 
+    :code:`row_node_nums.index(node_num)`.
+    
+    :param node_nums: Node numbers to find the rows for
+    :type node_nums: np.array( int )
+    
+    :param row_node_nums: Node numbers for each row
+    :type row_node_nums: list[ int ]
+    
+    :returns: Row numbers, same shape as `node_nums`
+    :rtype: np.array( int )
+    
+    """
+    
+    row_node_nums = np.array(row_node_nums, dtype=int)
+    rows = -np.ones(max(np.max(row_node_nums), np.max(node_nums)) + 1, dtype=int)
+    # Reversed assignment, such that the first occurrence is kept
+    rows[row_node_nums[::-1]] = np.arange(len(row_node_nums), dtype=int)[::-1]
+    node_rows = rows[node_nums]
+    if np.any(node_rows < 0):
+        raise ValueError('Node number ' + str(node_nums[node_rows < 0][0]) + ' not found')
+    
+    return node_rows
+    
+
+def revolve_coords(coords, angles):
+    """ Rotate 2d coords in the xy-plane around the x-axis for each of 
+    the angles in `angles`. Equivalent to calling 
+    :py:func:`rotate_coords` for each coordinate and angle. 
+    
+    :param coords: Coordinates in xy-plane to be rotated, size [N,2] or 
+                   [N,3]. The z-coordinate is ignored. 
+    :type coords: np.array
+    
+    :param angles: Angles to rotate the coordinates with, size [M]
+    :type angles: np.array
+    
+    :returns: Rotated coordinates, size [M, N, 3]
+    :rtype: np.array
+    
+    """
+    
+    cos_ang = np.cos(angles)[:, np.newaxis]
+    sin_ang = np.sin(angles)[:, np.newaxis]
+    coords_rotated = np.zeros((len(angles), coords.shape[0], 3))
+    coords_rotated[:, :, 0] = coords[:, 0]
+    coords_rotated[:, :, 1] = coords[:, 1]*cos_ang
+    coords_rotated[:, :, 2] = coords[:, 1]*sin_ang
+    
+    return coords_rotated
     
 
 def rotate_coords(coords, angles):
@@ -320,9 +595,7 @@ def save_3d_mesh_to_inp(mesh_3d):
         inp.write('*Part, name=' + names.wheel_part + '\n')
         
         # Write node coordinates
-        inp.write('*Node\n')
-        for i, node in enumerate(mesh_3d['nodes']):
-            inp.write(('{:7.0f}' + 3*', {:25.15e}' + '\n').format(i+1, *node))
+        inp_writer.write_nodes(inp, mesh_3d['nodes'])
         
         # Write element connectivity
         ecodes = {'N6': 'C3D6',     # Linear wedge elements
@@ -332,13 +605,12 @@ def save_3d_mesh_to_inp(mesh_3d):
                   }
         enum = 1
         for etype in mesh_3d['elements']:
-            ecode = ecodes[etype]
             elems = mesh_3d['elements'][etype]
-            nnods = len(elems[0])
-            inp.write('*Element, type=' + ecode + '\n')
-            for i, elem in enumerate(elems):
-                elem_nn = elem + 1  # Because abaqus numbering starts from 1
-                inp.write(('{:7.0f}' + nnods*', {:7.0f}' + '\n').format(i+enum, *elem_nn))
+            if len(elems) == 0:
+                continue
+            # Abaqus numbering starts from 1
+            inp_writer.write_elements(inp, elems + 1, ecodes[etype], 
+                                      labels=enum + np.arange(len(elems)))
             enum = enum + len(elems)
         inp.write('*End Part\n')
         
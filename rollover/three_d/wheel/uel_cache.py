@@ -0,0 +1,295 @@
+"""Cache of generated wheel user element files
+
+Generating a wheel super element requires running the substructure
+generation job, which is expensive. As the result only depends on the
+wheel settings, the wheel profile, the Abaqus version and the code
+generating the wheel,
+the user element files are saved in a cache folder, with one subfolder
+per entry. The name of the subfolder is a hash of the inputs, see
+:py:func:`get_key`.
+
+The total size of the cache is bounded. When a new entry is added, the
+least recently used entries are removed until the cache size is below
+the limit. An entry is marked as used by updating the modification time
+of its info file (:py:data:`INFO_FILE`). By default, the cache is
+placed in the user's cache directory, see :py:func:`get_default_folder`.
+
+This module does not depend on Abaqus.
+
+.. codeauthor:: Knut Andreas Meyer
+"""
+
+from __future__ import print_function
+import os, shutil, json, hashlib, time, uuid
+
+from rollover.utils import naming_mod as names
+
+CACHE_FORMAT_VERSION = 1
+DEFAULT_MAX_SIZE = 2*1024**3    # Default maximum cache size in bytes
+INFO_FILE = 'cache_info.json'
+
+# Settings that do not affect the generated user element files
+IGNORED_SETTINGS = ['wheel_name', 'uel_cache_folder', 'uel_cache_max_size']
+
+# Source files (relative to the rollover package) used for generating
+# the user element files, i.e. the modules imported (directly or 
+# indirectly) by the wheel substructure and super_element modules. 
+# Changing these invalidates the cache.
+CODE_FILES = ['three_d/wheel/substructure.py',
+              'three_d/wheel/three_d_mesh.py',
+              'three_d/wheel/super_element.py',
+              'three_d/wheel/stiffness_io.py',
+              'three_d/utils/spatial_hash.py',
+              'three_d/utils/sketch_tools.py',
+              'utils/inp_writer.py',
+              'utils/inp_file_edit.py',
+              'utils/general.py',
+              'utils/abaqus_python_tools.py',
+              'utils/naming_mod.py']
+
+# Files produced by super_element.get_uel_mesh, the binary stiffness
+# file is only produced if requested.
+UEL_FILES = [names.uel_stiffness_file,
+             names.uel_coordinates_file,
+             names.uel_elements_file]
+OPTIONAL_UEL_FILES = [names.uel_stiffness_binary_file]
+
+
+def get_default_folder():
+    """ Get the default cache folder, :file:`rollover/uel_cache` in the
+    user's cache directory. This is :file:`%LOCALAPPDATA%` on Windows,
+    and :file:`$XDG_CACHE_HOME` or :file:`~/.cache` otherwise. 
+
+    :returns: The path to the default cache folder
+    :rtype: str
+
+    """
+    if os.name == 'nt' and 'LOCALAPPDATA' in os.environ:
+        user_cache = os.environ['LOCALAPPDATA']
+    elif 'XDG_CACHE_HOME' in os.environ:
+        user_cache = os.environ['XDG_CACHE_HOME']
+    else:
+        user_cache = os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(user_cache, 'rollover', 'uel_cache')
+
+
+def get_key(wheel_param, profile_file, abaqus_version):
+    """ Get the cache key for the wheel described by wheel_param
+
+    :param wheel_param: The wheel settings, see
+                        :py:func:`rollover.three_d.wheel.substructure.generate`
+    :type wheel_param: dict
+
+    :param profile_file: Path to the wheel profile file (with any
+                         :file:`:/` prefix replaced by the data path)
+    :type profile_file: str
+
+    :param abaqus_version: The Abaqus version used for generating the
+                           wheel (e.g. :code:`mdb.version`)
+    :type abaqus_version: str
+
+    :returns: Hexadecimal sha256 hash of the settings (excluding
+              :py:data:`IGNORED_SETTINGS`), the profile file contents,
+              the Abaqus version and the code version
+              (:py:func:`get_code_version`)
+    :rtype: str
+
+    """
+    settings = dict([(key, wheel_param[key]) for key in wheel_param
+                     if key not in IGNORED_SETTINGS])
+
+    key_hash = hashlib.sha256()
+    key_hash.update(('format ' + str(CACHE_FORMAT_VERSION) + '\n').encode('utf-8'))
+    key_hash.update(json.dumps(settings, sort_keys=True).encode('utf-8'))
+    key_hash.update(get_file_hash(profile_file).encode('utf-8'))
+    key_hash.update(('abaqus ' + str(abaqus_version) + '\n').encode('utf-8'))
+    key_hash.update(get_code_version().encode('utf-8'))
+
+    return key_hash.hexdigest()
+
+
+def get_code_version():
+    """ Get the code version as the hash of :py:data:`CODE_FILES`
+
+    :returns: Hexadecimal sha256 hash of the source files
+    :rtype: str
+
+    """
+    rollover_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    code_hash = hashlib.sha256()
+    for code_file in CODE_FILES:
+        code_hash.update(code_file.encode('utf-8'))
+        code_hash.update(get_file_hash(os.path.join(rollover_path, code_file)).encode('utf-8'))
+
+    return code_hash.hexdigest()
+
+
+def get_file_hash(file_name, block_size=2**20):
+    """ Get the sha256 hash of the contents of file_name
+
+    :param file_name: Path to the file
+    :type file_name: str
+
+    :param block_size: Number of bytes to read at once
+    :type block_size: int
+
+    :returns: Hexadecimal sha256 hash
+    :rtype: str
+
+    """
+    file_hash = hashlib.sha256()
+    with open(file_name, 'rb') as fid:
+        block = fid.read(block_size)
+        while len(block) > 0:
+            file_hash.update(block)
+            block = fid.read(block_size)
+
+    return file_hash.hexdigest()
+
+
+def fetch(cache_folder, key, dest_folder='.'):
+    """ Copy the user element files for key from the cache to
+    dest_folder. Optional files in dest_folder that are not part of the
+    cache entry are removed, to avoid using stale files.
+
+    :param cache_folder: Path to the cache folder
+    :type cache_folder: str
+
+    :param key: The cache key, see :py:func:`get_key`
+    :type key: str
+
+    :param dest_folder: The folder to copy the files to
+    :type dest_folder: str
+
+    :returns: True if key was found in the cache, otherwise False
+    :rtype: bool
+
+    """
+    entry_folder = os.path.join(cache_folder, key)
+    info_file = os.path.join(entry_folder, INFO_FILE)
+    if not os.path.exists(info_file):
+        return False
+
+    for file_name in UEL_FILES + OPTIONAL_UEL_FILES:
+        cached_file = os.path.join(entry_folder, file_name)
+        if os.path.exists(cached_file):
+            shutil.copy(cached_file, dest_folder)
+        elif file_name in UEL_FILES:
+            raise IOError('Cache entry ' + entry_folder + ' is missing ' + file_name)
+        elif os.path.exists(os.path.join(dest_folder, file_name)):
+            os.remove(os.path.join(dest_folder, file_name))
+
+    # Mark as recently used
+    os.utime(info_file, None)
+
+    return True
+
+
+def store(cache_folder, key, src_folder='.', max_size=DEFAULT_MAX_SIZE):
+    """ Add the user element files in src_folder to the cache and
+    remove the least recently used entries if the cache size exceeds
+    max_size. The entry is first written to a temporary folder, such
+    that incomplete entries are never used.
+
+    :param cache_folder: Path to the cache folder, created if it does
+                         not exist
+    :type cache_folder: str
+
+    :param key: The cache key, see :py:func:`get_key`
+    :type key: str
+
+    :param src_folder: The folder containing the user element files
+    :type src_folder: str
+
+    :param max_size: Maximum size of the cache in bytes
+    :type max_size: int
+
+    :returns: None
+    :rtype: None
+
+    """
+    if not os.path.exists(cache_folder):
+        os.makedirs(cache_folder)
+
+    entry_folder = os.path.join(cache_folder, key)
+    tmp_folder = os.path.join(cache_folder, '_tmp_' + uuid.uuid4().hex)
+    os.mkdir(tmp_folder)
+    try:
+        for file_name in UEL_FILES + OPTIONAL_UEL_FILES:
+            src_file = os.path.join(src_folder, file_name)
+            if os.path.exists(src_file):
+                shutil.copy(src_file, tmp_folder)
+            elif file_name in UEL_FILES:
+                raise IOError('Cannot add ' + src_file + ' to cache, it does not exist')
+
+        with open(os.path.join(tmp_folder, INFO_FILE), 'w') as fid:
+            json.dump({'key': key, 'created': time.time()}, fid, indent=4)
+
+        if os.path.exists(entry_folder):
+            shutil.rmtree(entry_folder)
+        os.rename(tmp_folder, entry_folder)
+    finally:
+        if os.path.exists(tmp_folder):
+            shutil.rmtree(tmp_folder)
+
+    evict(cache_folder, max_size, keep=[key])
+
+
+def evict(cache_folder, max_size, keep=()):
+    """ Remove the least recently used entries until the total size of
+    the cache is at most max_size.
+
+    :param cache_folder: Path to the cache folder
+    :type cache_folder: str
+
+    :param max_size: Maximum size of the cache in bytes
+    :type max_size: int
+
+    :param keep: Keys that should not be removed, even if the size
+                 is exceeded.
+    :type keep: list[ str ]
+
+    :returns: The removed keys
+    :rtype: list[ str ]
+
+    """
+    entries = get_entries(cache_folder)
+    total_size = sum([entry['size'] for entry in entries])
+    removed = []
+    for entry in sorted(entries, key=lambda e: e['last_used']):
+        if total_size <= max_size:
+            break
+        if entry['key'] in keep:
+            continue
+        shutil.rmtree(os.path.join(cache_folder, entry['key']))
+        total_size -= entry['size']
+        removed.append(entry['key'])
+
+    return removed
+
+
+def get_entries(cache_folder):
+    """ Get information about the complete entries in the cache
+
+    :param cache_folder: Path to the cache folder
+    :type cache_folder: str
+
+    :returns: List of dictionaries with keys 'key', 'size' (bytes) and
+              'last_used' (modification time of the info file)
+    :rtype: list[ dict ]
+
+    """
+    entries = []
+    if not os.path.exists(cache_folder):
+        return entries
+
+    for key in os.listdir(cache_folder):
+        entry_folder = os.path.join(cache_folder, key)
+        info_file = os.path.join(entry_folder, INFO_FILE)
+        if not os.path.exists(info_file):
+            continue    # Not a (complete) entry
+        size = sum([os.path.getsize(os.path.join(entry_folder, file_name))
+                    for file_name in os.listdir(entry_folder)])
+        entries.append({'key': key, 'size': size, 'last_used': os.path.getmtime(info_file)})
+
+    return entries
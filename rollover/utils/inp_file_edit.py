@@ -2,15 +2,144 @@
 file. Options not available in CAE can therefore be added via the 
 scripting interface.
 
+Each function below searches the keyword block and inserts directly.
+For many insertions, use :py:class:`KeywordBlockEditor`, which indexes
+the keyword block once and applies all insertions in one pass. 
+
+This module does not depend on Abaqus, such that the editing can be
+tested with any object with the `sieBlocks` attribute and the `insert`
+method of the Abaqus keyword block. 
+
 .. codeauthor:: Knut Andreas Meyer
 """
 
 from __future__ import print_function
-import sys, os, inspect
-from abaqusConstants import *
-import abaqus
+import re
+
+
+class KeywordBlockEditor(object):
+    """Queue insertions into a keyword block and apply them in one pass,
+    see :py:meth:`apply`. The positions are found in the keyword block
+    as it was when the editor was created, and the categories are 
+    indexed by name the first time a category is searched. The result 
+    is the same as calling the corresponding functions in this module 
+    in the same order, as long as the searched lines are not in the 
+    queued strings. 
+    
+    :param keyword_block: The Abaqus keywordBlock that contains the 
+                          keyword to be written to the input file
+    :type keyword_block: KeywordBlock object (Abaqus)
+    
+    """
+    
+    def __init__(self, keyword_block):
+        self.keyword_block = keyword_block
+        self.sie_blocks = list(keyword_block.sieBlocks)
+        self.category_index = {}
+        self.insertions = []
+        
+    def add_at_end_of_cat(self, string_to_add, category, name):
+        """Queue adding `string_to_add` just before the end of the 
+        category of type `category` with name `name`, see 
+        :py:func:`add_at_end_of_cat`
+        
+        """
+        if category not in self.category_index:
+            self.category_index[category] = get_category_index(self.sie_blocks, category)
+        if name not in self.category_index[category]:
+            raise ValueError('Could not find the end of *' + category + ', name=' + name)
+        self.queue(self.category_index[category][name] - 1, string_to_add)
+        
+    def add_after(self, string_to_add, find_strings=None):
+        """Queue adding `string_to_add` after the first line that 
+        contains all strings in `find_strings`, see :py:func:`add_after`
+        
+        """
+        if find_strings is None:
+            line_num = 0
+        else:
+            line_num = find_strings_in_iterable(self.sie_blocks, find_strings)
+        self.queue(line_num, string_to_add, directly_after=True)
+        
+    def add_before(self, string_to_add, find_strings=None):
+        """Queue adding `string_to_add` before the first line that 
+        contains all strings in `find_strings`, see 
+        :py:func:`add_before`
+        
+        """
+        if find_strings is None:
+            line_num = len(self.sie_blocks)
+        else:
+            line_num = find_strings_in_iterable(self.sie_blocks, find_strings)-1
+        self.queue(line_num, string_to_add)
+        
+    def queue(self, line_num, string_to_add, directly_after=False):
+        # Insert after the block at line_num. If directly_after, before
+        # previous insertions at line_num (as for add_after), otherwise
+        # after these.
+        self.insertions.append((line_num, string_to_add, directly_after))
+        
+    def apply(self):
+        """Insert the queued strings into the keyword block. The 
+        insertions are done in reverse order of position, such that the
+        positions of the remaining insertions are not changed. Strings 
+        at the same position are joined and inserted once. The editor
+        can be used for further insertions afterwards. 
+        
+        :returns: The number of inserted blocks
+        :rtype: int
+        
+        """
+        
+        grouped = {}
+        for line_num, string_to_add, directly_after in self.insertions:
+            strings = grouped.setdefault(line_num, [])
+            if directly_after:
+                strings.insert(0, string_to_add)
+            else:
+                strings.append(string_to_add)
+        
+        for line_num in sorted(grouped, reverse=True):
+            self.keyword_block.insert(line_num, '\n'.join(grouped[line_num]))
+        
+        self.sie_blocks = list(self.keyword_block.sieBlocks)
+        self.category_index = {}
+        self.insertions = []
+        return len(grouped)
+
+
+def get_category_index(sie_blocks, category):
+    """Get the index of the end of each category of type `category`, 
+    i.e. the index of the line starting with `*End category`. 
+    
+    :param sie_blocks: The keyword block lines (sieBlocks)
+    :type sie_blocks: list[ str ]
+    
+    :param category: The category to index (E.g. Part, Step)
+    :type category: str
+    
+    :returns: The index of the end for each name of the category
+    :rtype: dict
+    
+    """
+    
+    name_pattern = re.compile('name=([^,\\s]+)')
+    start_str = '*' + category
+    end_str = '*End ' + category
+    category_index = {}
+    name = None
+    for n, block in enumerate(sie_blocks):
+        for line in block.split('\n'):
+            keyword = line.split(',')[0].strip()
+            if keyword == start_str:
+                match = name_pattern.search(line)
+                name = match.group(1) if match is not None else None
+            elif keyword == end_str and name is not None:
+                if name not in category_index:
+                    category_index[name] = n
+                name = None
+    return category_index
 
-from rollover.utils import abaqus_python_tools as apt
 
 def add_at_end_of_cat(keyword_block, string_to_add, category, name):
     """Add `string_to_add` just before the end of the category of type 
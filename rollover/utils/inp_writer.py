@@ -0,0 +1,265 @@
+"""Module for writing data lines in Abaqus input files in bulk. The
+values are formatted chunk-wise, by applying the format string for many
+rows at once, instead of formatting each line in a python loop. The
+module only depends on numpy and can be used both from Abaqus python
+and from a regular python installation.
+
+Integer data lines (e.g. element connectivity and set labels) follow the
+Abaqus limit of up to 16 values per line and maximum 80 characters per
+line. Rows with more values are continued on the next line, after
+ending the line with a comma.
+
+.. codeauthor:: Knut Andreas Meyer
+"""
+
+from __future__ import print_function
+import numpy as np
+
+MAX_INTS_PER_LINE = 16
+MAX_LINE_LENGTH = 80
+WRAP_LINE_LENGTH = 70   # Line length after which get_wrapped_int_str starts a new line
+CHUNK_ROWS = 10000      # Number of rows to format at once
+NODE_COORD_FORMAT = '%25.15e'
+
+
+def write_nodes(fid, coords, labels=None, chunk_rows=CHUNK_ROWS):
+    """Write a `*Node` block
+
+    :param fid: The opened input file
+    :type fid: file
+
+    :param coords: Node coordinates
+    :type coords: np.array (shape = [nnodes, ndim])
+
+    :param labels: Node labels, defaults to 1, 2, ..., nnodes
+    :type labels: np.array( int )
+
+    :param chunk_rows: Number of lines to format at once
+    :type chunk_rows: int
+
+    :returns: None
+    :rtype: None
+
+    """
+
+    coords = np.asarray(coords, dtype=np.float64)
+    if labels is None:
+        labels = np.arange(1, coords.shape[0] + 1)
+    labels = np.asarray(labels, dtype=np.int64)
+    label_width = len(str(np.max(labels))) if len(labels) > 0 else 1
+    row_fmt = ('%' + str(max(label_width, 7)) + 'd'
+               + coords.shape[1]*(', ' + NODE_COORD_FORMAT) + '\n')
+
+    fid.write('*Node\n')
+    for start in range(0, coords.shape[0], chunk_rows):
+        end = start + chunk_rows
+        # Object array to combine integer labels and float coordinates
+        rows = np.concatenate((np.reshape(labels[start:end], (-1, 1)).astype(object),
+                               coords[start:end].astype(object)), axis=1)
+        fid.write(''.join(iter_formatted_rows(row_fmt, rows, chunk_rows)))
+
+
+def write_elements(fid, connectivity, element_type, labels=None, elset=None,
+                   chunk_rows=CHUNK_ROWS):
+    """Write an `*Element` block
+
+    :param fid: The opened input file
+    :type fid: file
+
+    :param connectivity: Node labels for each element
+    :type connectivity: np.array (shape = [nelems, nnodes_per_elem])
+
+    :param element_type: The Abaqus element type, e.g. C3D20
+    :type element_type: str
+
+    :param labels: Element labels, defaults to 1, 2, ..., nelems
+    :type labels: np.array( int )
+
+    :param elset: Name of element set to put the elements in. No
+                  element set if None (default).
+    :type elset: str
+
+    :param chunk_rows: Number of elements to format at once
+    :type chunk_rows: int
+
+    :returns: None
+    :rtype: None
+
+    """
+
+    connectivity = np.asarray(connectivity, dtype=np.int64)
+    if labels is None:
+        labels = np.arange(1, connectivity.shape[0] + 1)
+
+    keyword = '*Element, type=' + element_type
+    if elset is not None:
+        keyword = keyword + ', elset=' + elset
+    fid.write(keyword + '\n')
+
+    rows = np.empty((connectivity.shape[0], connectivity.shape[1] + 1), dtype=np.int64)
+    rows[:, 0] = labels
+    rows[:, 1:] = connectivity
+    write_int_rows(fid, rows, chunk_rows)
+
+
+def write_int_rows(fid, rows, chunk_rows=CHUNK_ROWS):
+    """Write rows of integers, each row split over as many lines as
+    required by the Abaqus limits for integer data lines.
+
+    :param fid: The opened input file
+    :type fid: file
+
+    :param rows: The integers to write
+    :type rows: np.array (shape = [nrows, nvalues_per_row])
+
+    :param chunk_rows: Number of rows to format at once
+    :type chunk_rows: int
+
+    :returns: None
+    :rtype: None
+
+    """
+
+    rows = np.asarray(rows, dtype=np.int64)
+    if rows.size == 0:
+        return
+    row_fmt = get_int_row_format(rows.shape[1], np.max(np.abs(rows)), np.any(rows < 0))
+    for row_str in iter_formatted_rows(row_fmt, rows, chunk_rows):
+        fid.write(row_str)
+
+
+def get_int_list_str(values):
+    """Get the data lines for a list of integers, e.g. the labels in a
+    `*Nset` or `*Elset` block, or a long element connectivity.
+
+    :param values: The integers to write
+    :type values: list[ int ] / np.array( int )
+
+    :returns: The data lines, without trailing newline
+    :rtype: str
+
+    """
+
+    values = np.asarray(values, dtype=np.int64).reshape((1, -1))
+    if values.size == 0:
+        return ''
+    row_fmt = get_int_row_format(values.shape[1], np.max(np.abs(values)),
+                                 np.any(values < 0))
+    return ''.join(iter_formatted_rows(row_fmt, values))[:-1]
+
+
+def get_wrapped_int_str(values, max_per_line=MAX_INTS_PER_LINE, wrap_length=WRAP_LINE_LENGTH,
+                        max_line_length=MAX_LINE_LENGTH):
+    """Get the data lines for a list of integers, with each value 
+    followed by ', ' and the lines wrapped greedily: A new line is 
+    started before a value if the current line has `max_per_line` values
+    or is longer than `wrap_length` characters. The last separator is 
+    removed. Contrary to :py:func:`get_int_list_str`, the line length 
+    depends on the actual number of digits of the values on each line. 
+    The lines are built in one pass, i.e. the time is linear in the 
+    number of values.
+
+    :param values: The integers to write
+    :type values: list[ int ] / np.array( int )
+
+    :param max_per_line: Maximum number of values per line
+    :type max_per_line: int
+
+    :param wrap_length: Line length (including the separators) after 
+                        which a new line is started
+    :type wrap_length: int
+
+    :param max_line_length: Maximum number of characters per line, a 
+                            ValueError is raised if values are too long
+                            to guarantee this limit.
+    :type max_line_length: int
+
+    :returns: The data lines, without trailing newline
+    :rtype: str
+
+    """
+
+    value_strs = ['%d, ' % value for value in np.asarray(values, dtype=np.int64).tolist()]
+    if len(value_strs) == 0:
+        return ''
+    max_value_length = max([len(value_str) for value_str in value_strs])
+    if wrap_length + max_value_length > max_line_length:
+        raise ValueError('Cannot guarantee ' + str(max_line_length) + ' characters per line '
+                         + 'for values with ' + str(max_value_length - 2) + ' characters')
+    
+    lines = []
+    line_start = 0
+    line_length = 0
+    for ind, value_str in enumerate(value_strs):
+        if ind - line_start >= max_per_line or line_length > wrap_length:
+            lines.append(''.join(value_strs[line_start:ind]))
+            line_start = ind
+            line_length = 0
+        line_length = line_length + len(value_str)
+    lines.append(''.join(value_strs[line_start:]))
+    
+    return '\n'.join(lines)[:-2]
+
+
+def get_int_row_format(num_values, max_abs_value, negative=False,
+                       max_per_line=MAX_INTS_PER_LINE, max_line_length=MAX_LINE_LENGTH):
+    """Get the format string for a row of integers. The row is split
+    into multiple lines such that each line has at most `max_per_line`
+    values and at most `max_line_length` characters, given that no
+    value has more digits than `max_abs_value`.
+
+    :param num_values: Number of values in the row
+    :type num_values: int
+
+    :param max_abs_value: Largest absolute value to be written
+    :type max_abs_value: int
+
+    :param negative: Can values be negative?
+    :type negative: bool
+
+    :param max_per_line: Maximum number of values per line
+    :type max_per_line: int
+
+    :param max_line_length: Maximum number of characters per line
+    :type max_line_length: int
+
+    :returns: The format string, including the final newline
+    :rtype: str
+
+    """
+
+    value_width = len(str(int(max_abs_value))) + (1 if negative else 0)
+    # Each value requires value_width plus ', ' (or ',' at line end)
+    num_per_line = min(max_per_line, (max_line_length + 1)//(value_width + 2))
+    if num_per_line < 1:
+        raise ValueError('Cannot fit values with ' + str(value_width) + ' characters on a line')
+
+    lines = []
+    for start in range(0, num_values, num_per_line):
+        lines.append(', '.join(['%d']*min(num_per_line, num_values - start)))
+
+    return ',\n'.join(lines) + '\n'
+
+
+def iter_formatted_rows(row_fmt, rows, chunk_rows=CHUNK_ROWS):
+    """Format the rows in `rows` with the format `row_fmt`, by formatting
+    `chunk_rows` rows at once.
+
+    :param row_fmt: Format string for one row, including newline
+    :type row_fmt: str
+
+    :param rows: The values to format. For rows with mixed types, use an
+                 object array.
+    :type rows: np.array (shape = [nrows, nvalues_per_row])
+
+    :param chunk_rows: Number of rows to format at once
+    :type chunk_rows: int
+
+    :returns: Generator giving strings with formatted rows
+    :rtype: generator
+
+    """
+
+    for start in range(0, rows.shape[0], chunk_rows):
+        chunk = rows[start:(start + chunk_rows)]
+        yield (row_fmt*chunk.shape[0]) % tuple(chunk.ravel().tolist())
@@ -121,6 +121,11 @@ def get_step_release(cycle_nr=2):
 ## Rolover files
 rollover_settings_file = 'rollover_settings.json'
 loading_file = 'load_param.txt'
+loading_binary_file = 'load_param.bin'
+load_state_file = 'load_state.txt'
+chunk_state_file = 'rollover_chunks.json'
+cycle_results_dir = 'cycle_results'
+cycle_results_index_file = 'index.json'
 rp_coord_file = 'rp_coord.txt'
 
 ## Rail files
@@ -134,8 +139,12 @@ substr_node_labels_file = 'contact_node_labels.npy'
 substr_mtx_file = 'ke.mtx'
 
 uel_stiffness_file = 'uel_stiffness.txt'
+uel_stiffness_binary_file = 'uel_stiffness.bin'
+uel_stiffness_mapped_file = 'uel_stiffness.map'
+uel_stiffness_compressed_file = 'uel_stiffness_compressed.npz'
 uel_coordinates_file = 'uel_coordinates.npy'
 uel_elements_file = 'uel_elements.npy'
 
 ## Rail substructure
-substructure_interface_mesh_file = 'interface_mesh.json'
\ No newline at end of file
+substructure_interface_mesh_file = 'interface_mesh.npz'
+substructure_interface_mesh_json_file = 'interface_mesh.json'     # Debug export
\ No newline at end of file
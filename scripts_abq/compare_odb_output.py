@@ -0,0 +1,226 @@
+"""Compare the field output requests written directly to the input file,
+:py:func:`rollover.three_d.utils.odb_output.add_to_inp`, with those
+created in cae, :py:func:`rollover.three_d.utils.odb_output.add`.
+
+A small model with the steps of a rollover simulation, a rail with one
+element and a wheel reference point is created for each method, and
+the input files are written. The field output requests active in each
+step (accounting for that requests are propagated to subsequent steps)
+are then compared. The field output requests are taken from
+`names.rollover_settings_file` if it exists in the current directory,
+otherwise from the example settings in the data folder.
+
+In a second comparison, further cycles are appended to copies of both
+input files with
+:py:func:`rollover.three_d.utils.step_template.append_cycles`, and
+these are compared with a model where all cycles are created in cae.
+The number of cycles in the template is `cae_cycles` from the loading
+settings, or one more than the least common multiple of the `cycle`
+values of the field output requests.
+
+Run as :command:`abaqus cae noGUI=compare_odb_output.py`
+
+.. codeauthor:: Knut Andreas Meyer
+"""
+
+# System imports
+from __future__ import print_function
+import os
+import shutil
+
+from abaqusConstants import *
+from abaqus import mdb
+import mesh
+
+# Project library imports
+from rollover.utils import json_io
+from rollover.utils import naming_mod as names
+from rollover.utils import abaqus_python_tools as apt
+from rollover.three_d.utils import odb_output
+from rollover.three_d.utils import step_template
+from rollover.local_paths import data_path
+
+NUM_CYCLES = 7
+
+
+def main():
+    if os.path.exists(names.rollover_settings_file):
+        param = json_io.read(names.rollover_settings_file)
+    else:
+        param = json_io.read(data_path + '/rollover_settings/' + names.rollover_settings_file)
+    field_output_requests = param['field_output']
+    num_cycles = param['loading'].get('cae_cycles', NUM_CYCLES)
+
+    inp_files = [write_inp_file('odb_output_' + method, field_output_requests, num_cycles,
+                                method)
+                 for method in ['cae', 'inp']]
+    compare(inp_files, num_cycles)
+
+    # Append cycles to the input files, and compare with all cycles in cae
+    output_cycles = [fout['cycle'] for fout in field_output_requests.values()]
+    num_cae_cycles = param['loading'].get('cae_cycles', 1 + get_lcm(output_cycles))
+    if any([(num_cae_cycles - 1) % cycle != 0 for cycle in output_cycles]):
+        print('"cae_cycles"-1 must be a multiple of "cycle" for all field output, '
+              + 'appended cycles not compared')
+        return
+    num_total_cycles = num_cae_cycles + 2*(num_cae_cycles - 1)
+    loading = dict(param['loading'], num_cycles=num_total_cycles)
+    appended_files = []
+    for method in ['cae', 'inp']:
+        inp_file = write_inp_file('odb_output_template_' + method, field_output_requests,
+                                  num_cae_cycles, method)
+        appended_file = inp_file.replace('_template_', '_appended_')
+        shutil.copyfile(inp_file, appended_file)
+        step_template.append_cycles(appended_file, num_cae_cycles, **loading)
+        appended_files.append(appended_file)
+    full_file = write_inp_file('odb_output_full_cae', field_output_requests,
+                               num_total_cycles, 'cae')
+    compare([full_file] + appended_files, num_total_cycles)
+
+
+def write_inp_file(model_name, field_output_requests, num_cycles, method):
+    # Create the model, add the field output requests with the given
+    # method ('cae' or 'inp') and write the input file
+    the_model = create_model(model_name, field_output_requests, num_cycles)
+    odb_output.delete_default_requests(the_model)
+    if method == 'cae':
+        odb_output.add(the_model, field_output_requests, num_cycles)
+    else:
+        odb_output.add_to_inp(the_model, field_output_requests, num_cycles)
+    the_job = mdb.Job(name=model_name, model=model_name)
+    the_job.writeInput(consistencyChecking=OFF)
+    return model_name + '.inp'
+
+
+def compare(inp_files, num_cycles):
+    # Compare the field output in each step of inp_files[1:] with
+    # inp_files[0]
+    ref_output = get_field_output(inp_files[0])
+    for inp_file in inp_files[1:]:
+        output = get_field_output(inp_file)
+        num_diff = 0
+        for step_name in odb_output.get_step_names(num_cycles):
+            ref_requests = ref_output.get(step_name.lower())
+            requests = output.get(step_name.lower())
+            if ref_requests is None or ref_requests != requests:
+                num_diff = num_diff + 1
+                print('Field output differs in step ' + step_name)
+                print(inp_files[0] + ': ' + str(ref_requests))
+                print(inp_file + ': ' + str(requests))
+
+        print(inp_files[0] + ' and ' + inp_file + ': '
+              + ('same field output' if num_diff == 0 else 'differences in %u steps' % num_diff))
+
+
+def get_lcm(values):
+    # Least common multiple of the positive integers in values
+    lcm = 1
+    for value in values:
+        a, b = lcm, value
+        while b > 0:
+            a, b = b, a % b
+        lcm = lcm*value//a
+    return lcm
+
+
+def create_model(model_name, field_output_requests, num_cycles):
+    # Create a model with a one element rail, containing the sets in
+    # field_output_requests, a wheel reference point with a vertical
+    # load and the steps
+    the_model = apt.create_model(model_name)
+
+    rail_part = the_model.Part(name=names.rail_part, dimensionality=THREE_D,
+                               type=DEFORMABLE_BODY)
+    rail_nodes = [rail_part.Node(coordinates=(x, y, z))
+                  for z in [0.0, 1.0] for y in [0.0, 1.0] for x in [0.0, 1.0]]
+    rail_part.Element(nodes=[rail_nodes[i] for i in [0, 1, 3, 2, 4, 5, 7, 6]],
+                      elemShape=HEX8)
+    for fout in field_output_requests.values():
+        if fout['set'] not in ['FULL_MODEL', 'WHEEL_RP']:
+            rail_part.Set(name=fout['set'], nodes=rail_part.nodes, elements=rail_part.elements)
+
+    wheel_part = the_model.Part(name=names.wheel_part, dimensionality=THREE_D,
+                                type=DEFORMABLE_BODY)
+    rp_node = wheel_part.Node(coordinates=(0.0, 2.0, 0.0))
+    wheel_part.Set(name=names.wheel_rp_set, nodes=mesh.MeshNodeArray(nodes=(rp_node,)))
+
+    assy = the_model.rootAssembly
+    assy.Instance(name=names.rail_inst, part=rail_part, dependent=ON)
+    assy.Instance(name=names.wheel_inst, part=wheel_part, dependent=ON)
+
+    prev_name = names.step0
+    for step_name in odb_output.get_step_names(num_cycles):
+        the_model.StaticStep(name=step_name, previous=prev_name)
+        prev_name = step_name
+
+    # Vertical wheel load, required by step_template
+    the_model.ConcentratedForce(name=names.wheel_vert_load, createStepName=names.step2,
+                                region=assy.instances[names.wheel_inst].sets[names.wheel_rp_set],
+                                cf2=-1.0)
+
+    return the_model
+
+
+def get_field_output(inp_file):
+    """Get the field output requests active in each step of `inp_file`
+
+    :param inp_file: The input file
+    :type inp_file: str
+
+    :returns: The active field output requests for each step name (in
+              lower case). Each request is described by a tuple with
+              the `*Output` keyword (without `op`) and the output
+              keywords with their variables.
+    :rtype: dict
+
+    """
+
+    step_output = {}
+    active = []         # Requests propagated from previous steps
+    step_requests = None
+    request = None
+    for keyword, data in get_keyword_blocks(inp_file):
+        if keyword.startswith('*step'):
+            step_name = [opt.split('=')[1] for opt in keyword.split(',')
+                         if opt.startswith('name=')][0]
+            step_requests = None
+            request = None
+        elif keyword.startswith('*endstep'):
+            if step_requests is not None:
+                active = [tuple(req) for req in step_requests if 'frequency=0' not in req[0]]
+            step_output[step_name] = set(active)
+        elif keyword.startswith('*output,field'):
+            if 'op=new' in keyword:
+                step_requests = []
+            elif step_requests is None:
+                step_requests = list(active)
+            request = [keyword.replace(',op=new', '')]
+            step_requests.append(request)
+        elif request is not None and any([keyword.startswith(output_keyword) for output_keyword
+                                          in ['*nodeoutput', '*elementoutput', '*contactoutput']]):
+            variables = sorted(','.join(data).strip(',').split(','))
+            request.append(keyword + ':' + ','.join(variables))
+        else:
+            request = None
+
+    return step_output
+
+
+def get_keyword_blocks(inp_file):
+    # Get (keyword line, data lines) for each keyword in inp_file, in
+    # lower case and without spaces. Comments are skipped.
+    blocks = []
+    with open(inp_file, 'r') as fid:
+        for line in fid:
+            line = line.strip().lower().replace(' ', '')
+            if line.startswith('**') or len(line) == 0:
+                continue
+            elif line.startswith('*'):
+                blocks.append((line, []))
+            elif len(blocks) > 0:
+                blocks[-1][1].append(line)
+    return blocks
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+"""Compare the rail constraint equations written directly to the input
+file, :py:func:`rollover.three_d.rail.constraints.add_to_inp`, with
+those created in cae, :py:func:`rollover.three_d.rail.constraints.create`
+with `cae_equations=True`.
+
+A model with the rail is created by
+:py:func:`rollover.three_d.rail.include.from_file` followed by
+:py:func:`rollover.three_d.rail.include.add_constraints_to_inp`, as for
+the rollover simulation. This includes the substructure instance if
+the rail has a substructure, in which case the equations are created in
+cae and the input file is written without parts and instances. The
+reference model has the same setup, but with all equations created in
+cae. Both are created with and without the rail reference point, and
+the input files are written. The equations are then read from the input
+files, where the sets with a single node created in cae are replaced by
+the node labels, and compared. The rail settings are taken from
+`names.rollover_settings_file` if it exists in the current directory,
+otherwise from the example settings in the data folder.
+
+Run as :command:`abaqus cae noGUI=compare_rail_constraints.py`
+
+.. codeauthor:: Knut Andreas Meyer
+"""
+
+# System imports
+from __future__ import print_function
+import os, re
+
+from abaqusConstants import *
+from abaqus import mdb
+
+# Project library imports
+from rollover.utils import json_io
+from rollover.utils import naming_mod as names
+from rollover.utils import abaqus_python_tools as apt
+from rollover.three_d.rail import include as rail_include
+from rollover.local_paths import data_path
+
+COEFF_TOL = 1.e-10  # Tolerance for coefficients to be considered equal
+
+
+def main():
+    if os.path.exists(names.rollover_settings_file):
+        param = json_io.read(names.rollover_settings_file)
+    else:
+        param = json_io.read(data_path + '/rollover_settings/' + names.rollover_settings_file)
+    rail_param = param['rail']
+
+    for use_rail_rp in [False, True]:
+        inp_files = []
+        for method in ['cae', 'inp']:
+            model_name = 'rail_constraints_' + method + ('_rp' if use_rail_rp else '')
+            try:
+                has_substruct = create_model(model_name, rail_param['model_file'],
+                                             rail_param['shadow_extents'], use_rail_rp, method)
+            except NotImplementedError as e:
+                print(str(e) + ', not compared')
+                break
+            the_job = mdb.Job(name=model_name, model=model_name)
+            the_job.writeInput(consistencyChecking=OFF)
+            inp_files.append(model_name + '.inp')
+
+        if len(inp_files) < 2:
+            continue
+
+        cae_equations, inp_equations = [get_equations(inp_file) for inp_file in inp_files]
+        num_diff = len(cae_equations.symmetric_difference(inp_equations))
+        for equation in sorted(cae_equations.difference(inp_equations))[:10]:
+            print('Only in cae: ' + str(equation))
+        for equation in sorted(inp_equations.difference(cae_equations))[:10]:
+            print('Only in inp: ' + str(equation))
+        print(inp_files[0] + ' and ' + inp_files[1]
+              + (' (with substructure): ' if has_substruct else ': ')
+              + ('same %u equations' % len(cae_equations) if num_diff == 0
+                 else '%u equations differ' % num_diff))
+
+
+def create_model(model_name, model_file, shadow_extents, use_rail_rp, method):
+    # Create a model with the rail included as in the rollover
+    # simulation ('inp'), or with all constraints created in cae
+    # ('cae'). Returns True if the rail has a substructure.
+    the_model = apt.create_model(model_name)
+    rail_include.from_file(the_model, model_file, shadow_extents, use_rail_rp,
+                           cae_equations=(True if method == 'cae' else None))
+    if method == 'inp':
+        rail_include.add_constraints_to_inp(the_model)
+    return names.rail_substructure in the_model.parts.keys()
+
+
+def get_equations(inp_file):
+    """Get the equations in `inp_file`, with the terms given by node
+    labels. The node sets containing a single node are replaced by the
+    node label. These are the sets in the rail part, or the assembly
+    level sets (named `<instance>_<set>`) if the input file is written
+    without parts and instances, as for a rail substructure.
+
+    :param inp_file: The input file
+    :type inp_file: str
+
+    :returns: The equations, each given by the constrained term
+              followed by the sorted remaining terms. Each term is
+              described by a tuple with the node label, the degree of
+              freedom and the coefficient (rounded to `COEFF_TOL`).
+    :rtype: set( tuple )
+
+    """
+
+    node_sets = {}
+    equations = set()
+    part_name = None
+    for keyword, data in get_keyword_blocks(inp_file):
+        options = dict([opt.split('=') for opt in keyword.split(',')[1:] if '=' in opt])
+        if keyword.startswith('*part'):
+            part_name = options['name']
+        elif keyword.startswith('*endpart'):
+            part_name = None
+        elif keyword.startswith('*nset') and part_name in [None, names.rail_part.lower()]:
+            labels = [int(val) for val in ','.join(data).split(',') if len(val) > 0]
+            if 'generate' in keyword:
+                labels = list(range(labels[0], labels[1] + 1, labels[2]))
+            if len(labels) == 1 and part_name is None:
+                node_sets[options['nset']] = labels[0]
+            elif len(labels) == 1:
+                node_sets[names.rail_inst.lower() + '.' + options['nset']] = labels[0]
+        elif keyword.startswith('*equation'):
+            equations.update(get_equation_terms(data, node_sets))
+    return equations
+
+
+def get_equation_terms(data, node_sets):
+    # Get the equations from the data lines of an *Equation keyword
+    equations = []
+    k = 0
+    while k < len(data):
+        num_terms = int(data[k].strip(','))
+        values = []
+        while len(values) < 3*num_terms:
+            k = k + 1
+            values.extend([val for val in data[k].split(',') if len(val) > 0])
+        terms = []
+        for node, dof, coeff in zip(values[0::3], values[1::3], values[2::3]):
+            label = node_sets[node] if node in node_sets else int(re.split('[._]', node)[-1])
+            terms.append((label, int(dof), round(float(coeff)/COEFF_TOL)*COEFF_TOL))
+        equations.append((terms[0],) + tuple(sorted(terms[1:])))
+        k = k + 1
+    return equations
+
+
+def get_keyword_blocks(inp_file):
+    # Get (keyword line, data lines) for each keyword in inp_file, in
+    # lower case and without spaces. Comments are skipped.
+    blocks = []
+    with open(inp_file, 'r') as fid:
+        for line in fid:
+            line = line.strip().lower().replace(' ', '')
+            if line.startswith('**') or len(line) == 0:
+                continue
+            elif line.startswith('*'):
+                blocks.append((line, []))
+            elif len(blocks) > 0:
+                blocks[-1][1].append(line)
+    return blocks
+
+
+if __name__ == '__main__':
+    main()
@@ -25,6 +25,7 @@ from rollover.three_d.utils import contact
 from rollover.three_d.utils import loading
 from rollover.three_d.utils import odb_output
 from rollover.three_d.utils import fil_output
+from rollover.three_d.utils import step_template
 
 def main():
     # Read in rollover parameters
@@ -48,22 +49,28 @@ def main():
     # Setup contact
     contact.setup(rollover_model, **param['contact'])
     print('contact setup')
-    # Setup loading steps
+    # Setup loading steps (num_cycles are the cycles created in cae)
     num_cycles = loading.setup(rollover_model, **param['loading'])
     print('loading setup')
-    # Add odb field output if not standard
+    # Remove default odb output if not standard, the field output is added to the input file
     if 'field_output' in param:
-        odb_output.add(rollover_model, param['field_output'], num_cycles)
-    print('field output setup')
+        odb_output.delete_default_requests(rollover_model)
     # Add wheel uel to input file
     wheel_include.add_wheel_super_element_to_inp(rollover_model, wheel_stiffness, 
                                                  param['wheel']['folder'],
                                                  param['wheel']['translation'])
                                                  
     print('wheel included in input')
+    # Add rail constraint equations to input file
+    rail_include.add_constraints_to_inp(rollover_model)
+    print('rail constraints added')
     # Add results file output
     fil_output.add(rollover_model, num_cycles)
     print('fil output added')
+    # Add odb field output if not standard
+    if 'field_output' in param:
+        odb_output.add_to_inp(rollover_model, param['field_output'], num_cycles)
+    print('field output setup')
     write_rp_coord(param['wheel']['translation'], [0.0, 0.0, 0.0])
     
     mdb.saveAs(pathName=names.model + '.cae')
@@ -71,6 +78,11 @@ def main():
     # Create job after saving cae file, because job will not have sufficient options to run from 
     # cae, in particular user subroutine path.
     write_input_file()
+    
+    # Add the remaining cycles directly to the input file
+    num_extra = step_template.append_cycles(names.job + '.inp', num_cycles, **param['loading'])
+    if num_extra > 0:
+        print(str(num_extra) + ' cycles appended to input file')
 
 
 def write_input_file():
@@ -107,12 +119,32 @@ def check_input(param):
     not_ok_list.append(check_param(param['wheel'], wheel_include.from_folder, num_first=1))
     not_ok_list.append(check_param(param['contact'], contact.setup, num_first=1))
     not_ok_list.append(check_param(param['loading'], loading.setup, num_first=1))
+    not_ok_list.append(check_cae_cycles(param))
     
     if any(not_ok_list):
         return False
     else:
         return True
         
+
+def check_cae_cycles(param):
+    # The cycles 2 to cae_cycles are repeated when adding cycles, 
+    # field output every k cycles therefore requires that cae_cycles-1
+    # is a multiple of k.
+    cae_cycles = param['loading'].get('cae_cycles', None)
+    if cae_cycles is None:
+        return False
+    if cae_cycles < 2:
+        print('"cae_cycles" must be at least 2')
+        return True
+    failed = False
+    for name, fout in param.get('field_output', {}).items():
+        if (cae_cycles - 1) % fout['cycle'] != 0:
+            print('"cae_cycles"-1 must be a multiple of "cycle" for field output "' 
+                  + name + '"')
+            failed = True
+    return failed
+    
     
 if __name__ == '__main__':
     main()
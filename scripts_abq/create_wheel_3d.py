@@ -7,6 +7,20 @@ contain the keywords according to
 files will be saved along with a copy of the `'wheel_settings.json'` 
 file
 
+The user element files are cached, see 
+:py:mod:`rollover.three_d.wheel.uel_cache`. If a wheel with the same 
+settings, profile, Abaqus version and code version has been created 
+before, the substructure job is not run, and the files are taken from 
+the cache. 
+The following optional keywords control the cache:
+
+- `'uel_cache_folder'`: The cache folder, default in the user's cache
+  directory, see :py:func:`rollover.three_d.wheel.uel_cache.get_default_folder`.
+  A path starting with :file:`:/` is relative to the data folder. Use 
+  `null` to disable the cache.
+- `'uel_cache_max_size'`: Maximum size of the cache in bytes. The least 
+  recently used wheels are removed when it is exceeded.
+
 .. codeauthor:: Knut Andreas Meyer
 """
 
@@ -21,14 +35,17 @@ from abaqus import mdb
 import part, sketch, mesh, job
 
 # Project library imports
+from rollover.local_paths import data_path
 from rollover.utils import json_io
 from rollover.utils import naming_mod as names
 from rollover.three_d.wheel import substructure as wheel_substr
 from rollover.three_d.wheel import super_element as super_wheel
+from rollover.three_d.wheel import uel_cache
 
 try:
     reload(wheel_substr)
     reload(super_wheel)
+    reload(uel_cache)
     reload(names)
 except NameError as ne:   # Will fail for Python 3, but that is ok:
     if sys.version_info.major == 3:
@@ -41,17 +58,38 @@ def main():
     # Read in wheel section parameters
     wheel_param = json_io.read(names.wheel_settings_file)
     
-    # Create and run the substructure generation job
-    create_substructure(wheel_param)
-    mdb.saveAs(pathName=wheel_param['wheel_name'] + '.cae')
+    cache_folder = get_data_path(wheel_param.get('uel_cache_folder', 
+                                                 uel_cache.get_default_folder()))
+    if cache_folder is not None:
+        cache_key = uel_cache.get_key(wheel_param, get_data_path(wheel_param['wheel_profile']),
+                                      mdb.version)
     
-    # Extract the results from the substructure generation, organize
-    # mesh, and save to files
-    create_user_element(wheel_param)
+    if cache_folder is not None and uel_cache.fetch(cache_folder, cache_key):
+        print('Wheel user element files taken from cache (' + cache_key + ')')
+    else:
+        # Create and run the substructure generation job
+        create_substructure(wheel_param)
+        mdb.saveAs(pathName=wheel_param['wheel_name'] + '.cae')
+        
+        # Extract the results from the substructure generation, organize
+        # mesh, and save to files
+        create_user_element(wheel_param)
+        
+        if cache_folder is not None:
+            uel_cache.store(cache_folder, cache_key, 
+                            max_size=wheel_param.get('uel_cache_max_size', 
+                                                     uel_cache.DEFAULT_MAX_SIZE))
     
     # Create user element folder and copy files to that folder
     save_user_element(wheel_param)
 
+
+def get_data_path(path):
+    # Replace the :/ prefix with the data path
+    if path is not None and path.startswith(':/'):
+        return data_path + path[1:]
+    return path
+
     
 def create_substructure(wheel_param):
     job = wheel_substr.generate(wheel_param)
@@ -63,7 +101,8 @@ def create_substructure(wheel_param):
     
     
 def create_user_element(wheel_param):
-    super_wheel.get_uel_mesh(wheel_param['quadratic_order'])
+    super_wheel.get_uel_mesh(wheel_param['quadratic_order'], 
+                             wheel_param.get('binary_stiffness', False))
     
     
 def save_user_element(wheel_param):
@@ -78,6 +117,9 @@ def save_user_element(wheel_param):
                       names.wheel_settings_file]:
         shutil.copy(file_name, wheel_param['wheel_name'])
     
+    if os.path.exists(names.uel_stiffness_binary_file):
+        shutil.copy(names.uel_stiffness_binary_file, wheel_param['wheel_name'])
+    
     
 if __name__ == '__main__':
     main()
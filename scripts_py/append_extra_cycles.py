@@ -1,66 +1,73 @@
-import sys, os, re
+""" The script :file:`append_extra_cycles.py` extends a rollover
+simulation by repeating the cycles 2 to `N` in the input file, where `N`
+is the number of cycles in the input file, see :ref:`addcycles`.
+
+Call as
+:command:`python append_extra_cycles.py [<num_multiply> [<input_file> [<settings_file>]]]`
+
+`num_multiply` defaults to 2 and `input_file` to :file:`rollover.inp`.
+After appending, the input file contains `1 + num_multiply*(N-1)`
+cycles. The input file is read once and the steps are written directly
+to its end, see :py:mod:`rollover.three_d.utils.step_template`.
+
+Without `settings_file`, the steps are copied without changes except
+the step names. If `settings_file` is given, it should be a rollover
+settings file (or another json file with the `"loading"` settings). The
+vertical load and speed for each appended cycle are then taken from the
+`"cycles"`/`"vertical_load"`/`"speed"` settings, and the loading files
+(:file:`load_param.txt` and :file:`load_param.bin` in the folder of the
+input file) are rewritten with the load parameters (including slip and
+rail extension) for all cycles. The settings for the cycles already in
+the input file should be the same as when the input file was created.
+
+"""
+from __future__ import print_function
+import sys, os
 
 repo_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if not repo_path in sys.path:
     sys.path.append(repo_path)
-    
+
+import numpy as np
+
+from rollover.utils import json_io
 from rollover.utils import naming_mod as names
+from rollover.three_d.utils import step_template
+from rollover.three_d.utils import load_param
+
 
 def main(argv):
-	num_multiply = int(argv[1]) if len(argv) > 1 else 2
-	inp_fname = argv[2] if len(argv) > 2 else 'rollover.inp'
-		
-	step_def_str, num_cycles = get_step_def_str(inp_fname)
-	
-	for n in range(1,num_multiply):
-		step_def_str = increment_step_def_str(step_def_str, num_cycles)
-		append_step_def_str_to_inp(inp_fname, step_def_str)
-        
-	
-def get_step_def_str(inp_fname):
-    step_def_str = ''
-    start_appending = False
-    num_cycles = 0
-    with open(inp_fname, 'r') as inp:
-        for line in inp:
-            if line.startswith('*Step, name=' + names.get_step_rolling(2)):
-                start_appending = True
-            if start_appending:
-                if not line.startswith('** '):
-                    if line.startswith('*Step, name=return_'):
-                        num_cycles = num_cycles + 1
-                    step_def_str = step_def_str + line
-    
-    return step_def_str, num_cycles
-    
-    
-def increment_step_def_str(step_def_str, num_cycles):
-    # Compile regular expressions to identify new step definitions
-    regex = re.compile('^\*Step, name=([\w]*)_([\d]*)', re.MULTILINE)
-    
-    # Write function to increment the cycle number
-    def incr_str(re_match):
-        str_parts = re_match.group().split('_')
-        str_parts[-1] = str(int(str_parts[-1]) + num_cycles).zfill(5)
-        return '_'.join(str_parts)
-        
-    step_def_str, num_repl = regex.subn(incr_str, step_def_str)
-    
-    if num_repl != 4*num_cycles:
-        print('num_cycles: ', num_cycles)
-        print('num_repl: ', num_repl)
-        print('4*num_cycles: ', 4*num_cycles)
-        print('something went wrong...')
-    
-    return step_def_str
-    
-    
-def append_step_def_str_to_inp(inp_fname, step_def_str):
-    with open(inp_fname, 'a') as inp:
-        inp.write('\n' + step_def_str)
-    
-
-            
-    
+    num_multiply = int(argv[1]) if len(argv) > 1 else 2
+    inp_fname = argv[2] if len(argv) > 2 else names.job + '.inp'
+
+    templates, load_set = step_template.read_templates(inp_fname)
+    num_cycles = 1 + num_multiply*len(templates)
+    cycle_nrs = np.arange(len(templates) + 2, num_cycles + 1)
+
+    if len(argv) > 3:
+        loading_param = json_io.read(argv[3])['loading']
+        static_lines, cload_lines = step_template.get_schedule_lines(cycle_nrs, load_set,
+                                                                     **loading_param)
+        write_loading_files(os.path.dirname(inp_fname), **loading_param)
+    else:
+        static_lines, cload_lines = step_template.get_template_lines(templates, cycle_nrs)
+
+    step_template.write_cycles(inp_fname, templates, cycle_nrs, static_lines, cload_lines)
+
+    print(str(len(cycle_nrs)) + ' cycles appended, ' + inp_fname + ' now has '
+          + str(num_cycles) + ' cycles')
+
+
+def write_loading_files(folder, rolling_length, rolling_radius, initial_depression=0.1,
+                        inbetween_step_time=1.e-6, **loading_param):
+    # Same as in rollover.three_d.utils.loading.setup
+    schedule = load_param.LoadSchedule.from_settings(loading_param)
+    schedule.write_loading_file(initial_depression/inbetween_step_time, rolling_length,
+                                rolling_radius, os.path.join(folder, names.loading_file))
+    schedule.write_binary_loading_file(initial_depression/inbetween_step_time, rolling_length,
+                                       rolling_radius,
+                                       os.path.join(folder, names.loading_binary_file))
+
+
 if __name__ == '__main__':
-	main(sys.argv)
+    main(sys.argv)
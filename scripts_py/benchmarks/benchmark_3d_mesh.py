@@ -0,0 +1,194 @@
+""" Benchmark revolving a 2d wheel section mesh into a 3d mesh with
+:py:func:`rollover.three_d.wheel.three_d_mesh.make_3d_mesh_quad`. The
+section is a synthetic structured mesh with quadratic quadrilaterals
+and a column of quadratic triangles. The mesh size is chosen to give
+approximately the requested number of 3d elements. The result is
+compared to the previous implementation, and must be bit-identical.
+The time for revolving the corresponding linear mesh with
+:py:func:`rollover.three_d.wheel.three_d_mesh.make_3d_mesh_linear` is
+also given.
+
+Call as :command:`python benchmark_3d_mesh.py [num_elems1 num_elems2 ...]`
+
+"""
+from __future__ import print_function
+import sys
+import numpy as np
+
+import benchmark_tools as bt
+from rollover.three_d.wheel import three_d_mesh
+
+DEFAULT_SIZES = [10000, 100000, 300000]
+RADIUS = 460.0          # Outer wheel radius
+SECTION_WIDTH = 140.0   # Width of the section (x-direction)
+SECTION_DEPTH = 40.0    # Depth of the section (radial direction)
+NUM_X = 40              # Number of elements in the x-direction
+NUM_Y = 10              # Number of elements in the radial direction
+
+
+def main(argv):
+    sizes = bt.get_sizes(argv, DEFAULT_SIZES)
+    mesh_2d = get_2d_mesh()
+    num_elems_2d = len(mesh_2d['elements']['N8']) + len(mesh_2d['elements']['N6'])
+    mesh_2d_linear = get_linear_2d_mesh(mesh_2d)
+    bt.print_header(['num elems', 'old [s]', 'new [s]', 'speedup', 'linear [s]'])
+    for num_elems in sizes:
+        mesh_size = 2*np.pi*RADIUS*num_elems_2d/float(num_elems)
+        t_old, mesh_old = bt.time_function(make_3d_mesh_quad_old, mesh_2d, mesh_size)
+        t_new, mesh_new = bt.time_function(three_d_mesh.make_3d_mesh_quad, mesh_2d, mesh_size)
+        check_identical(mesh_old, mesh_new)
+        t_lin, _ = bt.time_function(three_d_mesh.make_3d_mesh_linear, mesh_2d_linear, mesh_size)
+        num_elems_3d = sum([len(elems) for elems in mesh_new['elements'].values()])
+        bt.print_row([num_elems_3d, t_old, t_new, t_old/t_new, t_lin])
+
+
+def check_identical(mesh_old, mesh_new):
+    """ Check that the meshes are bit-identical, raise ValueError if not
+
+    """
+    arrays = [('nodes', mesh_old['nodes'], mesh_new['nodes']),
+              ('angles', mesh_old['angles'], mesh_new['angles'])]
+    for etype in mesh_old['elements']:
+        arrays.append((etype, mesh_old['elements'][etype], mesh_new['elements'][etype]))
+
+    for name, old, new in arrays:
+        if (old.dtype != new.dtype or old.shape != new.shape
+            or old.tobytes() != new.tobytes()):
+            raise ValueError('"' + name + '" is not bit-identical')
+
+
+def get_2d_mesh():
+    """ Get a structured mesh of the wheel section in the xy-plane, in
+    the format given by
+    :py:func:`rollover.three_d.wheel.three_d_mesh.get_2d_mesh`. The
+    nodes are placed on a grid with twice the element density, such
+    that the grid point (2*i, 2*j) is the first corner of element
+    (i, j). The last column of elements is split into triangles.
+
+    :returns: Mesh specification
+    :rtype: dict
+
+    """
+
+    num_grid_x = 2*NUM_X + 1
+    num_grid_y = 2*NUM_Y + 1
+    xcoords = np.linspace(-SECTION_WIDTH/2.0, SECTION_WIDTH/2.0, num_grid_x)
+    ycoords = np.linspace(-RADIUS, -RADIUS + SECTION_DEPTH, num_grid_y)
+    ygrid, xgrid = np.meshgrid(ycoords, xcoords, indexing='ij')
+    nodes = np.transpose([xgrid.flatten(), ygrid.flatten(), np.zeros(xgrid.size)])
+
+    def node(i, j):
+        return int(j*num_grid_x + i)
+
+    quads = []
+    triangles = []
+    for j in range(0, 2*NUM_Y, 2):
+        for i in range(0, 2*NUM_X, 2):
+            if i < 2*(NUM_X - 1):
+                quads.append((node(i, j), node(i+2, j), node(i+2, j+2), node(i, j+2),
+                              node(i+1, j), node(i+2, j+1), node(i+1, j+2), node(i, j+1)))
+            else:
+                triangles.append((node(i, j), node(i+2, j), node(i+2, j+2),
+                                  node(i+1, j), node(i+2, j+1), node(i+1, j+1)))
+                triangles.append((node(i, j), node(i+2, j+2), node(i, j+2),
+                                  node(i+1, j+1), node(i+1, j+2), node(i, j+1)))
+
+    edge_nodes, corner_nodes = three_d_mesh.get_edge_and_corner_nodes(quads + triangles)
+
+    return {'nodes': nodes,
+            'elements': {'N3': [], 'N4': [], 'N6': triangles, 'N8': quads},
+            'edge_nodes': edge_nodes, 'corner_nodes': corner_nodes}
+
+
+def get_linear_2d_mesh(mesh_2d):
+    """ Get the linear mesh with the same elements as the quadratic
+    mesh `mesh_2d`, by only keeping the corner nodes of each element.
+
+    """
+
+    quads = [enods[:4] for enods in mesh_2d['elements']['N8']]
+    triangles = [enods[:3] for enods in mesh_2d['elements']['N6']]
+    edge_nodes, corner_nodes = three_d_mesh.get_edge_and_corner_nodes(quads + triangles)
+
+    return {'nodes': mesh_2d['nodes'],
+            'elements': {'N3': triangles, 'N4': quads, 'N6': [], 'N8': []},
+            'edge_nodes': edge_nodes, 'corner_nodes': corner_nodes}
+
+
+def make_3d_mesh_quad_old(mesh_2d, mesh_size):
+    # Previous implementation of three_d_mesh.make_3d_mesh_quad
+    # (np.float and np.int replaced by float and int for newer numpy)
+    nodes_2d = mesh_2d['nodes']
+    elems_2d = mesh_2d['elements']
+    edge_node_num_2d = mesh_2d['edge_nodes']
+    corner_node_num_2d = mesh_2d['corner_nodes']
+
+    r_outer = np.max(np.abs(nodes_2d[:, 1]))
+    num_angles = int(r_outer*2*np.pi/mesh_size)
+    angles = np.linspace(0, 2*np.pi, num_angles+1)[:-1]
+    delta_angle = angles[1]-angles[0]
+
+    num_corner_nodes_2d = len(corner_node_num_2d)
+    num_edge_nodes_2d = len(edge_node_num_2d)
+    num_nodes_per_section = 2*num_corner_nodes_2d + num_edge_nodes_2d
+
+    nodes = np.zeros((num_nodes_per_section*num_angles, 3), dtype=float)
+
+    corner_node_num = np.zeros((num_corner_nodes_2d, num_angles), dtype=int)
+    edge_ip_node_num = np.zeros((num_edge_nodes_2d, num_angles), dtype=int)
+    edge_op_node_num = np.zeros((num_corner_nodes_2d, num_angles), dtype=int)
+
+    edge_op_node_num[-1,-1] = -1
+    for i, ang in enumerate(angles):
+        corner_node_num[:, i] = edge_op_node_num[-1,i-1] + 1 + np.arange(num_corner_nodes_2d)
+        for j, num in enumerate(corner_node_num[:,i]):
+            coords_2d = nodes_2d[corner_node_num_2d[j], :]
+            nodes[num, :] = three_d_mesh.rotate_coords(coords_2d, ang)
+        edge_ip_node_num[:, i] = corner_node_num[-1,i] + 1 + np.arange(num_edge_nodes_2d)
+        for j, num in enumerate(edge_ip_node_num[:,i]):
+            coords_2d = nodes_2d[edge_node_num_2d[j], :]
+            nodes[num, :] = three_d_mesh.rotate_coords(coords_2d, ang)
+        edge_op_node_num[:, i] = edge_ip_node_num[-1,i] + 1 + np.arange(num_corner_nodes_2d)
+        for j, num in enumerate(edge_op_node_num[:,i]):
+            coords_2d = nodes_2d[corner_node_num_2d[j], :]
+            nodes[num, :] = three_d_mesh.rotate_coords(coords_2d, ang + delta_angle/2.0)
+
+    angle_inds = np.arange(num_angles+1)
+    angle_inds[-1] = 0
+    hex20_elems = get_elements_old(elems_2d['N8'], angle_inds, corner_node_num_2d,
+                                   edge_node_num_2d, corner_node_num, edge_ip_node_num,
+                                   edge_op_node_num)
+    wedge15_elems = get_elements_old(elems_2d['N6'], angle_inds, corner_node_num_2d,
+                                     edge_node_num_2d, corner_node_num, edge_ip_node_num,
+                                     edge_op_node_num)
+
+    return {'nodes': nodes,
+            'elements': {'N15': wedge15_elems, 'N20': hex20_elems},
+            'angles': angles}
+
+
+def get_elements_old(elem_2d_con, angle_inds, corner_node_num_2d, edge_node_num_2d,
+                     corner_node_num, edge_ip_node_num, edge_op_node_num):
+    # Previous implementation of three_d_mesh.get_elements
+    elems = []
+    n = len(elem_2d_con[0])//2
+
+    for enodes in elem_2d_con:
+        corner_rows = [corner_node_num_2d.index(node_num) for node_num in enodes[:n]]
+        edge_rows = [edge_node_num_2d.index(node_num) for node_num in enodes[n:]]
+        for i in range(len(angle_inds)-1):
+            elems.append([])
+            for j in range(2):
+                for cr in corner_rows:
+                    elems[-1].append(corner_node_num[cr, angle_inds[i+(1-j)]])
+            for j in range(2):
+                for er in edge_rows:
+                    elems[-1].append(edge_ip_node_num[er, angle_inds[i+(1-j)]])
+            for cr in corner_rows:
+                elems[-1].append(edge_op_node_num[cr, angle_inds[i]])
+
+    return np.array(elems)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,86 @@
+""" Benchmark extending an input file with
+:file:`scripts_py/append_extra_cycles.py`, using the single-pass
+streaming of :py:mod:`rollover.three_d.utils.step_template`, compared to
+the previous implementation (emulated below). The previous
+implementation built the step text by string concatenation, and
+reopened the input file to append the renumbered text once per
+multiplication.
+
+The input file is the synthetic file from
+:py:mod:`benchmark_step_template` with 2 cycles, which is multiplied to
+give the requested number of cycles.
+
+Call as :command:`python benchmark_append_cycles.py [num_cycles1 num_cycles2 ...]`
+
+"""
+from __future__ import print_function
+import sys, os, re, tempfile, shutil
+
+import benchmark_tools as bt
+import benchmark_step_template
+from rollover.utils import naming_mod as names
+from rollover.three_d.utils import step_template
+
+DEFAULT_SIZES = [1000, 10000]
+
+
+def main(argv):
+    sizes = bt.get_sizes(argv, DEFAULT_SIZES)
+    folder = tempfile.mkdtemp()
+    try:
+        inp_file = os.path.join(folder, 'rollover.inp')
+        bt.print_header(['num cycles', 'old [s]', 'new [s]', 'speedup'])
+        for num_cycles in sizes:
+            benchmark_step_template.write_synthetic_inp(inp_file)
+            t_old, _ = bt.time_function(append_old, inp_file, num_cycles - 1)
+            benchmark_step_template.check_steps(inp_file, num_cycles)
+
+            benchmark_step_template.write_synthetic_inp(inp_file)
+            t_new, _ = bt.time_function(step_template.repeat_cycles, inp_file, num_cycles)
+            benchmark_step_template.check_steps(inp_file, num_cycles)
+
+            bt.print_row([num_cycles, t_old, t_new, t_old/t_new])
+    finally:
+        shutil.rmtree(folder)
+
+
+def append_old(inp_file, num_multiply):
+    # main from the previous append_extra_cycles.py
+    step_def_str, num_cycles = get_step_def_str_old(inp_file)
+    for _ in range(1, num_multiply):
+        step_def_str = increment_step_def_str_old(step_def_str, num_cycles)
+        with open(inp_file, 'a') as inp:
+            inp.write('\n' + step_def_str)
+
+
+def get_step_def_str_old(inp_fname):
+    # From the previous append_extra_cycles.py
+    step_def_str = ''
+    start_appending = False
+    num_cycles = 0
+    with open(inp_fname, 'r') as inp:
+        for line in inp:
+            if line.startswith('*Step, name=' + names.get_step_rolling(2)):
+                start_appending = True
+            if start_appending:
+                if not line.startswith('** '):
+                    if line.startswith('*Step, name=return_'):
+                        num_cycles = num_cycles + 1
+                    step_def_str = step_def_str + line
+    return step_def_str, num_cycles
+
+
+def increment_step_def_str_old(step_def_str, num_cycles):
+    # From the previous append_extra_cycles.py
+    regex = re.compile(r'^\*Step, name=([\w]*)_([\d]*)', re.MULTILINE)
+
+    def incr_str(re_match):
+        str_parts = re_match.group().split('_')
+        str_parts[-1] = str(int(str_parts[-1]) + num_cycles).zfill(5)
+        return '_'.join(str_parts)
+
+    return regex.sub(incr_str, step_def_str)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,59 @@
+""" Benchmark reading the rail reference point displacements for all
+cycles from the results folder written by
+:py:func:`rollover.three_d.utils.cycle_results.extract`, compared to
+reading them from the `.fil` file. The synthetic `.fil` file from
+:py:mod:`benchmark_fil_reader` is used. The time for extracting the
+results (once) is also given. Before, it is checked that the last
+cycle is not extracted before the job has completed.
+
+Call as :command:`python benchmark_cycle_results.py [num_cycles1 num_cycles2 ...]`
+
+"""
+from __future__ import print_function
+import sys, os, tempfile, shutil
+
+import numpy as np
+
+import benchmark_tools as bt
+import benchmark_fil_reader
+from rollover.three_d.utils import fil_reader as fr
+from rollover.three_d.utils import cycle_results
+
+DEFAULT_SIZES = [100, 1000]
+
+
+def main(argv):
+    sizes = bt.get_sizes(argv, DEFAULT_SIZES)
+    folder = tempfile.mkdtemp()
+    try:
+        fil_file = os.path.join(folder, 'rollover.fil')
+        results_dir = os.path.join(folder, 'cycle_results')
+        bt.print_header(['num cycles', 'extract [s]', '.fil [s]', 'results [s]', 'speedup'])
+        for num_cycles in sizes:
+            benchmark_fil_reader.write_synthetic_fil(fil_file, num_cycles)
+            if os.path.exists(results_dir):
+                shutil.rmtree(results_dir)
+            num_running = cycle_results.extract([fil_file], results_dir, completed=False)
+            shutil.rmtree(results_dir)
+            if num_running != num_cycles - 1:
+                raise ValueError('%u cycles extracted while running' % num_running)
+            t_extract, _ = bt.time_function(cycle_results.extract, [fil_file], results_dir,
+                                            completed=True)
+
+            t_fil, u_fil = bt.time_function(read_rail_rp_fil, fil_file)
+            t_res, u_res = bt.time_function(cycle_results.read, results_dir, 'rail_rp_u')
+            if not np.array_equal(u_fil, u_res[1]):
+                raise ValueError('Different results from .fil file and results folder')
+            bt.print_row([num_cycles, t_extract, t_fil, t_res, t_fil/t_res])
+    finally:
+        shutil.rmtree(folder)
+
+
+def read_rail_rp_fil(fil_file):
+    # Rail reference point displacements for all cycles from the .fil file
+    return np.array([inc['output'][2][fr.FIL_NODE_DISP][1][0]
+                     for inc in fr.read_increments(fil_file)])
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,158 @@
+""" Benchmark reading the rolling step output from a `.fil` file with
+:py:func:`rollover.three_d.utils.fil_reader.read_increments`, compared
+to reading one record at a time (as `dbfile` in the user subroutine
+:file:`usub/urdfil_mod.f90`).
+
+A synthetic `.fil` file is written, with record markers, containing one
+increment per cycle with the output from
+:py:mod:`rollover.three_d.utils.fil_output`: Coordinates and
+displacements of the contact nodes in the first cycle and only
+displacements later, as well as the displacements of the wheel and rail
+reference points. The results from both readers are compared.
+
+Call as :command:`python benchmark_fil_reader.py [num_cycles1 num_cycles2 ...]`
+
+"""
+from __future__ import print_function
+import sys, os, tempfile, shutil, struct
+
+import numpy as np
+
+import benchmark_tools as bt
+from rollover.three_d.utils import fil_reader as fr
+
+DEFAULT_SIZES = [100, 1000]
+NUM_CONTACT_NODES = 500
+
+
+def main(argv):
+    sizes = bt.get_sizes(argv, DEFAULT_SIZES)
+    folder = tempfile.mkdtemp()
+    try:
+        fil_file = os.path.join(folder, 'rollover.fil')
+        bt.print_header(['num cycles', 'size [MB]', 'record [s]', 'new [s]', 'speedup'])
+        for num_cycles in sizes:
+            write_synthetic_fil(fil_file, num_cycles)
+            t_old, out_old = bt.time_function(read_wheel_rp_record, fil_file)
+            t_new, out_new = bt.time_function(read_wheel_rp, fil_file)
+            if out_new.shape[0] != num_cycles or not np.array_equal(out_old, out_new):
+                raise ValueError('Different results from the readers')
+            bt.print_row([num_cycles, os.path.getsize(fil_file)/1.e6, t_old, t_new,
+                          t_old/t_new])
+    finally:
+        shutil.rmtree(folder)
+
+
+def read_wheel_rp(fil_file):
+    # Wheel reference point displacements and the mean contact node displacement per cycle
+    u = []
+    for inc in fr.read_increments(fil_file):
+        u.append(np.concatenate((inc['output'][1][fr.FIL_NODE_DISP][1][0],
+                                 np.mean(inc['output'][0][fr.FIL_NODE_DISP][1], axis=0))))
+    return np.array(u)
+
+
+def read_wheel_rp_record(fil_file):
+    # Same as read_wheel_rp, but reading one record at a time
+    u = []
+    for key, attr in read_single_records(fil_file):
+        if key == fr.FIL_INCREMENT_START:
+            requests = []
+        elif key == fr.FIL_OUTPUT_REQUEST_DEF:
+            requests.append([])
+        elif key == fr.FIL_NODE_DISP:
+            requests[-1].append(attr[1:])
+        elif key == fr.FIL_INCREMENT_END:
+            u.append(np.concatenate((requests[1][0], np.mean(requests[0], axis=0))))
+    return np.array(u)
+
+
+def read_single_records(fil_file):
+    # Read the file block by block and give the records one at a time
+    words = []
+    with open(fil_file, 'rb') as fid:
+        while True:
+            block = fid.read(fr.BLOCK_BYTES + 8)
+            if len(block) < fr.BLOCK_BYTES + 8:
+                break
+            words.extend(struct.unpack('<%dd' % fr.BLOCK_WORDS, block[4:-4]))
+            while len(words) > 1:
+                record_length = struct.unpack('<ii', struct.pack('<d', words[0]))[0]
+                if record_length < 2 or record_length > len(words):
+                    break
+                key = struct.unpack('<ii', struct.pack('<d', words[1]))[0]
+                yield key, words[2:record_length]
+                words = words[record_length:]
+
+
+def write_synthetic_fil(fil_file, num_cycles, num_contact_nodes=NUM_CONTACT_NODES):
+    """ Write a synthetic .fil file with the output from
+    :py:mod:`rollover.three_d.utils.fil_output`, for `num_cycles`
+    cycles.
+
+    :param fil_file: The file to write
+    :type fil_file: str
+
+    :param num_cycles: Number of cycles
+    :type num_cycles: int
+
+    :param num_contact_nodes: Number of wheel contact nodes
+    :type num_contact_nodes: int
+
+    """
+
+    contact_labels = np.arange(1, num_contact_nodes + 1)
+    coords = np.random.rand(num_contact_nodes, 3)
+    records = []
+    for cycle_nr in range(1, num_cycles + 1):
+        increment_start = np.zeros(93)
+        increment_start[[fr.INCREMENT_TOTAL_TIME, fr.INCREMENT_STEP_TIME]] = [cycle_nr, 1.0]
+        increment_start = get_records(fr.FIL_INCREMENT_START, increment_start[2:])
+        set_int(increment_start, [fr.INCREMENT_STEP, fr.INCREMENT_NUMBER], [4*cycle_nr - 1, 10])
+        records.append(increment_start)
+
+        records.append(get_records(fr.FIL_OUTPUT_REQUEST_DEF, np.zeros(3)))
+        if cycle_nr == 1:
+            records.append(get_node_records(fr.FIL_NODE_COORD, contact_labels, coords))
+        u = 1.e-3*cycle_nr*np.random.rand(num_contact_nodes, 3)
+        records.append(get_node_records(fr.FIL_NODE_DISP, contact_labels, u))
+        for label in [num_contact_nodes + 1, num_contact_nodes + 2]:
+            records.append(get_records(fr.FIL_OUTPUT_REQUEST_DEF, np.zeros(3)))
+            records.append(get_node_records(fr.FIL_NODE_DISP, [label], np.random.rand(1, 6)))
+        records.append(get_records(fr.FIL_INCREMENT_END, np.zeros(0)))
+
+    words = np.concatenate([record.reshape(-1) for record in records])
+    num_blocks = -(-len(words) // fr.BLOCK_WORDS)
+    blocks = np.zeros(num_blocks, dtype=[('head', '<i4'), ('words', '<f8', (fr.BLOCK_WORDS,)),
+                                         ('tail', '<i4')])
+    blocks['head'] = fr.BLOCK_BYTES
+    blocks['tail'] = fr.BLOCK_BYTES
+    blocks['words'] = np.concatenate((words, np.zeros(num_blocks*fr.BLOCK_WORDS - len(words)))
+                                     ).reshape((num_blocks, fr.BLOCK_WORDS))
+    blocks.tofile(fil_file)
+
+
+def get_records(key, attributes):
+    # Get a record [1, record_length] with the given float attributes
+    record = np.concatenate((np.zeros(2), attributes)).reshape((1, -1))
+    set_int(record, [0, 1], [record.shape[1], key])
+    return record
+
+
+def get_node_records(key, labels, values):
+    # Get records [num_nodes, record_length] with node labels and values
+    records = np.concatenate((np.zeros((len(labels), 3)), values), axis=1)
+    set_int(records, [0, 1], [records.shape[1], key])
+    set_int(records, [2], np.reshape(labels, (-1, 1)))
+    return records
+
+
+def set_int(records, word_inds, values):
+    # Set integer values in the given words of the records, first 4 bytes as in get_int
+    int_words = np.zeros((records.shape[0], len(word_inds), 2), dtype='<i4')
+    int_words[:, :, 0] = values
+    records[:, word_inds] = int_words.view('<f8')[:, :, 0]
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,136 @@
+""" Benchmark adding the `.fil` output to each step of a synthetic
+keyword block with :py:class:`rollover.utils.inp_file_edit.KeywordBlockEditor`,
+as done by :py:func:`rollover.three_d.utils.fil_output.add`, compared
+to calling :py:func:`rollover.utils.inp_file_edit.add_at_end_of_cat`
+for each insertion. The keyword block is replaced by
+:py:class:`MockKeywordBlock`, such that no Abaqus installation is
+required. The text of the resulting keyword blocks are checked to be
+equal (the editor joins insertions at the same position into one
+block), also when mixing insertions with `add_after` and
+`add_before`.
+
+Call as :command:`python benchmark_inp_file_edit.py [num_cycles1 num_cycles2 ...]`
+
+"""
+from __future__ import print_function
+import sys
+
+import benchmark_tools as bt
+from rollover.utils import naming_mod as names
+from rollover.utils import inp_file_edit as inp_edit
+from rollover.three_d.utils import fil_output
+
+DEFAULT_SIZES = [100, 500, 2000]
+NUM_MODEL_BLOCKS = 1000
+
+
+class MockKeywordBlock(object):
+    """ Mock of the Abaqus keyword block, with the list of keyword
+    blocks, `sieBlocks`, and the `insert` method
+
+    :param sie_blocks: The keyword blocks
+    :type sie_blocks: list[ str ]
+
+    """
+
+    def __init__(self, sie_blocks):
+        self.sieBlocks = list(sie_blocks)
+
+    def insert(self, position, text):
+        """ Insert `text` as a new block after the block at `position`
+
+        :param position: The index of the block after which to insert
+        :type position: int
+
+        :param text: The text to insert
+        :type text: str
+
+        """
+        self.sieBlocks.insert(position + 1, text)
+
+
+def main(argv):
+    sizes = bt.get_sizes(argv, DEFAULT_SIZES)
+    check_mixed_insertions()
+    bt.print_header(['num cycles', 'num blocks', 'old [s]', 'new [s]', 'speedup'])
+    for num_cycles in sizes:
+        sie_blocks = get_sie_blocks(num_cycles)
+        old_kwb = MockKeywordBlock(sie_blocks)
+        new_kwb = MockKeywordBlock(sie_blocks)
+        t_old, _ = bt.time_function(add_fil_output_old, old_kwb, num_cycles)
+        t_new, _ = bt.time_function(add_fil_output_new, new_kwb, num_cycles)
+        if '\n'.join(old_kwb.sieBlocks) != '\n'.join(new_kwb.sieBlocks):
+            raise ValueError('The keyword blocks differ')
+        bt.print_row([num_cycles, len(sie_blocks), t_old, t_new, t_old/t_new])
+
+
+def get_sie_blocks(num_cycles):
+    # Keyword blocks similar to those of a rollover model, with the
+    # model definition followed by the steps
+    sie_blocks = ['*Heading\n** Job name: rollover Model name: rollover']
+    sie_blocks.extend(['*Nset, nset=SET_%u, instance=RAIL\n%u,' % (i, i)
+                       for i in range(NUM_MODEL_BLOCKS)])
+    step_names = [names.step1, names.step2, names.get_step_rolling(1)]
+    for cycle_nr in range(2, num_cycles + 1):
+        step_names.extend([names.get_step_return(cycle_nr), names.get_step_reapply(cycle_nr),
+                           names.get_step_release(cycle_nr), names.get_step_rolling(cycle_nr)])
+    for step_name in step_names:
+        sie_blocks.extend(['** STEP: ' + step_name + '\n*Step, name=' + step_name
+                           + ', nlgeom=YES, inc=1000', '*Static\n0.01, 1., 1e-05, 0.01',
+                           '*Boundary, user\nWHEEL.WHEEL_RP, 1, 6',
+                           '*Restart, write, frequency=0', '*End Step'])
+    return sie_blocks
+
+
+def get_fil_output_insertions(num_cycles):
+    # The (step name, string) to add, as in fil_output.add
+    insertions = []
+    for varstr, step_name in [('COORD, U', names.get_step_rolling(1))] + \
+            [(varstr, step_name) for cycle_nr in range(2, num_cycles + 1)
+             for varstr, step_name in [('', names.get_step_return(cycle_nr)),
+                                       ('U', names.get_step_rolling(cycle_nr))]]:
+        for nset in ['WHEEL.WHEEL_CONTACT_NODES', 'WHEEL.WHEEL_RP', 'RAIL_RP']:
+            insertions.append((step_name, fil_output.get_node_file_output_str(nset, varstr)))
+    return insertions
+
+
+def add_fil_output_old(keyword_block, num_cycles):
+    for step_name, add_str in get_fil_output_insertions(num_cycles):
+        inp_edit.add_at_end_of_cat(keyword_block, add_str, category='Step', name=step_name)
+
+
+def add_fil_output_new(keyword_block, num_cycles):
+    editor = inp_edit.KeywordBlockEditor(keyword_block)
+    for step_name, add_str in get_fil_output_insertions(num_cycles):
+        editor.add_at_end_of_cat(add_str, category='Step', name=step_name)
+    editor.apply()
+
+
+def check_mixed_insertions():
+    # Check that insertions at the same positions with the different
+    # functions give the same order as when applied one at a time.
+    # The editor joins insertions at the same position, hence the
+    # joined text is compared.
+    insertions = [('add_at_end_of_cat', 'A', {'category': 'Step', 'name': names.step2}),
+                  ('add_after', 'B', {'find_strings': ['*Restart', 'frequency=0']}),
+                  ('add_after', 'C', {'find_strings': ['*Restart', 'frequency=0']}),
+                  ('add_at_end_of_cat', 'D', {'category': 'Step', 'name': names.step1}),
+                  ('add_before', 'E', {'find_strings': ['*End Step']}),
+                  ('add_after', 'F', {}),
+                  ('add_after', 'G', {}),
+                  ('add_before', 'H', {}),
+                  ('add_before', 'I', {})]
+    sie_blocks = get_sie_blocks(2)
+    old_kwb = MockKeywordBlock(sie_blocks)
+    new_kwb = MockKeywordBlock(sie_blocks)
+    editor = inp_edit.KeywordBlockEditor(new_kwb)
+    for function_name, add_str, kwargs in insertions:
+        getattr(inp_edit, function_name)(old_kwb, add_str, **kwargs)
+        getattr(editor, function_name)(add_str, **kwargs)
+    editor.apply()
+    if '\n'.join(old_kwb.sieBlocks) != '\n'.join(new_kwb.sieBlocks):
+        raise ValueError('The order of mixed insertions differ')
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,118 @@
+""" Benchmark writing a revolved wheel mesh to an Abaqus input file with
+:py:func:`rollover.three_d.wheel.three_d_mesh.save_3d_mesh_to_inp`,
+which uses :py:mod:`rollover.utils.inp_writer`, compared to the
+previous line-by-line implementation. The throughput is given in lines
+per second, and the written values are checked to be equal.
+
+Call as :command:`python benchmark_inp_writer.py [num_elems1 num_elems2 ...]`
+
+"""
+from __future__ import print_function
+import sys, os, shutil, tempfile
+import numpy as np
+
+import benchmark_tools as bt
+import benchmark_3d_mesh
+from rollover.three_d.wheel import three_d_mesh
+from rollover.utils import naming_mod as names
+
+DEFAULT_SIZES = [10000, 100000, 300000]
+
+
+def main(argv):
+    sizes = bt.get_sizes(argv, DEFAULT_SIZES)
+    mesh_2d = benchmark_3d_mesh.get_2d_mesh()
+    num_elems_2d = len(mesh_2d['elements']['N8']) + len(mesh_2d['elements']['N6'])
+    bt.print_header(['num elems', 'old [lines/s]', 'new [lines/s]', 'speedup'])
+    cwd = os.getcwd()
+    tmp_dir = tempfile.mkdtemp()
+    try:
+        os.chdir(tmp_dir)
+        for num_elems in sizes:
+            mesh_size = 2*np.pi*benchmark_3d_mesh.RADIUS*num_elems_2d/float(num_elems)
+            mesh_3d = three_d_mesh.make_3d_mesh_quad(mesh_2d, mesh_size)
+
+            t_old, old_file = bt.time_function(save_3d_mesh_to_inp_old, mesh_3d)
+            shutil.move(old_file, 'old.inp')
+            t_new, new_file = bt.time_function(three_d_mesh.save_3d_mesh_to_inp, mesh_3d)
+
+            lines_old = count_lines('old.inp')
+            lines_new = count_lines(new_file)
+            check_equal('old.inp', new_file)
+            num_elems_3d = sum([len(elems) for elems in mesh_3d['elements'].values()])
+            bt.print_row([num_elems_3d, lines_old/t_old, lines_new/t_new, t_old/t_new])
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(tmp_dir)
+
+
+def count_lines(file_name):
+    with open(file_name, 'r') as fid:
+        return sum(1 for _ in fid)
+
+
+def read_data(file_name):
+    """ Read the node and element data from the input file, joining
+    continuation lines, such that files with different line splitting
+    can be compared.
+
+    :returns: Dictionary with keyword lines as keys and a list of values
+              (float) for the data in the block
+    :rtype: dict
+
+    """
+    data = {}
+    current = None
+    with open(file_name, 'r') as fid:
+        for line in fid:
+            if line.startswith('**'):
+                continue
+            elif line.startswith('*'):
+                current = line.strip().lower()
+                data[current] = []
+            elif current is not None:
+                data[current].extend([float(v) for v in line.split(',') if len(v.strip()) > 0])
+    return data
+
+
+def check_equal(file1, file2):
+    data1 = read_data(file1)
+    data2 = read_data(file2)
+    if sorted(data1.keys()) != sorted(data2.keys()):
+        raise ValueError('Different keywords in the input files')
+    for key in data1:
+        if data1[key] != data2[key]:
+            raise ValueError('Different data for "' + key + '"')
+
+
+def save_3d_mesh_to_inp_old(mesh_3d):
+    # Previous implementation of three_d_mesh.save_3d_mesh_to_inp
+    input_file = 'wheel_3d_mesh.inp'
+    with open(input_file, 'w') as inp:
+        inp.write('** Input file to save mesh (faster than creating mesh in abaqus cae)\n')
+        inp.write('*Heading\n')
+        inp.write('*Preprint, echo=NO, history=NO, contact=NO\n')
+        inp.write('*Part, name=' + names.wheel_part + '\n')
+
+        inp.write('*Node\n')
+        for i, node in enumerate(mesh_3d['nodes']):
+            inp.write(('{:7.0f}' + 3*', {:25.15e}' + '\n').format(i+1, *node))
+
+        ecodes = {'N6': 'C3D6', 'N8': 'C3D8', 'N15': 'C3D15', 'N20': 'C3D20'}
+        enum = 1
+        for etype in mesh_3d['elements']:
+            ecode = ecodes[etype]
+            elems = mesh_3d['elements'][etype]
+            nnods = len(elems[0])
+            inp.write('*Element, type=' + ecode + '\n')
+            for i, elem in enumerate(elems):
+                elem_nn = elem + 1
+                inp.write(('{:7.0f}' + nnods*', {:7.0f}' + '\n').format(i+enum, *elem_nn))
+            enum = enum + len(elems)
+        inp.write('*End Part\n')
+
+    return input_file
+
+
+if __name__ == '__main__':
+    main(sys.argv)
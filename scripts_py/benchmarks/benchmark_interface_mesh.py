@@ -0,0 +1,123 @@
+""" Benchmark merging the nodes of the rail substructure interface mesh
+with :py:func:`rollover.three_d.utils.spatial_hash.get_unique_inds`, as
+done in :py:func:`rollover.three_d.rail.substructure.save_interface_mesh`,
+compared to the previous approach of searching all previously added
+nodes for each node (with the removed `find_node_by_coord`). The
+previous approach is emulated with numpy (one vectorized search per
+node), the timing in Abaqus CAE is not included.
+
+The interface is synthetic: the four sides of a rectangular cross
+section (a vertical slice through the rail), with a quadrilateral mesh
+on each side. As for the offset meshes in Abaqus, each side has its own
+nodes, such that the nodes along the common edges are duplicated. The
+mesh size is chosen to give approximately the requested number of
+nodes.
+
+Call as :command:`python benchmark_interface_mesh.py [num_nodes1 num_nodes2 ...]`
+
+"""
+from __future__ import print_function
+import sys
+import numpy as np
+
+import benchmark_tools as bt
+from rollover.three_d.utils import spatial_hash
+
+DEFAULT_SIZES = [5000, 20000, 50000]
+INTERFACE_SIZE = [150.0, 50.0, 30.0]    # Height, depth and width (y, z, x)
+NODE_TOL = 1.e-6                        # As in substructure
+
+
+def main(argv):
+    sizes = bt.get_sizes(argv, DEFAULT_SIZES)
+    bt.print_header(['num nodes', 'unique', 'old [s]', 'new [s]', 'speedup'])
+    for num_nodes in sizes:
+        all_coord = get_interface_mesh(num_nodes, merge=False)['node_coord']
+        t_old, new_inds_old = bt.time_function(merge_nodes_old, all_coord)
+        t_new, new_inds_new = bt.time_function(merge_nodes, all_coord)
+        if not np.array_equal(new_inds_old, new_inds_new):
+            raise ValueError('Different merged nodes for %u nodes' % num_nodes)
+        bt.print_row([len(all_coord), np.max(new_inds_new) + 1, t_old, t_new, t_old/t_new])
+
+
+def get_interface_mesh(num_nodes, merge=True):
+    """ Get a synthetic interface mesh with approximately `num_nodes`
+    nodes, in the format saved by
+    :py:func:`rollover.three_d.rail.substructure.save_interface_mesh`
+
+    :param num_nodes: The approximate number of nodes
+    :type num_nodes: int
+
+    :param merge: Should nodes at the same position be merged?
+    :type merge: bool
+
+    :returns: The interface mesh, with the keys `node_coord`,
+              `face_elements` and `face_vertex_coord`
+    :rtype: dict
+
+    """
+
+    height, depth, width = INTERFACE_SIZE
+    # The sides are the planes x=0, x=width, y=0 and y=height
+    area = 2*depth*(height + width)
+    mesh_size = np.sqrt(area/num_nodes)
+    node_coord = []
+    face_elements = []
+    face_vertex_coord = []
+    for axis, pos in [(0, 0.0), (0, width), (1, 0.0), (1, height)]:
+        in_plane = [height if axis == 0 else width, depth]
+        num_el = [max(int(np.round(length/mesh_size)), 1) for length in in_plane]
+        u, v = np.meshgrid(np.linspace(0.0, in_plane[0], num_el[0] + 1),
+                           np.linspace(0.0, in_plane[1], num_el[1] + 1), indexing='ij')
+        coords = np.zeros((u.size, 3))
+        coords[:, axis] = pos
+        coords[:, 1 - axis] = u.reshape(-1)
+        coords[:, 2] = v.reshape(-1)
+        inds = len(node_coord) + np.arange(u.size).reshape(u.shape)
+        node_coord.extend(coords.tolist())
+        face_elements.append([{'connectivity': [int(inds[i, j]), int(inds[i + 1, j]),
+                                                int(inds[i + 1, j + 1]), int(inds[i, j + 1])],
+                               'type': 'M3D4'}
+                              for i in range(num_el[0]) for j in range(num_el[1])])
+        corners = coords[[inds[0, 0], inds[-1, 0], inds[-1, -1], inds[0, -1]] - inds[0, 0]]
+        face_vertex_coord.append(corners.tolist())
+
+    if merge:
+        new_inds = merge_nodes(node_coord)
+        _, first_inds = np.unique(new_inds, return_index=True)
+        node_coord = [node_coord[i] for i in first_inds]
+        for face_elems in face_elements:
+            for elem in face_elems:
+                elem['connectivity'] = [int(new_inds[i]) for i in elem['connectivity']]
+
+    return {'node_coord': node_coord, 'face_elements': face_elements,
+            'face_vertex_coord': face_vertex_coord}
+
+
+def merge_nodes(all_coord):
+    # New index of each node after merging, as in save_interface_mesh
+    unique_inds = spatial_hash.get_unique_inds(np.array(all_coord), tol=NODE_TOL)
+    is_unique = unique_inds == np.arange(len(all_coord))
+    return (np.cumsum(is_unique) - 1)[unique_inds]
+
+
+def merge_nodes_old(all_coord):
+    # Numpy emulation of the previous save_interface_mesh, calling
+    # the removed find_node_by_coord for each node
+    node_coord = np.zeros((len(all_coord), 3))
+    num_unique = 0
+    new_inds = np.zeros(len(all_coord), dtype=int)
+    for k, coord in enumerate(all_coord):
+        found = np.nonzero(np.linalg.norm(node_coord[:num_unique] - coord, axis=1)
+                           < NODE_TOL)[0]
+        if len(found) > 0:
+            new_inds[k] = found[0]
+        else:
+            new_inds[k] = num_unique
+            node_coord[num_unique] = coord
+            num_unique = num_unique + 1
+    return new_inds
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,71 @@
+""" Benchmark saving and reading the rail substructure interface mesh
+in the .npz format of :py:mod:`rollover.three_d.rail.interface_mesh`,
+compared to the previous json format (a dictionary for each element,
+saved with :py:func:`rollover.utils.json_io.save`). The interface mesh
+is the synthetic interface from :py:mod:`benchmark_interface_mesh`. The
+files are written to a temporary folder, and the read interface mesh
+is checked against the saved one.
+
+Call as :command:`python benchmark_interface_mesh_io.py [num_nodes1 num_nodes2 ...]`
+
+"""
+from __future__ import print_function
+import sys, os
+import shutil, tempfile
+import numpy as np
+
+import benchmark_tools as bt
+import benchmark_interface_mesh
+from rollover.utils import json_io
+from rollover.three_d.rail import interface_mesh
+
+DEFAULT_SIZES = [10000, 50000, 200000]
+
+
+def main(argv):
+    sizes = bt.get_sizes(argv, DEFAULT_SIZES)
+    tmp_dir = tempfile.mkdtemp()
+    json_file = os.path.join(tmp_dir, 'interface_mesh.json')
+    npz_file = os.path.join(tmp_dir, 'interface_mesh.npz')
+    bt.print_header(['num nodes', 'format', 'save [s]', 'read [s]', 'size [MB]'])
+    try:
+        for num_nodes in sizes:
+            old_mesh = benchmark_interface_mesh.get_interface_mesh(num_nodes)
+            new_mesh = get_grouped_mesh(old_mesh)
+            t_save, _ = bt.time_function(json_io.save, json_file, old_mesh)
+            t_read, _ = bt.time_function(json_io.read, json_file)
+            bt.print_row([len(old_mesh['node_coord']), 'json', t_save, t_read,
+                          os.path.getsize(json_file)/1.e6])
+            t_save, _ = bt.time_function(interface_mesh.save, new_mesh, npz_file)
+            t_read, read_mesh = bt.time_function(interface_mesh.read, npz_file)
+            bt.print_row([len(old_mesh['node_coord']), 'npz', t_save, t_read,
+                          os.path.getsize(npz_file)/1.e6])
+            check_equal(new_mesh, read_mesh)
+    finally:
+        shutil.rmtree(tmp_dir)
+
+
+def get_grouped_mesh(old_mesh):
+    # Convert the interface mesh in the previous format (with a
+    # dictionary for each element) to that of interface_mesh
+    face_elements = [interface_mesh.group_by_type([elem['type'] for elem in face_elems],
+                                                  [elem['connectivity'] for elem in face_elems])
+                     for face_elems in old_mesh['face_elements']]
+    return {'node_coord': np.array(old_mesh['node_coord']),
+            'face_elements': face_elements,
+            'face_vertex_coord': [np.array(vc) for vc in old_mesh['face_vertex_coord']]}
+
+
+def check_equal(mesh1, mesh2):
+    ok = np.array_equal(mesh1['node_coord'], mesh2['node_coord'])
+    ok = ok and len(mesh1['face_elements']) == len(mesh2['face_elements'])
+    for fe1, fe2, vc1, vc2 in zip(mesh1['face_elements'], mesh2['face_elements'],
+                                  mesh1['face_vertex_coord'], mesh2['face_vertex_coord']):
+        ok = ok and np.array_equal(vc1, vc2) and sorted(fe1.keys()) == sorted(fe2.keys())
+        ok = ok and all([np.array_equal(fe1[key], fe2[key]) for key in fe1])
+    if not ok:
+        raise ValueError('The read interface mesh differs from the saved one')
+
+
+if __name__ == '__main__':
+    main(sys.argv)
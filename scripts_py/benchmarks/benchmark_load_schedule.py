@@ -0,0 +1,102 @@
+""" Benchmark getting the vertical load and speed for all cycles with
+:py:class:`rollover.three_d.utils.load_param.LoadSchedule`, compared to
+the previous implementation (`get_cycle_data` in
+:py:mod:`rollover.three_d.utils.loading`, emulated below), which was
+called once per cycle. The load parameters are changed every 10th
+cycle. The loading files written by both implementations are compared.
+
+Call as :command:`python benchmark_load_schedule.py [num_cycles1 num_cycles2 ...]`
+
+"""
+from __future__ import print_function
+import sys, os, tempfile, shutil, filecmp
+
+import numpy as np
+
+import benchmark_tools as bt
+from rollover.three_d.utils import load_param
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+CHANGE_INTERVAL = 10
+ROLLING_LENGTH = 30.0
+ROLLING_RADIUS = 460.0
+
+
+def main(argv):
+    sizes = bt.get_sizes(argv, DEFAULT_SIZES)
+    folder = tempfile.mkdtemp()
+    try:
+        bt.print_header(['num cycles', 'old [s]', 'new [s]', 'speedup'])
+        for num_cycles in sizes:
+            settings = get_settings(num_cycles)
+            cycle_nrs = np.arange(1, num_cycles + 1)
+            t_old, out_old = bt.time_function(get_all_old, cycle_nrs, settings)
+            t_new, out_new = bt.time_function(get_all_new, cycle_nrs, settings)
+            if not np.array_equal(out_old, out_new):
+                raise ValueError('Different load parameters')
+            check_loading_file(folder, settings)
+            bt.print_row([num_cycles, t_old, t_new, t_old/t_new])
+    finally:
+        shutil.rmtree(folder)
+
+
+def get_settings(num_cycles):
+    # Loading settings with new values every CHANGE_INTERVAL cycles
+    cycles = list(range(1, num_cycles + 1, CHANGE_INTERVAL))
+    values = np.random.rand(4, len(cycles))
+    return {'cycles': cycles, 'vertical_load': (1.e5*(1 + values[0])).tolist(),
+            'speed': (1.e4*(1 + values[1])).tolist(), 'slip': (0.01*values[2]).tolist(),
+            'rail_ext': values[3].tolist()}
+
+
+def get_all_new(cycle_nrs, settings):
+    schedule = load_param.LoadSchedule.from_settings(settings)
+    return np.transpose([schedule.get(cycle_nrs, 'vertical_load'),
+                         schedule.get(cycle_nrs, 'speed')])
+
+
+def get_all_old(cycle_nrs, settings):
+    # Loop in the previous rollover.three_d.utils.loading.setup
+    return np.array([get_cycle_data_old(cycle_nr, settings['cycles'],
+                                        [settings['vertical_load'], settings['speed']])
+                     for cycle_nr in cycle_nrs])
+
+
+def get_cycle_data_old(cycle_nr, cycles, cycle_data):
+    # From the previous rollover.three_d.utils.loading (np.int replaced by int)
+    search_cycles = cycles[:]
+    search_cycles.append(np.iinfo(int).max)  # Append max int possible
+
+    ind = np.argmax(cycle_nr < np.array(search_cycles))-1
+
+    return [data[ind] for data in cycle_data]
+
+
+def check_loading_file(folder, settings):
+    # Check that the loading file is unchanged
+    old_file = os.path.join(folder, 'old.txt')
+    new_file = os.path.join(folder, 'new.txt')
+    write_loading_file_old(100., ROLLING_LENGTH, ROLLING_RADIUS, settings['cycles'],
+                           settings['vertical_load'], settings['speed'], settings['slip'],
+                           settings['rail_ext'], old_file)
+    load_param.LoadSchedule.from_settings(settings).write_loading_file(
+        100., ROLLING_LENGTH, ROLLING_RADIUS, new_file)
+    if not filecmp.cmp(old_file, new_file, shallow=False):
+        raise ValueError('Different loading files')
+
+
+def write_loading_file_old(initial_depression_speed, rolling_length, rolling_radius,
+                           cycles, load, speed, slip, rail_ext, file_name):
+    # From the previous rollover.three_d.utils.load_param
+    with open(file_name, 'w') as fid:
+        fid.write('%25.15e\n' % (rolling_length))
+        fid.write('%25.15e\n' % (-initial_depression_speed))
+        fid.write('%0.0f\n' % (len(cycles)))
+        for c, v, s, rext in zip(cycles, speed, slip, rail_ext):
+            rolling_time = rolling_length/v
+            rot_per_length = (1+s)/rolling_radius
+            fid.write(('%0.0f' + 3*', %25.15e' + '\n') % (c, rolling_time, rot_per_length, rext))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
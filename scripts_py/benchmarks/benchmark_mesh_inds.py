@@ -0,0 +1,106 @@
+""" Benchmark determining the index matrix of the wheel user element
+nodes with
+:py:func:`rollover.three_d.wheel.super_element.get_mesh_inds`, for
+synthetic revolved point clouds of increasing size. The nodes are
+placed as for a quadratic mesh (no center nodes), shuffled and
+perturbed slightly. The previous implementation, searching through all
+nodes for each (angle, x) pair, is only run up to `MAX_SIZE_OLD` nodes
+as it scales quadratically.
+
+Call as :command:`python benchmark_mesh_inds.py [num_nodes1 num_nodes2 ...]`
+
+"""
+from __future__ import print_function
+import sys
+import numpy as np
+
+import benchmark_tools as bt
+from rollover.three_d.wheel import super_element
+
+DEFAULT_SIZES = [1000, 10000, 50000, 200000, 500000]
+MAX_SIZE_OLD = 25000
+RADIUS = 460.0          # Wheel radius
+MESH_SIZE = 0.5         # Distance between nodes
+NOISE = 1.e-4           # Perturbation of the node coordinates
+
+
+def main(argv):
+    sizes = bt.get_sizes(argv, DEFAULT_SIZES)
+    bt.print_header(['num nodes', 'old [s]', 'new [s]', 'speedup'])
+    for num_nodes in sizes:
+        coords = get_revolved_coords(num_nodes)
+        t_new, inds_new = bt.time_function(super_element.get_mesh_inds, coords)
+        if coords.shape[0] <= MAX_SIZE_OLD:
+            t_old, inds_old = bt.time_function(get_mesh_inds_old, coords)
+            if inds_old != inds_new:
+                raise ValueError('Different results for ' + str(coords.shape[0]) + ' nodes')
+            bt.print_row([coords.shape[0], t_old, t_new, t_old/t_new])
+        else:
+            bt.print_row([coords.shape[0], '-', t_new, '-'])
+
+
+def get_revolved_coords(num_nodes):
+    """ Get the coordinates of a quadratic quad mesh on a wheel
+    surface, revolved around the x-axis. The number of nodes is
+    approximately `num_nodes`.
+
+    :param num_nodes: Approximate number of nodes to generate
+    :type num_nodes: int
+
+    :returns: Shuffled node coordinates
+    :rtype: np.array (shape = [npoints, 3])
+
+    """
+
+    # Use 2*n+1 node rows in each direction, with 3/4 of the nodes
+    # present (quadratic elements without center nodes)
+    num_rows = 2*int(np.sqrt(num_nodes/0.75)/2) + 1
+    xcoords = MESH_SIZE*(np.arange(num_rows) - num_rows//2)
+    angles = (MESH_SIZE/RADIUS)*(np.arange(num_rows) - num_rows//2)
+    ang_ind, x_ind = np.meshgrid(np.arange(num_rows), np.arange(num_rows), indexing='ij')
+    keep = np.logical_not((ang_ind % 2 == 1) & (x_ind % 2 == 1))
+    ang = angles[ang_ind[keep]]
+    x = xcoords[x_ind[keep]]
+    radius = RADIUS + 0.01*x**2/RADIUS     # Slightly curved profile
+
+    coords = np.transpose([x, -radius*np.cos(ang), -radius*np.sin(ang)])
+    coords = coords + NOISE*np.random.randn(*coords.shape)
+    return coords[np.random.permutation(coords.shape[0])]
+
+
+def get_mesh_inds_old(coords):
+    # Previous implementation of super_element.get_mesh_inds
+    TOL = 1.e-2 # Linear tolerance (length unit)
+
+    angles = np.arctan2(-coords[:, 2], -coords[:, 1])
+    radii = np.sqrt(coords[:, 1]**2 + coords[:, 2]**2)
+    xcoords = coords[:, 0]
+
+    ang_tol = TOL/np.max(radii)
+    unique_angles = super_element.get_unique(angles, ang_tol)
+    unique_xcoords = super_element.get_unique(xcoords, TOL)
+
+    index_matrix = []
+    for ang in unique_angles:
+        index_matrix.append([])
+        last_failed = True  # The first x-coordinate should be found
+        for xcoord in unique_xcoords:
+            try:
+                coord_index = super_element.find_coord(find_coords=(ang, xcoord),
+                                                       search_coords=(angles, xcoords),
+                                                       tol=[ang_tol, TOL])
+                this_failed = False
+            except ValueError:
+                this_failed = True
+
+            if last_failed and this_failed:
+                raise ValueError('Could not determine coordinates')
+            elif not this_failed:
+                index_matrix[-1].append(coord_index)
+            last_failed = this_failed
+
+    return index_matrix
+
+
+if __name__ == '__main__':
+    main(sys.argv)
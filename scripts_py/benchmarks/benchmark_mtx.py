@@ -0,0 +1,118 @@
+""" Benchmark reading the substructure stiffness matrix from the `.mtx`
+file. The streaming parser in
+:py:func:`rollover.three_d.wheel.stiffness_io.read_mtx_stiffness`
+(followed by
+:py:func:`rollover.three_d.wheel.stiffness_io.unpack_symmetric`) is
+compared to the previous implementation of
+:py:func:`rollover.three_d.wheel.super_element.get_stiffness`, for
+synthetic matrices of increasing size.
+
+Call as :command:`python benchmark_mtx.py [ndof1 ndof2 ...]`
+
+"""
+from __future__ import print_function
+import sys, os, tempfile
+import numpy as np
+
+import benchmark_tools as bt
+from rollover.three_d.wheel import stiffness_io
+
+DEFAULT_SIZES = [300, 1000, 3000]
+VALUES_PER_LINE = 4
+
+
+def main(argv):
+    sizes = bt.get_sizes(argv, DEFAULT_SIZES)
+    bt.print_header(['ndof', 'size [MB]', 'old [s]', 'new [s]', 'speedup'])
+    for ndof in sizes:
+        fd, mtx_file = tempfile.mkstemp(suffix='.mtx')
+        os.close(fd)
+        try:
+            write_mtx_file(mtx_file, ndof)
+            file_size = os.path.getsize(mtx_file)/1.e6
+            t_old, k_old = bt.time_function(get_stiffness_old, mtx_file)
+            t_new, k_new = bt.time_function(get_stiffness_new, mtx_file)
+        finally:
+            os.remove(mtx_file)
+
+        if not np.array_equal(k_old, k_new):
+            raise ValueError('Different results for ndof = ' + str(ndof))
+        bt.print_row([ndof, file_size, t_old, t_new, t_old/t_new])
+
+
+def get_stiffness_new(mtx_file):
+    packed, ndof = stiffness_io.read_mtx_stiffness(mtx_file)
+    return stiffness_io.unpack_symmetric(packed, ndof)
+
+
+def get_stiffness_old(mtx_file):
+    # Previous implementation of super_element.get_stiffness
+    with open(mtx_file, 'r') as mtx:
+        mtx_str = mtx.read()
+
+    mat_str = mtx_str.split('*MATRIX,TYPE=STIFFNESS')[-1].split('*')[0].strip(',').strip('\n')
+    mat_vec = []
+    for entry in mat_str.split():
+        ent = entry.strip(',').strip('\n')
+        try:
+            mat_vec.append(float(ent))
+        except ValueError as e:
+            if len(ent) == 0:
+                pass
+            else:
+                print('Cannot convert "' + ent + '" to a float')
+                raise e
+
+    mat_vec = np.array(mat_vec)
+    ndof = -0.5+np.sqrt(0.25+mat_vec.size*2)
+    if np.abs(ndof-int(ndof)) < 1.e-10:
+        ndof = int(ndof)
+    else:
+        print('Error reading matrix from ' + mtx_file + '.mtx')
+        return None
+
+    kmat = np.zeros((ndof,ndof))
+    k = 0
+    for i in range(ndof):
+        for j in range(i+1):
+            kmat[i,j] = mat_vec[k]
+            kmat[j,i] = kmat[i,j]
+            k = k + 1
+
+    return kmat
+
+
+def write_mtx_file(mtx_file, ndof):
+    """ Write a synthetic mtx file with a reference point node (6 dofs)
+    as the first node, followed by nodes with 3 dofs each.
+
+    :param mtx_file: Name of file to write
+    :type mtx_file: str
+
+    :param ndof: Number of dofs, rounded up to 6 + a multiple of 3.
+    :type ndof: int
+
+    """
+
+    num_nodes = 1 + int(np.ceil(max(ndof - 6, 0)/3.0))
+    ndof = 6 + 3*(num_nodes - 1)
+    values = np.random.randn(stiffness_io.get_packed_size(ndof))
+    with open(mtx_file, 'w') as fid:
+        fid.write('** SYNTHETIC SUBSTRUCTURE MATRIX\n')
+        fid.write('** ELEMENT NODES\n')
+        node_nrs = [str(n) for n in range(1, num_nodes + 1)]
+        for i in range(0, num_nodes, 16):
+            fid.write('** ' + ', '.join(node_nrs[i:(i+16)]) + '\n')
+        fid.write('1, 1, 2, 3, 4, 5, 6\n')
+        if num_nodes > 1:
+            fid.write('2, 1, 2, 3\n')
+        fid.write('*MATRIX,TYPE=STIFFNESS\n')
+        num_full = (values.size//VALUES_PER_LINE)*VALUES_PER_LINE
+        np.savetxt(fid, values[:num_full].reshape((-1, VALUES_PER_LINE)),
+                   fmt='%.16e', delimiter=', ')
+        if num_full < values.size:
+            np.savetxt(fid, values[num_full:].reshape((1, -1)), fmt='%.16e', delimiter=', ')
+
+
+if __name__ == '__main__':
+    main(sys.argv)
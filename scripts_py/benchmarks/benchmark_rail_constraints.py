@@ -0,0 +1,80 @@
+""" Benchmark pairing the nodes on the rail end faces for the rail
+constraints with
+:py:func:`rollover.three_d.rail.constraint_equations.pair_nodes`,
+compared to the bounding box search for each constrained node in
+:py:func:`rollover.three_d.rail.constraints.create_sets`. The bounding
+box search is emulated here with numpy, the timing in Abaqus CAE
+(where each search and the creation of two sets per node pair is much
+slower) is not included. The time for writing the `*Equation` keywords
+for all node pairs,
+:py:func:`rollover.three_d.rail.constraint_equations.get_inp_str`, is
+also reported.
+
+The end faces are synthetic: a grid of nodes in the xy-plane, with
+perturbed coordinates, at :math:`z=0` and :math:`z=L`. The retained
+nodes are given in random order.
+
+Call as :command:`python benchmark_rail_constraints.py [num_nodes1 num_nodes2 ...]`
+
+"""
+from __future__ import print_function
+import sys
+import numpy as np
+
+import benchmark_tools as bt
+from rollover.three_d.rail import constraint_equations
+
+DEFAULT_SIZES = [1000, 5000, 20000]
+RAIL_LENGTH = 30.0
+FACE_SIZE = 150.0
+SEARCH_TOL = 1.e-3  # As in constraints.create_sets
+
+
+def main(argv):
+    sizes = bt.get_sizes(argv, DEFAULT_SIZES)
+    bt.print_header(['num nodes', 'old [s]', 'new [s]', 'speedup', 'inp str [s]'])
+    for num_nodes in sizes:
+        c_coords, r_coords = get_face_coords(num_nodes)
+        t_old, r_inds_old = bt.time_function(pair_nodes_old, c_coords, r_coords)
+        t_new, r_inds_new = bt.time_function(constraint_equations.pair_nodes,
+                                             c_coords, r_coords)
+        if not np.array_equal(r_inds_old, r_inds_new):
+            raise ValueError('Different node pairs for %u nodes' % num_nodes)
+        c_labels = np.arange(1, num_nodes + 1)
+        r_labels = num_nodes + 1 + np.arange(num_nodes)
+        t_str, _ = bt.time_function(constraint_equations.get_inp_str, c_labels, c_coords,
+                                    r_labels[r_inds_new], r_coords[r_inds_new])
+        bt.print_row([num_nodes, t_old, t_new, t_old/t_new, t_str])
+
+
+def get_face_coords(num_nodes):
+    # Coordinates of the constrained (z=0) and retained (z=RAIL_LENGTH)
+    # nodes, the latter in random order
+    num_side = int(np.ceil(np.sqrt(num_nodes)))
+    spacing = FACE_SIZE/num_side
+    x, y = np.meshgrid(np.arange(num_side)*spacing, np.arange(num_side)*spacing)
+    xy = np.column_stack((x.reshape(-1), y.reshape(-1)))[:num_nodes]
+    xy = xy + (np.random.rand(num_nodes, 2) - 0.5)*spacing/2
+    c_coords = np.column_stack((xy, np.zeros(num_nodes)))
+    r_coords = np.column_stack((xy, RAIL_LENGTH*np.ones(num_nodes)))
+    # Round-off in the retained coordinates
+    r_coords = r_coords + (np.random.rand(num_nodes, 3) - 0.5)*SEARCH_TOL/10
+    return c_coords, r_coords[np.random.permutation(num_nodes)]
+
+
+def pair_nodes_old(c_coords, r_coords):
+    # Numpy emulation of the bounding box search in
+    # constraints.create_sets (getByBoundingBox for each node)
+    offset_vec = constraint_equations.get_offset_vector(c_coords, r_coords)
+    r_inds = np.zeros(len(c_coords), dtype=int)
+    for k, c_coord in enumerate(c_coords):
+        pos = c_coord + offset_vec
+        found = np.nonzero(np.all(np.abs(r_coords - pos) <= SEARCH_TOL, axis=1))[0]
+        if len(found) != 1:
+            raise ValueError('%u matching nodes found' % len(found))
+        r_inds[k] = found[0]
+    return r_inds
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,95 @@
+""" Benchmark finding the retained contact nodes of the wheel
+substructure with
+:py:func:`rollover.three_d.wheel.three_d_mesh.get_retained_node_labels`,
+using the revolution bookkeeping, compared to the previous approach in
+:py:func:`rollover.three_d.wheel.substructure.create_retained_set`. The
+previous approach searched all nodes with a bounding cylinder and a
+bounding box for each contact node in the 2d section, and combined the
+resulting sets. It is emulated here with numpy, the timing in Abaqus CAE
+(where each search and set operation is much slower) is not included.
+
+The section is the synthetic linear mesh from :py:mod:`benchmark_3d_mesh`
+with the wheel radius of the example wheel, and the retained intervals
+(angle and x-coordinate) are taken from the example wheel settings in
+:file:`data/wheel_settings/wheel_settings.json`. The mesh size is chosen
+to give approximately the requested number of 3d elements.
+
+Call as :command:`python benchmark_retained_nodes.py [num_elems1 num_elems2 ...]`
+
+"""
+from __future__ import print_function
+import sys
+import numpy as np
+
+import benchmark_tools as bt
+import benchmark_3d_mesh
+from rollover.three_d.wheel import three_d_mesh
+
+DEFAULT_SIZES = [10000, 100000, 500000]
+WHEEL_ANGLES = [-0.033, 0.1]        # Retained angular interval
+WHEEL_CONTACT_POS = [-10.0, 10.0]   # Retained x-interval
+BB_TOL = 1.e-2                      # As in substructure
+
+
+def main(argv):
+    sizes = bt.get_sizes(argv, DEFAULT_SIZES)
+    mesh_2d = benchmark_3d_mesh.get_linear_2d_mesh(benchmark_3d_mesh.get_2d_mesh())
+    num_elems_2d = len(mesh_2d['elements']['N4']) + len(mesh_2d['elements']['N3'])
+    contact_2d_nodes = get_contact_2d_nodes(mesh_2d['nodes'])
+    bt.print_header(['num nodes', 'num retained', 'old [s]', 'new [s]', 'speedup'])
+    for num_elems in sizes:
+        mesh_size = 2*np.pi*benchmark_3d_mesh.RADIUS*num_elems_2d/float(num_elems)
+        mesh_3d = three_d_mesh.make_3d_mesh_linear(mesh_2d, mesh_size)
+        wheel_angles = get_wheel_angles(mesh_3d['angles'])
+        t_old, labels_old = bt.time_function(get_retained_node_labels_old, mesh_3d['nodes'],
+                                             wheel_angles, contact_2d_nodes)
+        t_new, labels_new = bt.time_function(three_d_mesh.get_retained_node_labels, mesh_3d,
+                                             contact_2d_nodes, wheel_angles, BB_TOL)
+        if not np.array_equal(labels_old, labels_new):
+            raise ValueError('Different retained nodes for mesh size ' + str(mesh_size))
+        bt.print_row([mesh_3d['nodes'].shape[0], len(labels_new), t_old, t_new, t_old/t_new])
+
+
+def get_contact_2d_nodes(nodes_2d):
+    """ Get the coordinates of the 2d nodes at the outer radius within
+    the x-interval `WHEEL_CONTACT_POS`
+
+    """
+    r_outer = np.max(np.abs(nodes_2d[:, 1]))
+    on_surface = np.abs(np.abs(nodes_2d[:, 1]) - r_outer) < BB_TOL
+    in_interval = ((nodes_2d[:, 0] >= WHEEL_CONTACT_POS[0])
+                   & (nodes_2d[:, 0] <= WHEEL_CONTACT_POS[1]))
+    return [tuple(coord) for coord in nodes_2d[on_surface & in_interval]]
+
+
+def get_wheel_angles(mesh_angles):
+    # Same as rollover.three_d.wheel.substructure.get_wheel_angles, but
+    # the substructure module requires abaqus.
+    angles = np.concatenate((mesh_angles[mesh_angles > np.pi] - 2*np.pi,
+                             mesh_angles[mesh_angles <= np.pi]))
+    min_ind = np.argmax(angles > WHEEL_ANGLES[0]) - 1
+    max_ind = np.argmax(angles > WHEEL_ANGLES[1])
+    return [angles[min_ind] - 1.e-6, angles[max_ind] + 1.e-6]
+
+
+def get_retained_node_labels_old(nodes, wheel_angles, contact_2d_nodes):
+    # Numpy emulation of substructure.create_retained_set without
+    # mesh_3d, i.e. substructure.get_nodes_in_ang_int for each 2d node
+    labels = set()
+    for x0 in contact_2d_nodes:
+        r = np.sqrt(x0[1]**2 + x0[2]**2)
+        radii = np.sqrt(nodes[:, 1]**2 + nodes[:, 2]**2)
+        in_plane = np.abs(nodes[:, 0] - x0[0]) <= BB_TOL
+        outer = in_plane & (radii <= r + BB_TOL) & (radii >= r - BB_TOL)
+        if abs(wheel_angles[0]) > abs(wheel_angles[1]):
+            in_bb = ((nodes[:, 1] <= -r*np.cos(wheel_angles[0]))
+                     & (nodes[:, 2] <= r*np.sin(wheel_angles[1])))
+        else:
+            in_bb = ((nodes[:, 1] <= -r*np.cos(wheel_angles[1]))
+                     & (nodes[:, 2] >= r*np.sin(wheel_angles[0])))
+        labels.update((np.nonzero(outer & in_bb)[0] + 1).tolist())
+    return np.array(sorted(labels), dtype=int)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,78 @@
+""" Benchmark appending rollover cycles to the input file with
+:py:func:`rollover.three_d.utils.step_template.append_cycles`. The time
+to create the steps in CAE cannot be measured outside Abaqus, but as
+only the cycles 1 to `CAE_CYCLES` are created in CAE, that time does not
+depend on the total number of cycles.
+
+The input file is synthetic and mimics the steps written by CAE for
+:py:func:`rollover.three_d.utils.loading.setup`, including
+:file:`.fil` output. The appended steps are checked by counting the
+steps in the final file.
+
+Call as :command:`python benchmark_step_template.py [num_cycles1 num_cycles2 ...]`
+
+"""
+from __future__ import print_function
+import sys, os, tempfile, shutil
+
+import benchmark_tools as bt
+from rollover.utils import naming_mod as names
+from rollover.three_d.utils import step_template
+
+DEFAULT_SIZES = [100, 1000, 10000]
+CAE_CYCLES = 2
+LOADING = {'rolling_length': 30.0, 'cycles': [1, 500], 'vertical_load': [150.e3, 120.e3],
+           'speed': [30.e3, 20.e3], 'max_incr': 1000, 'min_incr': 60}
+
+
+def main(argv):
+    sizes = bt.get_sizes(argv, DEFAULT_SIZES)
+    folder = tempfile.mkdtemp()
+    try:
+        inp_file = os.path.join(folder, 'rollover.inp')
+        bt.print_header(['num cycles', 'time [s]', 'size [MB]'])
+        for num_cycles in sizes:
+            write_synthetic_inp(inp_file)
+            t, _ = bt.time_function(step_template.append_cycles, inp_file, CAE_CYCLES,
+                                    num_cycles=num_cycles, **LOADING)
+            check_steps(inp_file, num_cycles)
+            bt.print_row([num_cycles, t, os.path.getsize(inp_file)/1.e6])
+    finally:
+        shutil.rmtree(folder)
+
+
+def write_synthetic_inp(inp_file):
+    # Write steps similar to those written by CAE, with CAE_CYCLES cycles
+    with open(inp_file, 'w') as fid:
+        fid.write('*Heading\n** Model data\n*End Assembly\n')
+        fid.write(get_step(names.step1, 'WHEEL.WHEEL_RP, 2, 0.\n'))
+        fid.write(get_step(names.step2, '', '*Cload\nWHEEL.WHEEL_RP, 2, -150000.\n'))
+        for cycle_nr in range(1, CAE_CYCLES + 1):
+            fid.write(get_step(names.get_step_rolling(cycle_nr), '',
+                               '*Cload\nWHEEL.WHEEL_RP, 2, -150000.\n',
+                               '*NODE FILE, NSET=WHEEL.CONTACT_NODES, FREQUENCY=99999999 \nU\n'))
+            fid.write(get_step(names.get_step_return(cycle_nr + 1),
+                               '*Boundary, op=NEW, user\nWHEEL.CONTACT_NODES, 1, 3\n'))
+            fid.write(get_step(names.get_step_reapply(cycle_nr + 1),
+                               '*Boundary, op=NEW\nWHEEL.WHEEL_RP, 1, 1\n'))
+            fid.write(get_step(names.get_step_release(cycle_nr + 1),
+                               '*Boundary, op=NEW\nWHEEL.WHEEL_RP, 1, 1\n'))
+
+
+def get_step(name, boundary, load='', node_file=''):
+    return ('** STEP: ' + name + '\n**\n*Step, name=' + name + ', nlgeom=YES, inc=1000\n'
+            + '*Static\n1e-06, 1e-06, 1e-08, 1e-06\n** BOUNDARY CONDITIONS\n' + boundary
+            + load + '** OUTPUT REQUESTS\n*Restart, write, frequency=0\n'
+            + '*Output, field\n*Node Output\nU,\n' + node_file + '*End Step\n')
+
+
+def check_steps(inp_file, num_cycles):
+    with open(inp_file, 'r') as fid:
+        num_steps = sum([1 for line in fid if line.startswith('*Step')])
+    if num_steps != 2 + 4*num_cycles:
+        raise ValueError('Expected ' + str(2 + 4*num_cycles) + ' steps, found '
+                         + str(num_steps))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,125 @@
+""" Benchmark the sparse plus low-rank compression of the wheel user
+element stiffness with
+:py:func:`rollover.three_d.wheel.super_element.compress_stiffness`. For
+each accuracy target, in the spectral norm (S) or for the forces of
+given displacement fields (F), the rank of the far-field part, the time
+for the compression, the storage and the time for calculating the
+forces for one displacement field are compared with the dense
+stiffness. The storage is relative to the dense stiffness in packed
+format, and "dense" is reported if the compression is refused as it
+would not be smaller. The force errors are calculated with
+:py:func:`rollover.three_d.wheel.super_element.get_compressed_force_error`
+for contact-like displacement fields (patches around random nodes).
+
+The stiffness is synthetic: A grid of nodes on the wheel surface are
+coupled by springs between neighbouring nodes and a smooth, exponentially
+decaying, long-range coupling. The reference point dofs are coupled to the nodes
+by rigid body motion.
+
+Call as :command:`python benchmark_stiffness_compression.py [num_nodes1 num_nodes2 ...]`
+
+"""
+from __future__ import print_function
+import sys
+import numpy as np
+
+import benchmark_tools as bt
+from rollover.three_d.wheel import super_element
+from rollover.three_d.wheel import stiffness_io
+
+DEFAULT_SIZES = [300, 1000]
+RTOLS = [1.e-2, 1.e-3, 1.e-4]
+FORCE_RTOLS = [1.e-3, 1.e-4, 1.e-5]
+RADIUS = 460.0          # Wheel radius
+MESH_SIZE = 2.5         # Distance between nodes
+COUPLING_LENGTH = 10*MESH_SIZE  # Length scale for the long-range coupling
+NUM_CASES = 20          # Number of displacement fields to check
+
+
+def main(argv):
+    sizes = bt.get_sizes(argv, DEFAULT_SIZES)
+    bt.print_header(['ndof', 'target', 'rank', 'compress [s]', 'storage', 'dense [s]',
+                     'compr. [s]', 'max error', 'mean error'])
+    for num_nodes in sizes:
+        coords = get_surface_coords(num_nodes)
+        stiffness = get_stiffness(coords)
+        displacements = super_element.get_contact_displacements(coords, NUM_CASES,
+                                                                patch_radius=2*MESH_SIZE)
+        u = displacements[:, 0]
+        t_dense, _ = bt.time_function(repeat, np.dot, stiffness, u)
+        # Spectral norm targets (S), checked with all displacement fields, 
+        # and force targets (F) for half of the fields, checked with the 
+        # other half.
+        targets = ([('S', rtol, None, displacements) for rtol in RTOLS]
+                   + [('F', rtol, displacements[:, ::2], displacements[:, 1::2])
+                      for rtol in FORCE_RTOLS])
+        for target, rtol, target_displacements, check_displacements in targets:
+            t_compress, compressed = bt.time_function(super_element.compress_stiffness,
+                                                      stiffness, coords, rtol,
+                                                      displacements=target_displacements)
+            if compressed is None:
+                bt.print_row([stiffness.shape[0], target + ' %.0e' % rtol, 'dense',
+                              t_compress, 1.0, t_dense, t_dense, '0', '0'])
+                continue
+            t_compr, _ = bt.time_function(repeat, super_element.apply_compressed_stiffness,
+                                          compressed, u)
+            errors = super_element.get_compressed_force_error(stiffness, compressed,
+                                                              check_displacements)
+            storage = super_element.get_storage(compressed)
+            bt.print_row([stiffness.shape[0], target + ' %.0e' % rtol,
+                          compressed['eigenvalues'].size, t_compress,
+                          storage/float(stiffness_io.get_packed_size(stiffness.shape[0])),
+                          t_dense, t_compr, '%.1e' % np.max(errors), '%.1e' % np.mean(errors)])
+
+
+def repeat(function, *args):
+    # Repeat 10 times to get measurable times
+    for _ in range(10):
+        output = function(*args)
+    return output
+
+
+def get_surface_coords(num_nodes):
+    """ Get a grid of approximately `num_nodes` nodes on the wheel
+    surface, centered around the negative y-axis
+
+    """
+    num_rows = int(np.sqrt(num_nodes))
+    xcoords = MESH_SIZE*(np.arange(num_rows) - num_rows//2)
+    angles = (MESH_SIZE/RADIUS)*(np.arange(num_rows) - num_rows//2)
+    ang, x = np.meshgrid(angles, xcoords, indexing='ij')
+    ang = ang.flatten()
+    return np.transpose([x.flatten(), -RADIUS*np.cos(ang), -RADIUS*np.sin(ang)])
+
+
+def get_stiffness(coords):
+    """ Get a synthetic stiffness matrix, with the 6 reference point
+    dofs first, for the nodes at `coords`.
+
+    """
+    num_nodes = coords.shape[0]
+    diff = coords[:, np.newaxis, :] - coords[np.newaxis, :, :]
+    dist2 = np.sum(diff**2, axis=2)
+
+    # Springs between neighbours (graph laplacian) and smooth coupling
+    springs = (dist2 < (1.5*MESH_SIZE)**2).astype(float)
+    np.fill_diagonal(springs, 0.0)
+    laplacian = np.diag(np.sum(springs, axis=1)) - springs
+    node_stiffness = laplacian + 0.1*np.exp(-np.sqrt(dist2)/COUPLING_LENGTH)
+    node_stiffness = np.kron(node_stiffness, np.eye(3))
+
+    # Rigid body motion from the reference point (translation, rotation)
+    transform = np.zeros((3*num_nodes, 6 + 3*num_nodes))
+    for i in range(3):
+        transform[i::3, i] = 1.0
+    for i, (j, k) in enumerate([(1, 2), (2, 0), (0, 1)]):
+        # Rotation around axis i: u_j = -theta*x_k, u_k = theta*x_j
+        transform[j::3, 3 + i] = -coords[:, k]
+        transform[k::3, 3 + i] = coords[:, j]
+    transform[:, 6:] = np.eye(3*num_nodes)
+
+    return np.dot(transform.T, np.dot(node_stiffness, transform))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,78 @@
+""" Common tools for the benchmark scripts in this folder. The 
+benchmarks run in a regular python installation (i.e. not Abaqus 
+python) and only require numpy. 
+
+"""
+from __future__ import print_function
+import sys, os, time
+
+repo_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if not repo_path in sys.path:
+    sys.path.append(repo_path)
+
+
+def get_sizes(argv, default_sizes):
+    """ Get the problem sizes to benchmark from the input arguments
+    
+    :param argv: Input arguments, sizes are given from argv[1] and on
+    :type argv: list[ str ]
+    
+    :param default_sizes: Sizes to use if none are given in argv
+    :type default_sizes: list[ int ]
+    
+    :returns: The sizes to benchmark
+    :rtype: list[ int ]
+    
+    """
+    
+    if len(argv) > 1:
+        return [int(arg) for arg in argv[1:]]
+    else:
+        return default_sizes
+        
+
+def time_function(function, *args, **kwargs):
+    """ Run `function` with the given arguments and measure the time
+    
+    :param function: The function to time
+    :type function: function
+    
+    :returns: The time in seconds and the output from `function`
+    :rtype: tuple( float, ... )
+    
+    """
+    
+    t0 = time.time()
+    output = function(*args, **kwargs)
+    return time.time() - t0, output
+    
+    
+def print_header(columns, width=14):
+    """ Print the header of a result table
+    
+    :param columns: Column titles
+    :type columns: list[ str ]
+    
+    :param width: Width of each column
+    :type width: int
+    
+    """
+    
+    print(''.join([col.rjust(width) for col in columns]))
+    print('-'*width*len(columns))
+    
+
+def print_row(values, width=14):
+    """ Print a row in a result table. Floats are written with 3 
+    decimals, all other values are converted by str.
+    
+    :param values: Values to print
+    :type values: list
+    
+    :param width: Width of each column
+    :type width: int
+    
+    """
+    
+    print(''.join([(('%0.3f' % v) if isinstance(v, float) else str(v)).rjust(width) 
+                   for v in values]))
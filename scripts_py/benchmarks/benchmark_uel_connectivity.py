@@ -0,0 +1,77 @@
+""" Benchmark creating the connectivity of the wheel user element, as in
+:py:func:`rollover.three_d.wheel.include.get_inp_str_element_connectivity`,
+with :py:func:`rollover.utils.inp_writer.get_wrapped_int_str`, compared
+to the previous implementation (that appended one label at a time and
+split the full string to check the length of the current line). The
+strings are checked to be identical, and each line is checked to
+fulfill the Abaqus limits (at most 16 values and 80 characters). The
+node labels are random, both with up to 10 times the number of nodes
+and with up to 8 digits. The reported time is for the latter.
+
+Call as :command:`python benchmark_uel_connectivity.py [num_nodes1 num_nodes2 ...]`
+
+"""
+from __future__ import print_function
+import sys
+import numpy as np
+
+import benchmark_tools as bt
+from rollover.utils import inp_writer
+
+DEFAULT_SIZES = [1000, 10000, 50000]
+HEADER = '*Element, type=U1, ELSET=WHEEL_SUPER_ELEMENT\n'
+
+
+def main(argv):
+    sizes = bt.get_sizes(argv, DEFAULT_SIZES)
+    bt.print_header(['num nodes', 'old [s]', 'new [s]', 'speedup'])
+    for num_nodes in sizes:
+        for max_label in [10*num_nodes, 10**8 - 1]:
+            labels = np.random.randint(1, max_label, num_nodes + 2)
+            t_old, old_str = bt.time_function(get_connectivity_str_old, labels[0], labels[1],
+                                              labels[2:])
+            t_new, new_str = bt.time_function(get_connectivity_str, labels[0], labels[1],
+                                              labels[2:])
+            if old_str != new_str:
+                raise ValueError('Different strings for %u nodes' % num_nodes)
+            check_limits(new_str, labels)
+        bt.print_row([num_nodes, t_old, t_new, t_old/t_new])
+
+
+def get_connectivity_str(element_number, rp_label, contact_labels):
+    # As in get_inp_str_element_connectivity
+    labels = [element_number, rp_label] + list(contact_labels)
+    return HEADER + inp_writer.get_wrapped_int_str(labels)
+
+
+def get_connectivity_str_old(element_number, rp_label, contact_labels):
+    # The previous get_inp_str_element_connectivity
+    inp_str = HEADER
+    inp_str = inp_str + '%u, ' % element_number
+    inp_str = inp_str + '%u, ' % rp_label
+    num_per_line = 2    # Already 2 items placed
+    for label in contact_labels:
+        if num_per_line >= 16 or len(inp_str.split('\n')[-1]) > 70:
+            inp_str = inp_str + '\n'
+            num_per_line = 0
+
+        inp_str = inp_str + '%u, ' % label
+        num_per_line = num_per_line + 1
+
+    return inp_str[:-2]
+
+
+def check_limits(inp_str, labels):
+    lines = inp_str.split('\n')[1:]
+    values = [int(value) for line in lines for value in line.split(',') if len(value.strip()) > 0]
+    if not np.array_equal(values, labels):
+        raise ValueError('The labels are not written correctly')
+    for line in lines:
+        if len(line) > inp_writer.MAX_LINE_LENGTH:
+            raise ValueError('Line too long: "' + line + '"')
+        if len([value for value in line.split(',') if len(value.strip()) > 0]) > 16:
+            raise ValueError('Too many values on line: "' + line + '"')
+
+
+if __name__ == '__main__':
+    main(sys.argv)
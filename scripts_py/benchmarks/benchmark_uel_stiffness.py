@@ -0,0 +1,50 @@
+""" Benchmark the text and binary formats of the uel stiffness file,
+written by :py:func:`rollover.three_d.wheel.super_element.save_uel`.
+The file sizes and the times to write and read the files from python
+are compared for synthetic stiffness matrices of increasing size.
+
+Call as :command:`python benchmark_uel_stiffness.py [ndof1 ndof2 ...]`
+
+"""
+from __future__ import print_function
+import sys, os, tempfile
+import numpy as np
+
+import benchmark_tools as bt
+from rollover.three_d.wheel import stiffness_io
+
+DEFAULT_SIZES = [300, 1000, 3000]
+
+
+def main(argv):
+    sizes = bt.get_sizes(argv, DEFAULT_SIZES)
+    bt.print_header(['ndof', 'txt [MB]', 'bin [MB]', 'write txt [s]', 'write bin [s]',
+                     'read txt [s]', 'read bin [s]'])
+    tmp_dir = tempfile.mkdtemp()
+    txt_file = os.path.join(tmp_dir, 'uel_stiffness.txt')
+    bin_file = os.path.join(tmp_dir, 'uel_stiffness.bin')
+    try:
+        for ndof in sizes:
+            kmat = np.random.randn(ndof, ndof)
+            kmat = kmat + kmat.transpose()
+            packed = stiffness_io.get_packed_upper(kmat)
+            t_wtxt, _ = bt.time_function(stiffness_io.save_uel_stiffness_text,
+                                         txt_file, packed, ndof)
+            t_wbin, _ = bt.time_function(stiffness_io.save_uel_stiffness_binary,
+                                         bin_file, packed, ndof)
+            t_rtxt, _ = bt.time_function(stiffness_io.read_uel_stiffness, txt_file)
+            t_rbin, (packed_bin, _) = bt.time_function(stiffness_io.read_uel_stiffness,
+                                                       bin_file)
+            if not np.array_equal(packed, packed_bin):
+                raise ValueError('Binary file not read correctly for ndof = ' + str(ndof))
+            bt.print_row([ndof, os.path.getsize(txt_file)/1.e6, os.path.getsize(bin_file)/1.e6,
+                          t_wtxt, t_wbin, t_rtxt, t_rbin])
+    finally:
+        for file_name in [txt_file, bin_file]:
+            if os.path.exists(file_name):
+                os.remove(file_name)
+        os.rmdir(tmp_dir)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,70 @@
+""" Create the files for timing the node identification in the user
+subroutine with :file:`usub/test_node_id.f90` in the current
+directory, for a synthetic wheel contact mesh with `num_angles` x
+`num_x` nodes. The following files are written
+
+- :file:`rp_coord.txt`: The reference point coordinates
+- :file:`node_id_nodes.txt`: The label and coordinates of the wheel
+  and rail reference points (first two lines), followed by the number
+  of contact nodes and the label and coordinates of each contact node
+  (in random order).
+
+Call as :command:`python create_node_id_files.py [num_angles [num_x]]`
+
+The default is 100 x 40 nodes.
+
+"""
+from __future__ import print_function
+import sys
+import numpy as np
+
+from rollover.utils import naming_mod as names
+
+DEFAULT_NUM_ANGLES = 100
+DEFAULT_NUM_X = 40
+WHEEL_RADIUS = 460.0
+CONTACT_ANGLE = 0.2
+CONTACT_WIDTH = 40.0
+NUM_RAIL_NODES = 10000
+
+
+def main(argv):
+    num_angles = int(argv[1]) if len(argv) > 1 else DEFAULT_NUM_ANGLES
+    num_x = int(argv[2]) if len(argv) > 2 else DEFAULT_NUM_X
+
+    wheel_rp_coord = np.array([0.0, WHEEL_RADIUS, 0.0])
+    rail_rp_coord = np.zeros(3)
+    rel_coords = get_contact_node_coords(num_angles, num_x)
+    num_nodes = len(rel_coords)
+    # The rail nodes are labeled first, followed by the wheel nodes
+    rail_rp_label = NUM_RAIL_NODES
+    wheel_rp_label = NUM_RAIL_NODES + 1
+    contact_labels = wheel_rp_label + 1 + np.random.permutation(num_nodes)
+
+    with open(names.rp_coord_file, 'w') as fid:
+        fid.write(('%25.15e'*3 + '\n') % tuple(wheel_rp_coord))
+        fid.write(('%25.15e'*3 + '\n') % tuple(rail_rp_coord))
+
+    with open('node_id_nodes.txt', 'w') as fid:
+        fid.write(('%10u' + '%25.15e'*3 + '\n') % ((wheel_rp_label, ) + tuple(wheel_rp_coord)))
+        fid.write(('%10u' + '%25.15e'*3 + '\n') % ((rail_rp_label, ) + tuple(rail_rp_coord)))
+        fid.write('%10u\n' % num_nodes)
+        np.savetxt(fid, np.column_stack((contact_labels, rel_coords + wheel_rp_coord)),
+                   fmt='%10u' + '%25.15e'*3)
+
+    print('%u contact nodes written' % num_nodes)
+
+
+def get_contact_node_coords(num_angles, num_x):
+    # Coordinates relative to the wheel center for a grid in the
+    # angular and x directions, around the bottom of the wheel.
+    angles, xcoords = np.meshgrid(np.linspace(-CONTACT_ANGLE/2, CONTACT_ANGLE/2, num_angles),
+                                  np.linspace(-CONTACT_WIDTH/2, CONTACT_WIDTH/2, num_x),
+                                  indexing='ij')
+    angles = angles.reshape(-1)
+    return np.column_stack((xcoords.reshape(-1), -WHEEL_RADIUS*np.cos(angles),
+                            -WHEEL_RADIUS*np.sin(angles)))
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,55 @@
+""" Create uel stiffness files with a synthetic symmetric stiffness
+matrix in the current directory, for timing the loading in the user
+subroutine with :file:`usub/test_uel_stiffness_load.f90`. The mapped
+file (:file:`uel_stiffness.map`, pre-scaled) and the binary file
+(:file:`uel_stiffness.bin`) are always written. The text file
+(:file:`uel_stiffness.txt`) is only written if ndof is at most
+`MAX_NDOF_TEXT`, as it becomes very large.
+
+Call as :command:`python create_uel_stiffness_files.py [ndof [scale_factor]]`
+
+The default is 20000 dofs and scale factor 210e3.
+
+"""
+from __future__ import print_function
+import sys, os
+import numpy as np
+
+import benchmark_tools as bt
+from rollover.utils import naming_mod as names
+from rollover.three_d.wheel import stiffness_io
+
+DEFAULT_NDOF = 20000
+DEFAULT_SCALE_FACTOR = 210.e3
+MAX_NDOF_TEXT = 5000
+
+
+def main(argv):
+    ndof = int(argv[1]) if len(argv) > 1 else DEFAULT_NDOF
+    scale_factor = float(argv[2]) if len(argv) > 2 else DEFAULT_SCALE_FACTOR
+    packed = np.random.rand(stiffness_io.get_packed_size(ndof))
+
+    files = [(names.uel_stiffness_mapped_file, stiffness_io.save_uel_stiffness_mapped,
+              (packed, ndof, scale_factor)),
+             (names.uel_stiffness_binary_file, stiffness_io.save_uel_stiffness_binary,
+              (packed, ndof))]
+    if ndof <= MAX_NDOF_TEXT:
+        files.append((names.uel_stiffness_file, stiffness_io.save_uel_stiffness_text,
+                      (packed, ndof)))
+    elif os.path.exists(names.uel_stiffness_file):
+        os.remove(names.uel_stiffness_file)
+
+    bt.print_header(['file', 'size [MB]', 'write [s]'])
+    for file_name, save_function, args in files:
+        t_write, _ = bt.time_function(save_function, file_name, *args)
+        bt.print_row([file_name, os.path.getsize(file_name)/1.e6, t_write])
+
+    # Expected checksum (sum of all scaled values) in the fortran test
+    diag_starts = stiffness_io.get_packed_size(ndof) - stiffness_io.get_packed_size(
+        ndof - np.arange(ndof))
+    checksum = scale_factor*(2*np.sum(packed) - np.sum(packed[diag_starts]))
+    print('ndof = ' + str(ndof) + ', expected checksum = ' + '%25.15e' % checksum)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
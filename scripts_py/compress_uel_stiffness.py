@@ -0,0 +1,76 @@
+""" The script :file:`compress_uel_stiffness.py` approximates the
+stiffness of a wheel user element by a sparse plus low-rank form, see
+:py:func:`rollover.three_d.wheel.super_element.compress_stiffness`,
+and saves it to :file:`uel_stiffness_compressed.npz` in the wheel
+folder. The rank of the low-rank part is chosen such that the error is
+below the relative tolerance `rtol` in the spectral norm.
+
+Call as
+:command:`python compress_uel_stiffness.py <wheel_folder> [<rtol> [<near_distance>]]`
+
+The default `rtol` is 1e-3, and the default `near_distance` is three
+times the typical node spacing. Nothing is saved if the compressed
+stiffness would not be smaller than the dense matrix (packed upper
+triangle). Otherwise, the rank, the storage relative to the dense
+matrix and the relative force errors for contact-like
+displacement fields (see
+:py:func:`rollover.three_d.wheel.super_element.get_contact_displacements`)
+are printed, allowing the accuracy to be traded for the cost of
+calculating the element forces.
+
+"""
+from __future__ import print_function
+import sys, os
+
+repo_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if not repo_path in sys.path:
+    sys.path.append(repo_path)
+
+import numpy as np
+
+from rollover.utils import naming_mod as names
+from rollover.three_d.wheel import stiffness_io
+from rollover.three_d.wheel import super_element
+
+NUM_CHECK_CASES = 50    # Number of displacement fields for checking force errors
+
+
+def main(argv):
+    if len(argv) < 2:
+        print('Usage: python compress_uel_stiffness.py <wheel_folder> [<rtol> [<near_distance>]]')
+        return
+
+    folder = argv[1]
+    rtol = float(argv[2]) if len(argv) > 2 else 1.e-3
+    near_distance = float(argv[3]) if len(argv) > 3 else None
+
+    stiffness_file = os.path.join(folder, names.uel_stiffness_binary_file)
+    if not os.path.exists(stiffness_file):
+        stiffness_file = os.path.join(folder, names.uel_stiffness_file)
+    packed, ndof = stiffness_io.read_uel_stiffness(stiffness_file)
+    stiffness = stiffness_io.unpack_symmetric(packed, ndof, upper=True)
+    coords = np.load(os.path.join(folder, names.uel_coordinates_file))
+
+    compressed = super_element.compress_stiffness(stiffness, coords, rtol, near_distance)
+    if compressed is None:
+        print('The compressed stiffness would not be smaller than the dense stiffness, '
+              + 'nothing saved')
+        return
+    displacements = super_element.get_contact_displacements(coords, NUM_CHECK_CASES,
+                                                            compressed['near_distance'])
+    errors = super_element.get_compressed_force_error(stiffness, compressed, displacements)
+
+    storage = super_element.get_storage(compressed)
+    print('ndof = ' + str(ndof) + ', near distance = ' + '%0.3g' % compressed['near_distance'])
+    print('rank = ' + str(compressed['eigenvalues'].size)
+          + ', storage relative to dense = ' + '%0.3f' % (storage/float(packed.size)))
+    print('relative force errors: max = ' + '%0.2e' % np.max(errors)
+          + ', mean = ' + '%0.2e' % np.mean(errors))
+
+    output_file = os.path.join(folder, names.uel_stiffness_compressed_file)
+    super_element.save_compressed_stiffness(output_file, compressed)
+    print('Saved to ' + output_file)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
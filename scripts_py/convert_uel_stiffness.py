@@ -0,0 +1,61 @@
+""" The script :file:`convert_uel_stiffness.py` converts the stiffness
+file of a wheel user element between the text format
+(:file:`uel_stiffness.txt`) and the binary format
+(:file:`uel_stiffness.bin`). The format of the input file is detected
+automatically, and the file is converted to the other format.
+
+Call as
+:command:`python convert_uel_stiffness.py <input_file> [<output_file>]`
+
+If the output file is not given, it is written to the folder of the
+input file with the default name for the other format. When converting
+to binary, the data is verified by reading the written file.
+
+When a binary stiffness file is present in the simulation folder, the
+user subroutine reads it instead of the text file. Hence, converting
+an existing wheel folder is sufficient to get the faster startup.
+
+"""
+from __future__ import print_function
+import sys, os
+
+repo_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if not repo_path in sys.path:
+    sys.path.append(repo_path)
+
+import numpy as np
+
+from rollover.utils import naming_mod as names
+from rollover.three_d.wheel import stiffness_io
+
+
+def main(argv):
+    if len(argv) < 2:
+        print('Usage: python convert_uel_stiffness.py <input_file> [<output_file>]')
+        return
+
+    input_file = argv[1]
+    to_binary = not stiffness_io.is_uel_stiffness_binary(input_file)
+    if len(argv) > 2:
+        output_file = argv[2]
+    else:
+        output_name = names.uel_stiffness_binary_file if to_binary else names.uel_stiffness_file
+        output_file = os.path.join(os.path.dirname(input_file), output_name)
+
+    if os.path.abspath(input_file) == os.path.abspath(output_file):
+        raise ValueError('The output file cannot be the same as the input file')
+
+    packed, ndof = stiffness_io.read_uel_stiffness(input_file)
+    if to_binary:
+        stiffness_io.save_uel_stiffness_binary(output_file, packed, ndof)
+        packed_check, ndof_check = stiffness_io.read_uel_stiffness_binary(output_file)
+        if ndof_check != ndof or not np.array_equal(packed, packed_check):
+            raise ValueError('Verification of ' + output_file + ' failed')
+    else:
+        stiffness_io.save_uel_stiffness_text(output_file, packed, ndof)
+
+    print('Converted ' + input_file + ' to ' + output_file + ' (ndof = ' + str(ndof) + ')')
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,54 @@
+""" The script :file:`extract_cycle_results.py` extracts the wheel and
+rail reference point displacements and the wheel contact node
+displacements after each rolling step from the result (`.fil`) files,
+see :py:mod:`rollover.three_d.utils.cycle_results`. The results are
+saved in the folder :file:`cycle_results`, and cycles already
+extracted are skipped. It can therefore be called during the
+simulation to update the results. The last rolling step in each file
+is only extracted when a later step has been written or the job has
+completed (according to its :file:`.sta` file).
+
+Call as
+:command:`python extract_cycle_results.py [<fil_file1> [<fil_file2> ...]]`
+
+If no `.fil` files are given, :file:`rollover.fil` is used if it
+exists, otherwise the chunk jobs from
+:file:`run_rollover_chunks.py` (:file:`rollover_chunk_0001.fil` etc.).
+
+The results can then be read as
+
+.. code-block:: python
+
+    from rollover.three_d.utils import cycle_results
+    cycles, wheel_rp_u = cycle_results.read('cycle_results', 'wheel_rp_u')
+
+"""
+from __future__ import print_function
+import sys, os, glob
+
+repo_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if not repo_path in sys.path:
+    sys.path.append(repo_path)
+
+from rollover.utils import naming_mod as names
+from rollover.three_d.utils import cycle_results
+
+
+def main(argv):
+    if len(argv) > 1:
+        fil_files = argv[1:]
+    elif os.path.exists(names.job + '.fil'):
+        fil_files = [names.job + '.fil']
+    else:
+        fil_files = sorted(glob.glob(names.job + '_chunk_*.fil'))
+
+    if len(fil_files) == 0:
+        print('No .fil files found')
+        return
+
+    num_cycles = cycle_results.extract(fil_files)
+    print(str(num_cycles) + ' cycles extracted to ' + names.cycle_results_dir)
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -0,0 +1,62 @@
+""" The script :file:`run_rollover_chunks.py` runs a rollover simulation
+as a sequence of Abaqus jobs with a given number of cycles each, using
+Abaqus restart, see :py:mod:`rollover.three_d.utils.restart_chunks`.
+It should be called in the simulation folder, containing the input
+file and the files listed in :ref:`runsim`, as well as the rollover
+settings file (:file:`rollover_settings.json`) from which the loading
+settings are taken.
+
+Call as
+:command:`python run_rollover_chunks.py <chunk_cycles> [<input_file> [<options>]]`
+
+`input_file` defaults to :file:`rollover.inp`. The following options can be given:
+
+- `--user=<usub>`: The user subroutine object file. If not given, it
+  should be specified in the abaqus environment file.
+- `--cpus=<num_cpus>`: Number of cpus
+- `--stand-in[=<cycle>]`: Use a stand-in for Abaqus to check the
+  chunking without running any simulation. If `<cycle>` is given, the
+  stand-in fails in that cycle.
+
+If the script is stopped or a job fails, calling it again with the
+same arguments continues from the last completed chunk. The chunk jobs
+are named :file:`rollover_chunk_0001` etc.
+
+"""
+from __future__ import print_function
+import sys, os
+
+repo_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if not repo_path in sys.path:
+    sys.path.append(repo_path)
+
+from rollover.utils import json_io
+from rollover.utils import naming_mod as names
+from rollover.three_d.utils import restart_chunks
+
+
+def main(argv):
+    args = [arg for arg in argv[1:] if not arg.startswith('--')]
+    options = dict([(arg[2:] + '=').split('=')[:2] for arg in argv[1:] if arg.startswith('--')])
+    if len(args) < 1:
+        print('Usage: python run_rollover_chunks.py <chunk_cycles> [<input_file> [<options>]]')
+        return
+
+    chunk_cycles = int(args[0])
+    inp_file = args[1] if len(args) > 1 else names.job + '.inp'
+    loading_param = json_io.read(names.rollover_settings_file)['loading']
+
+    if 'stand-in' in options:
+        fail_at_cycle = int(options['stand-in']) if options['stand-in'] != '' else None
+        solver = lambda job, oldjob: restart_chunks.run_stand_in(job, oldjob, fail_at_cycle)
+    else:
+        user = options.get('user', None)
+        cpus = int(options.get('cpus', 1))
+        solver = lambda job, oldjob: restart_chunks.run_abaqus(job, oldjob, user=user, cpus=cpus)
+
+    if restart_chunks.run_chunks(inp_file, chunk_cycles, loading_param, solver):
+        print('All ' + str(loading_param['num_cycles']) + ' cycles completed')
+
+
+if __name__ == '__main__':
+    main(sys.argv)
@@ -2,7 +2,11 @@ module filenames_mod
 implicit none
 	
     character(len=20), parameter :: load_param_file_name = 'load_param.txt'
+    character(len=20), parameter :: load_param_bin_file_name = 'load_param.bin'
+    character(len=20), parameter :: load_state_file_name = 'load_state.txt'
     character(len=20), parameter :: uel_stiffness_file_name = 'uel_stiffness.txt'
+    character(len=20), parameter :: uel_stiffness_bin_file_name = 'uel_stiffness.bin'
+    character(len=20), parameter :: uel_stiffness_map_file_name = 'uel_stiffness.map'
 	character(len=20), parameter :: rp_node_coords_file_name = 'rp_coord.txt'
     
 
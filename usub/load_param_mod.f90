@@ -13,6 +13,10 @@ implicit none
     public  :: update_cycle             ! Update the loading parameters, done each cycle
     public  :: get_rolling_par          ! 
     
+    ! Restart routines
+    public  :: save_load_state          ! Save the dynamic load parameters after a rolling step
+    public  :: read_load_state          ! Restore the dynamic load parameters when restarting
+    
     ! Wheel reference point motion
     public  :: set_rp_bc
     public  :: get_rp_initial_depression_bc
@@ -34,6 +38,8 @@ implicit none
     double precision, allocatable, save :: rolling_times(:)
     double precision, allocatable, save :: rot_per_lengths(:)
     double precision, allocatable, save :: rail_extensions(:)
+    logical, save                       :: is_cycle_table = .false. ! Parameters given for each 
+                                                                    ! cycle (binary file)
     
     ! Dynamic load parameters (may be updated each cycle)
     integer, save                       :: cycle_spec_ind = 1   ! Current position in update_cycle
@@ -59,6 +65,25 @@ implicit none
     end function is_load_param_read
     
     subroutine read_load_params()
+    use filenames_mod, only: load_param_bin_file_name
+    use usub_utils_mod, only: get_full_path
+    implicit none
+        logical             :: binary_exists    ! Is the binary loading file available?
+        
+        ! Use the binary format if available, see read_load_params_binary
+        inquire(file=trim(get_full_path(load_param_bin_file_name)), exist=binary_exists)
+        if (binary_exists) then
+            call read_load_params_binary()
+        else
+            call read_load_params_text()
+        endif
+        
+        call update_cycle(0)
+        call setup_initial_rolling_cycle()
+        
+    end subroutine
+    
+    subroutine read_load_params_text()
     use filenames_mod, only: load_param_file_name
     use usub_utils_mod, only: get_fid, check_iostat
     implicit none
@@ -90,8 +115,54 @@ implicit none
         update_cycles(num_cycles_specified+1) = huge(update_cycles(1))
         
         close(file_id)
-        call update_cycle(0)
-        call setup_initial_rolling_cycle()
+        
+    end subroutine
+    
+    ! Read the loading parameters for each cycle from the binary file written by 
+    ! rollover.three_d.utils.load_param.LoadSchedule.write_binary_loading_file
+    ! The header (40 bytes, little endian) contains
+    ! magic (8 char), version, header size, number of cycles, reserved, 
+    ! rail length, initial depression speed
+    ! followed by the rolling times, rotations per length and rail extensions for each cycle. 
+    ! The parameters for cycle_nr are then at index cycle_nr, and the last values are used for 
+    ! cycles after the table. 
+    subroutine read_load_params_binary()
+    use filenames_mod, only: load_param_bin_file_name
+    use usub_utils_mod, only: get_full_path, check_iostat
+    implicit none
+        integer, parameter  :: supported_version = 1
+        integer             :: file_id
+        integer             :: io_status
+        character(len=8)    :: magic            ! Identifier of file format
+        integer             :: header(4)        ! version, header size, number of cycles, reserved
+        integer             :: num_cycles       ! Number of cycles in the table
+        integer             :: k1
+        
+        open(newunit=file_id, file=trim(get_full_path(load_param_bin_file_name)), &
+             access='stream', form='unformatted', action='read', iostat=io_status)
+        call check_iostat(io_status, 'Error opening "'//trim(load_param_bin_file_name)//'"')
+        
+        read(file_id, iostat=io_status) magic, header, rail_length, initial_depression_speed
+        call check_iostat(io_status, 'Error reading header of "'//trim(load_param_bin_file_name)//'"')
+        if (magic /= 'LOADPARM') then
+            write(*,*) '"'//trim(load_param_bin_file_name)//'" is not a loading parameter file'
+            call xit()
+        elseif (header(1) > supported_version) then
+            write(*,"(A,I0)") 'Unsupported loading parameter file version: ', header(1)
+            call xit()
+        endif
+        
+        num_cycles = header(3)
+        allocate(update_cycles(num_cycles+1))
+        allocate(rolling_times(num_cycles), rot_per_lengths(num_cycles), rail_extensions(num_cycles))
+        
+        read(file_id, pos=header(2)+1, iostat=io_status) rolling_times, rot_per_lengths, rail_extensions
+        call check_iostat(io_status, 'Error reading "'//trim(load_param_bin_file_name)//'"')
+        close(file_id)
+        
+        update_cycles(1:num_cycles) = [(k1, k1=1,num_cycles)]
+        update_cycles(num_cycles+1) = huge(update_cycles(1))
+        is_cycle_table = .true.
         
     end subroutine
     
@@ -117,6 +188,12 @@ implicit none
             rolling_time = rolling_times(1)
             rot_per_length = rot_per_lengths(1)
             rail_extension = rail_extensions(1)
+        elseif (is_cycle_table) then
+            ! Direct lookup, the table contains each cycle
+            cycle_spec_ind = min(cycle_nr, size(rolling_times))
+            rolling_time = rolling_times(cycle_spec_ind)
+            rot_per_length = rot_per_lengths(cycle_spec_ind)
+            rail_extension = rail_extensions(cycle_spec_ind)
         elseif (cycle_nr >= update_cycles(cycle_spec_ind+1)) then
             ! Subsequent loading with new specification
             cycle_spec_ind = cycle_spec_ind + 1
@@ -148,6 +225,59 @@ implicit none
         
     end subroutine
     
+    ! Restart routines
+    subroutine save_load_state(cycle_nr)
+    ! Save the dynamic load parameters, except the contact node bcs that are only used within the 
+    ! current cycle. Called after the bcs for the next cycle have been set at the end of the 
+    ! rolling step in cycle cycle_nr, such that an analysis restarted after the current cycle can
+    ! continue with the same parameters, see read_load_state.
+    use filenames_mod, only: load_state_file_name
+    use usub_utils_mod, only: get_fid
+    implicit none
+        integer, intent(in)     :: cycle_nr
+        integer                 :: file_id
+        
+        file_id = get_fid(load_state_file_name, 'write')
+        write(file_id, "(I0)") cycle_nr, cycle_spec_ind, updated_cycle
+        write(file_id, "(ES25.16E3)") rolling_time, rot_per_length, rail_extension_last, &
+                                      rail_extension, u_rp_bc_end_last, u_rp_bc_start, u_rp_bc_end
+        close(file_id)
+        
+    end subroutine
+    
+    subroutine read_load_state(cycle_nr)
+    ! Restore the dynamic load parameters saved by save_load_state at the end of the rolling step
+    ! in cycle cycle_nr-1, when an analysis is restarted at the start of cycle cycle_nr. 
+    use filenames_mod, only: load_state_file_name
+    use usub_utils_mod, only: get_fid, check_iostat
+    implicit none
+        integer, intent(in)     :: cycle_nr
+        integer                 :: file_id
+        integer                 :: saved_cycle_nr
+        integer                 :: io_status
+        character(len=256)      :: error_message
+        
+        file_id = get_fid(load_state_file_name)
+        read(file_id, *, iostat=io_status) saved_cycle_nr, cycle_spec_ind, updated_cycle
+        call check_iostat(io_status, 'Could not read "'//load_state_file_name//'"')
+        read(file_id, *, iostat=io_status) rolling_time, rot_per_length, rail_extension_last, &
+                                           rail_extension, u_rp_bc_end_last, u_rp_bc_start, &
+                                           u_rp_bc_end
+        call check_iostat(io_status, 'Could not read "'//load_state_file_name//'"')
+        close(file_id)
+        
+        if (saved_cycle_nr /= cycle_nr - 1) then
+            write(error_message, "(A,I0,A,I0)") 'Restarting at cycle ', cycle_nr, &
+                                                ', but the load state is saved for cycle ', &
+                                                saved_cycle_nr
+            call check_iostat(1, error_message)
+        endif
+        
+        ! The steps after the rolling step in the saved cycle update the cycle
+        if (.not.is_updated(saved_cycle_nr)) call update_cycle(saved_cycle_nr)
+        
+    end subroutine
+    
     ! Wheel reference point motion
     subroutine set_rp_bc(bc_end_last, bc_start, bc_end)
     implicit none
@@ -59,6 +59,10 @@ implicit none
     integer, save                       :: element_order=0
     double precision, save              :: angle_incr=0
     
+    ! Mesh inds indexed by node label (-1 if not a wheel contact node). Built when the mesh 
+    ! info is setup, such that get_inds is O(1)
+    integer, allocatable, save          :: lookup_mesh_inds(:,:)    ! size=(2, max_label)
+    
     
     contains
     
@@ -178,9 +182,28 @@ implicit none
         ! Allocate here as we have na and nx defined
         allocate(wheel_contact_node_dofs(3, na, nx))
         call get_wheel_contact_node_dofs()
+        call set_lookup_contact_nodes()
         
     end subroutine setup_mesh_info
     
+    ! Build the lookup table with the mesh inds for each label in wheel_contact_node_labels
+    subroutine set_lookup_contact_nodes()
+    implicit none
+        integer                         :: ka, kx
+        integer                         :: node_label
+        
+        allocate(lookup_mesh_inds(2, max(maxval(wheel_contact_node_labels), 0)))
+        lookup_mesh_inds = -1
+        do kx=1,size(wheel_contact_node_labels, 2)
+            do ka=1,size(wheel_contact_node_labels, 1)
+                node_label = wheel_contact_node_labels(ka, kx)
+                if (node_label < 1) cycle
+                lookup_mesh_inds(:, node_label) = [ka, kx]
+            enddo
+        enddo
+        
+    end subroutine set_lookup_contact_nodes
+    
     subroutine get_wheel_contact_node_dofs()
     use find_mod, only: find
     implicit none
@@ -225,7 +248,15 @@ implicit none
         integer, intent(in)     :: node_label
         integer                 :: mesh_inds(2)
         
-        mesh_inds = find(wheel_contact_node_labels, node_label)
+        ! All contact nodes are in the lookup table when the mesh info is setup
+        if (allocated(lookup_mesh_inds)) then
+            mesh_inds = -1
+            if (node_label > 0 .and. node_label <= size(lookup_mesh_inds, 2)) then
+                mesh_inds = lookup_mesh_inds(:, node_label)
+            endif
+        else
+            mesh_inds = find(wheel_contact_node_labels, node_label)
+        endif
         
     end function
     
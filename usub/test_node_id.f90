@@ -0,0 +1,115 @@
+! Abaqus utility modules
+include 'abaqus_utils_mod.f90'          ! Do not include when running Abaqus
+!include 'abaqus_utils_dummy_mod.f90'    ! Include when running Abaqus
+! Wheel stiffness mapping module
+include 'uel_stiffness_map_dummy_mod.f90'
+include 'includes.f90'
+
+! Time identifying the node type and mesh inds with node_id_mod, as done by DISP for each call,
+! for the files in the current directory created by
+! scripts_py/benchmarks/create_node_id_files.py (rp_coord.txt and node_id_nodes.txt).
+! The number of calls is given as the first argument (default 1000000). For comparison, the
+! time for searching the label matrix (as get_inds without lookup table) is also reported.
+program test_node_id
+use node_id_mod
+use find_mod, only : find
+use usub_utils_mod, only : get_fid
+implicit none
+    character(len=32)               :: arg
+    integer                         :: num_calls
+    integer                         :: file_id
+    integer                         :: rp_labels(2), num_nodes
+    double precision                :: rp_coords(3, 2)
+    integer, allocatable            :: node_labels(:), label_matrix(:,:)
+    double precision, allocatable   :: node_coords(:,:), uel_coords(:,:)
+    integer                         :: mesh_size(2), mesh_inds(2)
+    integer                         :: node_type, num_errors, checksum
+    integer                         :: k, ka, kx
+    double precision                :: t_call
+
+    num_calls = 1000000
+    if (command_argument_count() > 0) then
+        call get_command_argument(1, arg)
+        read(arg, *) num_calls
+    endif
+
+    ! Read the nodes: wheel and rail rp, followed by the contact nodes
+    file_id = get_fid('node_id_nodes.txt')
+    read(file_id, *) rp_labels(1), rp_coords(:, 1)
+    read(file_id, *) rp_labels(2), rp_coords(:, 2)
+    read(file_id, *) num_nodes
+    allocate(node_labels(num_nodes), node_coords(3, num_nodes))
+    do k=1,num_nodes
+        read(file_id, *) node_labels(k), node_coords(:, k)
+    enddo
+    close(file_id)
+
+    ! Setup as during the simulation: uel, disp for reference points, and urdfil
+    allocate(uel_coords(3, num_nodes + 1))
+    uel_coords(:, 1) = rp_coords(:, 1)
+    uel_coords(:, 2:) = node_coords
+    call set_uel_coords(uel_coords)
+    call get_node_type(rp_labels(1), rp_coords(:, 1), node_type)
+    call get_node_type(rp_labels(2), rp_coords(:, 2), node_type)
+    call setup_mesh_info(node_labels, node_coords)
+
+    mesh_size = get_mesh_size()
+    allocate(label_matrix(mesh_size(1), mesh_size(2)))
+    do kx=1,mesh_size(2)
+        do ka=1,mesh_size(1)
+            label_matrix(ka, kx) = get_label([ka, kx])
+        enddo
+    enddo
+
+    ! Check the mesh inds against searching the label matrix
+    num_errors = 0
+    do k=1,num_nodes
+        if (any(get_inds(node_labels(k)) /= find(label_matrix, node_labels(k)))) then
+            num_errors = num_errors + 1
+        endif
+    enddo
+    write(*,"(A,I0,A,I0,A,I0)") 'mesh size: ', mesh_size(1), ' x ', mesh_size(2), &
+                                ', mesh inds errors: ', num_errors
+
+    write(*,"(A20,A12,A12,A12)") 'function', 'calls', 'time [s]', 'checksum'
+
+    checksum = 0
+    t_call = get_time()
+    do k=1,num_calls
+        call get_node_type(node_labels(mod(k, num_nodes) + 1), node_coords(:, 1), node_type)
+        checksum = checksum + node_type
+    enddo
+    t_call = get_time() - t_call
+    write(*,"(A20,I12,F12.3,I12)") 'get_node_type', num_calls, t_call, checksum
+
+    checksum = 0
+    t_call = get_time()
+    do k=1,num_calls
+        mesh_inds = get_inds(node_labels(mod(k, num_nodes) + 1))
+        checksum = checksum + mesh_inds(1)
+    enddo
+    t_call = get_time() - t_call
+    write(*,"(A20,I12,F12.3,I12)") 'get_inds', num_calls, t_call, checksum
+
+    checksum = 0
+    t_call = get_time()
+    do k=1,num_calls
+        mesh_inds = find(label_matrix, node_labels(mod(k, num_nodes) + 1))
+        checksum = checksum + mesh_inds(1)
+    enddo
+    t_call = get_time() - t_call
+    write(*,"(A20,I12,F12.3,I12)") 'find (label matrix)', num_calls, t_call, checksum
+
+    contains
+
+    function get_time() result(seconds)
+    implicit none
+        double precision    :: seconds
+        integer(kind=8)     :: count, count_rate
+
+        call system_clock(count, count_rate)
+        seconds = dble(count)/dble(count_rate)
+
+    end function get_time
+
+end program test_node_id
@@ -0,0 +1,69 @@
+! Abaqus utility modules
+include 'abaqus_utils_mod.f90'          ! Do not include when running Abaqus
+!include 'abaqus_utils_dummy_mod.f90'    ! Include when running Abaqus
+! Wheel stiffness mapping module
+include 'uel_stiffness_map_mod.f90'     ! Replace by dummy version to test reading the mapped file
+include 'includes.f90'
+
+! Time loading the wheel stiffness in the formats available in the current directory
+! (uel_stiffness.map, uel_stiffness.bin, uel_stiffness.txt), e.g. created by
+! scripts_py/benchmarks/create_uel_stiffness_files.py. The scale factor is given as the first
+! argument (default 1.0), and must match the scale factor of the mapped file. 
+! As mapping is lazy, the time for the first pass over the matrix is also reported. 
+program test_uel_stiffness_load
+use filenames_mod
+use usub_utils_mod, only : get_full_path
+use uel_stiff_mod
+implicit none
+    character(len=20)   :: file_names(3)
+    character(len=32)   :: arg
+    double precision    :: scale_factor
+    double precision    :: t_load, t_pass, checksum
+    integer             :: k
+    logical             :: file_exists, loaded
+    
+    file_names = [uel_stiffness_map_file_name, uel_stiffness_bin_file_name, uel_stiffness_file_name]
+    
+    scale_factor = 1.d0
+    if (command_argument_count() > 0) then
+        call get_command_argument(1, arg)
+        read(arg, *) scale_factor
+    endif
+    
+    write(*,"(A20,A10,A12,A12,A25)") 'file', 'ndof', 'load [s]', 'pass [s]', 'checksum'
+    do k=1,size(file_names)
+        inquire(file=trim(get_full_path(file_names(k))), exist=file_exists)
+        if (.not.file_exists) cycle
+        
+        t_load = get_time()
+        if (k == 1) then
+            call map_uel_stiffness(scale_factor, loaded)
+            if (.not.loaded) cycle
+        elseif (k == 2) then
+            call read_uel_stiffness_binary(scale_factor)
+        else
+            call read_uel_stiffness_text(scale_factor)
+        endif
+        t_load = get_time() - t_load
+        
+        t_pass = get_time()
+        checksum = sum(uel_stiffness)
+        t_pass = get_time() - t_pass
+        
+        write(*,"(A20,I10,F12.3,F12.3,ES25.15)") file_names(k), get_ndof(), t_load, t_pass, checksum
+        call deallocate_uel_stiffness()
+    enddo
+    
+    contains
+    
+    function get_time() result(seconds)
+    implicit none
+        double precision    :: seconds
+        integer(kind=8)     :: count, count_rate
+        
+        call system_clock(count, count_rate)
+        seconds = dble(count)/dble(count_rate)
+        
+    end function get_time
+    
+end program test_uel_stiffness_load
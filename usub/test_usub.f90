@@ -1,6 +1,7 @@
 ! Abaqus utility modules
 include 'abaqus_utils_mod.f90'          ! Do not include when running Abaqus
 !include 'abaqus_utils_dummy_mod.f90'    ! Include when running Abaqus
+include 'uel_stiffness_map_dummy_mod.f90'
 include 'includes.f90'
 
 program test_usub
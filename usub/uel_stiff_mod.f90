@@ -1,7 +1,9 @@
 module uel_stiff_mod
 implicit none
     
-    double precision, allocatable, save :: uel_stiffness(:,:)
+    ! Pointer to allow memory mapping of the stiffness file, see map_uel_stiffness
+    double precision, pointer, contiguous, save :: uel_stiffness(:,:) => null()
+    logical, save                       :: uel_stiffness_is_mapped = .false.
     double precision, save              :: first_call_time
     
     contains
@@ -34,6 +36,32 @@ end subroutine
     
     
 subroutine allocate_uel_stiffness(scale_factor)
+use filenames_mod, only : uel_stiffness_bin_file_name, uel_stiffness_map_file_name
+use usub_utils_mod, only : get_full_path
+implicit none
+    double precision, intent(in):: scale_factor 
+    logical                     :: binary_exists    ! Is the binary stiffness file available?
+    logical                     :: mapped_exists    ! Is the mapped stiffness file available?
+    logical                     :: loaded           ! Was the mapped stiffness file loaded?
+    
+    ! Use the pre-scaled mapped format if available, no parsing or scaling required
+    inquire(file=trim(get_full_path(uel_stiffness_map_file_name)), exist=mapped_exists)
+    if (mapped_exists) then
+        call map_uel_stiffness(scale_factor, loaded)
+        if (loaded) return
+    endif
+    
+    ! Read the binary format if available, much faster than the text format
+    inquire(file=trim(get_full_path(uel_stiffness_bin_file_name)), exist=binary_exists)
+    if (binary_exists) then
+        call read_uel_stiffness_binary(scale_factor)
+    else
+        call read_uel_stiffness_text(scale_factor)
+    endif
+    
+end subroutine allocate_uel_stiffness
+
+subroutine read_uel_stiffness_text(scale_factor)
 use filenames_mod, only : uel_stiffness_file_name
 use usub_utils_mod, only : get_fid
 implicit none
@@ -43,7 +71,7 @@ implicit none
     integer                     :: i, j             ! Iterators
     double precision            :: tmp
    !integer                     :: check_i, check_j
-
+    
     file_id = get_fid(uel_stiffness_file_name)
     
     ! The number of dofs is written on the first line as a single integer
@@ -69,7 +97,132 @@ implicit none
     
     close(file_id)
     
-end subroutine allocate_uel_stiffness
+end subroutine read_uel_stiffness_text
+
+! Read the stiffness from the binary file written by 
+! rollover.three_d.wheel.stiffness_io.save_uel_stiffness_binary. 
+! The header (32 bytes, little endian) contains
+! magic (8 char), version, header size, bytes per value, ndof, checksum, reserved
+! followed by the packed upper triangle row by row. 
+! The checksum is only verified when reading from python. 
+subroutine read_uel_stiffness_binary(scale_factor)
+use filenames_mod, only : uel_stiffness_bin_file_name
+use usub_utils_mod, only : get_full_path, check_iostat
+use abaqus_utils_mod
+implicit none
+    double precision, intent(in):: scale_factor 
+    integer, parameter          :: supported_version = 1
+    integer                     :: file_id          ! File identifier
+    integer                     :: io_status        ! Check file operations
+    character(len=8)            :: magic            ! Identifier of file format
+    integer                     :: header(6)        ! version, header size, bytes per value, 
+                                                    ! ndof, checksum, reserved
+    integer                     :: ndof             ! Number of dofs (read from header)
+    integer                     :: i                ! Iterator
+    double precision, allocatable :: row_dp(:)      ! Row in upper triangle (8 bytes per value)
+    real, allocatable           :: row_sp(:)        ! Row in upper triangle (4 bytes per value)
+    
+    open(newunit=file_id, file=trim(get_full_path(uel_stiffness_bin_file_name)), &
+         access='stream', form='unformatted', action='read', iostat=io_status)
+    call check_iostat(io_status, 'Error opening "'//trim(uel_stiffness_bin_file_name)//'"')
+    
+    read(file_id, iostat=io_status) magic, header
+    call check_iostat(io_status, 'Error reading header of "'//trim(uel_stiffness_bin_file_name)//'"')
+    if (magic /= 'UELSTIFF') then
+        write(*,*) '"'//trim(uel_stiffness_bin_file_name)//'" is not a uel stiffness file'
+        call xit()
+    elseif (header(1) > supported_version) then
+        write(*,"(A,I0)") 'Unsupported uel stiffness file version: ', header(1)
+        call xit()
+    elseif (header(3) /= 8 .and. header(3) /= 4) then
+        write(*,"(A,I0)") 'Unsupported uel stiffness value size: ', header(3)
+        call xit()
+    endif
+    
+    ndof = header(4)
+    allocate(uel_stiffness(ndof, ndof), row_dp(ndof))
+    if (header(3) == 4) allocate(row_sp(ndof))
+    
+    ! Data start after the header, read one row of the upper triangle at a time
+    read(file_id, pos=header(2)+1, iostat=io_status)
+    do i=1,ndof
+        if (header(3) == 8) then
+            read(file_id, iostat=io_status) row_dp(i:ndof)
+        else
+            read(file_id, iostat=io_status) row_sp(i:ndof)
+            if (io_status == 0) row_dp(i:ndof) = dble(row_sp(i:ndof))
+        endif
+        call check_iostat(io_status, 'Error reading "'//trim(uel_stiffness_bin_file_name)//'"')
+        uel_stiffness(i, i:ndof) = row_dp(i:ndof)*scale_factor
+        uel_stiffness(i:ndof, i) = uel_stiffness(i, i:ndof)
+    enddo
+    
+    close(file_id)
+    
+end subroutine read_uel_stiffness_binary
+
+! Load the stiffness from the file written by 
+! rollover.three_d.wheel.stiffness_io.save_uel_stiffness_mapped. 
+! The header (little endian) contains
+! magic (8 char), version, header size, bytes per value, ndof, 2 x reserved, scale factor
+! followed by the full, already scaled, matrix starting at a page boundary. 
+! The file is memory mapped if uel_stiffness_map_mod.f90 is included (shared between processes),
+! and read into memory if uel_stiffness_map_dummy_mod.f90 is included. 
+! loaded is false if the file could not be used, e.g. if it was scaled with another scale_factor.
+subroutine map_uel_stiffness(scale_factor, loaded)
+use filenames_mod, only : uel_stiffness_map_file_name
+use usub_utils_mod, only : get_full_path, check_iostat
+use uel_stiffness_map_mod, only : map_stiffness_file
+implicit none
+    double precision, intent(in):: scale_factor 
+    logical, intent(out)        :: loaded
+    integer, parameter          :: supported_version = 1
+    integer                     :: file_id          ! File identifier
+    integer                     :: io_status        ! Check file operations
+    character(len=8)            :: magic            ! Identifier of file format
+    integer                     :: header(6)        ! version, header size, bytes per value, 
+                                                    ! ndof, 2 x reserved
+    double precision            :: file_scale_factor ! Scale factor used when writing the file
+    
+    loaded = .false.
+    open(newunit=file_id, file=trim(get_full_path(uel_stiffness_map_file_name)), &
+         access='stream', form='unformatted', action='read', iostat=io_status)
+    call check_iostat(io_status, 'Error opening "'//trim(uel_stiffness_map_file_name)//'"')
+    
+    read(file_id, iostat=io_status) magic, header, file_scale_factor
+    call check_iostat(io_status, 'Error reading header of "'//trim(uel_stiffness_map_file_name)//'"')
+    if (magic /= 'UELSTMAP' .or. header(1) > supported_version .or. header(3) /= 8) then
+        write(*,*) '"'//trim(uel_stiffness_map_file_name)//'" has unsupported format, not used'
+    elseif (abs(file_scale_factor - scale_factor) > 1.d-12*abs(scale_factor)) then
+        write(*,*) '"'//trim(uel_stiffness_map_file_name)//'" has another scale factor, not used'
+    else
+        call map_stiffness_file(trim(get_full_path(uel_stiffness_map_file_name)), header(2), &
+                                header(4), uel_stiffness, uel_stiffness_is_mapped)
+        if (.not.uel_stiffness_is_mapped) then
+            allocate(uel_stiffness(header(4), header(4)))
+            read(file_id, pos=header(2)+1, iostat=io_status) uel_stiffness
+            call check_iostat(io_status, 'Error reading "'//trim(uel_stiffness_map_file_name)//'"')
+        endif
+        loaded = .true.
+    endif
+    
+    close(file_id)
+    
+end subroutine map_uel_stiffness
+
+! Release the stiffness, both if it is mapped and if it is allocated
+subroutine deallocate_uel_stiffness()
+use uel_stiffness_map_mod, only : unmap_stiffness_file
+implicit none
+    
+    if (uel_stiffness_is_mapped) then
+        call unmap_stiffness_file(uel_stiffness)
+        uel_stiffness_is_mapped = .false.
+    elseif (associated(uel_stiffness)) then
+        deallocate(uel_stiffness)
+    endif
+    
+end subroutine deallocate_uel_stiffness
    
 function get_ndof() result(ndof)
 implicit none
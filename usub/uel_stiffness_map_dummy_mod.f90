@@ -0,0 +1,30 @@
+! This module is a dummy version of the module in "uel_stiffness_map_mod.f90", for systems where 
+! mmap is not available (e.g. Windows). map_stiffness_file always fails, such that the mapped 
+! stiffness file is read into memory instead. 
+module uel_stiffness_map_mod
+implicit none
+
+    contains
+    
+subroutine map_stiffness_file(file_name, offset, ndof, stiffness, mapped)
+implicit none
+    character(len=*), intent(in)                :: file_name
+    integer, intent(in)                         :: offset
+    integer, intent(in)                         :: ndof
+    double precision, pointer, intent(out)      :: stiffness(:,:)
+    logical, intent(out)                        :: mapped
+    
+    nullify(stiffness)
+    mapped = .false.
+    
+end subroutine map_stiffness_file
+
+subroutine unmap_stiffness_file(stiffness)
+implicit none
+    double precision, pointer, intent(inout)    :: stiffness(:,:)
+    
+    nullify(stiffness)
+    
+end subroutine unmap_stiffness_file
+
+end module uel_stiffness_map_mod
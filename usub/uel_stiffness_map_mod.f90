@@ -0,0 +1,101 @@
+! Map the stiffness file written by rollover.three_d.wheel.stiffness_io.save_uel_stiffness_mapped
+! into memory using the POSIX functions mmap and munmap. The mapping is read-only and shared, such 
+! that all processes on one node use the same (page cache) memory. 
+! This module is only available on Linux (and other POSIX systems). Otherwise, include the file 
+! "uel_stiffness_map_dummy_mod.f90" instead, and the mapped file is read into memory. 
+module uel_stiffness_map_mod
+use iso_c_binding
+implicit none
+    
+    integer(c_int), parameter   :: PROT_READ = 1    ! Pages may be read
+    integer(c_int), parameter   :: MAP_SHARED = 1   ! Share mapping with other processes
+    
+    interface
+        function c_fopen(path, mode) bind(c, name='fopen') result(fp)
+        import
+            character(kind=c_char), intent(in)  :: path(*), mode(*)
+            type(c_ptr)                         :: fp
+        end function
+        
+        function c_fileno(fp) bind(c, name='fileno') result(fd)
+        import
+            type(c_ptr), value                  :: fp
+            integer(c_int)                      :: fd
+        end function
+        
+        function c_fclose(fp) bind(c, name='fclose') result(stat)
+        import
+            type(c_ptr), value                  :: fp
+            integer(c_int)                      :: stat
+        end function
+        
+        function c_mmap(addr, length, prot, flags, fd, offset) bind(c, name='mmap') result(ptr)
+        import
+            type(c_ptr), value                  :: addr
+            integer(c_size_t), value            :: length
+            integer(c_int), value               :: prot, flags, fd
+            integer(c_long), value              :: offset
+            type(c_ptr)                         :: ptr
+        end function
+        
+        function c_munmap(addr, length) bind(c, name='munmap') result(stat)
+        import
+            type(c_ptr), value                  :: addr
+            integer(c_size_t), value            :: length
+            integer(c_int)                      :: stat
+        end function
+    end interface
+    
+    contains
+    
+! Map the ndof x ndof double precision matrix starting at byte offset (must be a multiple of the 
+! page size) in file_name to stiffness. mapped is false if the mapping failed.
+subroutine map_stiffness_file(file_name, offset, ndof, stiffness, mapped)
+implicit none
+    character(len=*), intent(in)                :: file_name
+    integer, intent(in)                         :: offset
+    integer, intent(in)                         :: ndof
+    double precision, pointer, intent(out)      :: stiffness(:,:)
+    logical, intent(out)                        :: mapped
+    type(c_ptr)                                 :: fp, ptr
+    integer(c_int)                              :: stat
+    
+    nullify(stiffness)
+    mapped = .false.
+    
+    fp = c_fopen(trim(file_name)//c_null_char, 'rb'//c_null_char)
+    if (.not.c_associated(fp)) return
+    
+    ptr = c_mmap(c_null_ptr, get_map_length(ndof), PROT_READ, MAP_SHARED, c_fileno(fp), &
+                 int(offset, c_long))
+    stat = c_fclose(fp)     ! The mapping remains valid after closing the file
+    
+    ! mmap returns MAP_FAILED = (void *) -1 on failure
+    if (transfer(ptr, 0_c_intptr_t) == -1_c_intptr_t) return
+    
+    call c_f_pointer(ptr, stiffness, [ndof, ndof])
+    mapped = .true.
+    
+end subroutine map_stiffness_file
+
+! Remove a mapping created by map_stiffness_file
+subroutine unmap_stiffness_file(stiffness)
+implicit none
+    double precision, pointer, intent(inout)    :: stiffness(:,:)
+    integer(c_int)                              :: stat
+    
+    stat = c_munmap(c_loc(stiffness(1,1)), get_map_length(size(stiffness,1)))
+    nullify(stiffness)
+    
+end subroutine unmap_stiffness_file
+
+function get_map_length(ndof) result(length)
+implicit none
+    integer, intent(in) :: ndof
+    integer(c_size_t)   :: length
+    
+    length = int(ndof, c_size_t)*int(ndof, c_size_t)*8_c_size_t
+    
+end function get_map_length
+
+end module uel_stiffness_map_mod
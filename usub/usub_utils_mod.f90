@@ -4,6 +4,7 @@ implicit none
     private
     
     public  :: get_fid
+    public  :: get_full_path
     public  :: check_iostat
     public  :: write_node_info
 
@@ -12,7 +13,6 @@ implicit none
     ! Use Abaqus' utility routine getoutdir to determine the full path to the base_name that resides
     ! in the current working directory. Open that file and return the file identifier. 
     function get_fid(base_name, the_action) result(file_id)
-    use abaqus_utils_mod
     implicit none
         character(len=*), intent(in)            :: base_name    ! Base name for file
         character(len=*), intent(in), optional  :: the_action   ! action for open, default: 'read'
@@ -20,8 +20,6 @@ implicit none
         
         integer                                 :: io_status    ! Used to check that file opens 
                                                                 ! sucessfully
-        integer                                 :: cwd_length   ! Length of current path (used by 
-                                                                ! getoutdir)
         character(len=256)                      :: filename     ! Filename (full path)
         character(len=20)                       :: int_action   ! Internal action
         
@@ -31,6 +29,24 @@ implicit none
             int_action = 'read'
         endif
         
+        filename = get_full_path(base_name)
+            
+        open(newunit=file_id, file=trim(filename), iostat=io_status, action=int_action)
+        call check_iostat(io_status, 'Error opening "'//base_name//'"')
+        
+    end function get_fid
+    
+    ! Use Abaqus' utility routine getoutdir to determine the full path to the base_name that resides
+    ! in the current working directory. 
+    function get_full_path(base_name) result(filename)
+    use abaqus_utils_mod
+    implicit none
+        character(len=*), intent(in)            :: base_name    ! Base name for file
+        character(len=256)                      :: filename     ! Filename (full path)
+        
+        integer                                 :: cwd_length   ! Length of current path (used by 
+                                                                ! getoutdir)
+        
         call getoutdir(filename, cwd_length)
         
         if ((len(trim(filename)) + len(trim(base_name)) + 1) > len(filename)) then
@@ -38,12 +54,9 @@ implicit none
             call xit()
         endif
         
-        write(filename, *) trim(filename)//'/'//trim(base_name)
-            
-        open(newunit=file_id, file=trim(filename), iostat=io_status, action=int_action)
-        call check_iostat(io_status, 'Error opening "'//base_name//'"')
+        filename = trim(filename)//'/'//trim(base_name)
         
-    end function get_fid
+    end function get_full_path
     
     subroutine check_iostat(io_status, error_message)
     use abaqus_utils_mod